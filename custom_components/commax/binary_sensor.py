@@ -2,30 +2,31 @@
 from __future__ import annotations
 
 import logging
-import serial
 import asyncio
-from datetime import datetime
-from typing import Any
 
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorDeviceClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.const import CONF_NAME
 
+from .bus import CommaxBus
 from .const import (
     DOMAIN,
-    CONF_PORT,
-    CONF_BAUD_RATE,
-    CONF_TIMEOUT,
-    DOORBELL_BELL_RING_PACKET,
-    DOORBELL_CALL_END_PACKET,
-    DOORBELL_OPEN_DOOR_PACKET,
+    DOORBELL_FRAME_HEADERS,
     DOORBELL_NAMES,
+    SEGMENT_DOORBELL,
 )
+from .codec import (
+    DOORBELL_OPEN_DOOR_FRAME,
+    DOORBELL_RING,
+    DOORBELL_CALL_END,
+    decode_doorbell,
+)
+from .coordinator import CommaxCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,42 +37,47 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Commax Doorbell platform."""
-    config = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator: CommaxCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    bus = coordinator.bus_for(SEGMENT_DOORBELL)
     
     # 도어벨 센서 생성
     doorbells = []
     for i, name in enumerate(DOORBELL_NAMES):
         doorbell = CommaxDoorbell(
             hass,
-            config,
+            bus,
             i,
             name
         )
         doorbells.append(doorbell)
     
-    async_add_entities(doorbells, True)
+    async_add_entities(doorbells)
 
 
 class CommaxDoorbell(BinarySensorEntity):
-    """Representation of a Commax Doorbell."""
+    """Representation of a Commax Doorbell.
+
+    도어벨 프레임은 버스의 수신 경로(트랜스포트 읽기 콜백 -> 프레임 분리기
+    -> 헤더별 리스너)에서 곧바로 처리되므로, 프레임의 마지막 바이트가
+    도착한 같은 루프 순회에서 상태가 기록됩니다. 기다리는 동안 깨어나는
+    작업은 없습니다.
+    """
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any], index: int, name: str) -> None:
+    def __init__(self, hass: HomeAssistant, bus: CommaxBus, index: int, name: str) -> None:
         """Initialize the doorbell."""
         self.hass = hass
-        self.config = config
+        self.config = bus.config
         self.index = index
         self._attr_name = name
         self._attr_unique_id = f"{DOMAIN}_doorbell"
         self._attr_is_on = False
         self._attr_device_class = BinarySensorDeviceClass.OCCUPANCY
         
-        # 시리얼 통신 관련
-        self._serial_port = None
-        self._serial_lock = asyncio.Lock()
+        # 이벤트 감지 방식이므로 폴링하지 않습니다.
+        self._attr_should_poll = False
         
-        # 상태 조회 관련
-        self._last_status_check = None
-        self._status_check_interval = config.get("scan_interval", 1)
+        # 공유 RS485 버스
+        self._bus = bus
         
         # 도어벨 상태
         self._state = "OFF"  # "ON"(벨 울림) or "OFF"(대기)
@@ -95,7 +101,7 @@ class CommaxDoorbell(BinarySensorEntity):
 
     async def ring_doorbell(self) -> None:
         """도어벨을 울립니다."""
-        await self._send_command(DOORBELL_OPEN_DOOR_PACKET)
+        await self._send_command(DOORBELL_OPEN_DOOR_FRAME)
         self._attr_is_on = True
         self.async_write_ha_state()
         
@@ -104,105 +110,52 @@ class CommaxDoorbell(BinarySensorEntity):
         self._attr_is_on = False
         self.async_write_ha_state()
 
-    async def _send_command(self, packet: str) -> None:
-        """시리얼 포트로 명령을 전송합니다."""
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    data = bytes.fromhex(packet)
-                    self._serial_port.write(data)
-                    _LOGGER.debug(f"도어벨 {self.index + 1} 명령 전송: {packet}")
-                    await asyncio.sleep(0.075)
-                    
-            except Exception as e:
-                _LOGGER.error(f"도어벨 {self.index + 1} 명령 전송 실패: {e}")
-                await self._reconnect_serial()
-
-    async def _connect_serial(self) -> None:
-        """시리얼 포트에 연결합니다."""
+    async def _send_command(self, packet: bytes) -> None:
+        """공유 버스로 명령을 전송합니다."""
         try:
-            self._serial_port = serial.Serial(
-                port=self.config[CONF_PORT],
-                baudrate=self.config[CONF_BAUD_RATE],
-                timeout=self.config[CONF_TIMEOUT],
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE
-            )
-            _LOGGER.info(f"도어벨 시리얼 포트 {self.config[CONF_PORT]} 연결 성공")
+            await self._bus.async_send(packet)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"도어벨 {self.index + 1} 명령 전송: {packet.hex().upper()}")
         except Exception as e:
-            _LOGGER.error(f"도어벨 시리얼 포트 연결 실패: {e}")
-            self._serial_port = None
-
-    async def _reconnect_serial(self) -> None:
-        """시리얼 포트를 재연결합니다."""
-        if self._serial_port:
-            self._serial_port.close()
-            self._serial_port = None
-        await self._connect_serial()
-
-    async def async_update(self) -> None:
-        """도어벨 상태를 업데이트합니다."""
-        # 도어벨은 상태 조회가 아닌 이벤트 감지 방식이므로
-        # 주기적인 상태 업데이트는 하지 않습니다.
-        # 대신 RS485 데이터를 지속적으로 모니터링합니다.
-        pass
-
-    async def _monitor_rs485(self) -> None:
-        """RS485 데이터를 지속적으로 모니터링합니다."""
-        if not self._serial_port:
-            await self._connect_serial()
-        
-        if not self._serial_port:
+            _LOGGER.error(f"도어벨 {self.index + 1} 명령 전송 실패: {e}")
+
+    @callback
+    def _handle_frame(self, frame: bytes) -> None:
+        """버스에서 전달된 도어벨 프레임을 바로 처리합니다."""
+        # 0x02 로 시작하는 8바이트 보일러 조회 프레임은 도어벨 프레임이 아닙니다.
+        if len(frame) < 15:
             return
-        
-        try:
-            # 읽기 버퍼 확인
-            if self._serial_port.in_waiting > 0:
-                data = self._serial_port.read(self._serial_port.in_waiting)
-                if data:
-                    self._process_rs485_data(data)
-        except Exception as e:
-            _LOGGER.error(f"도어벨 {self.index + 1} RS485 모니터링 실패: {e}")
-            await self._reconnect_serial()
+        self._process_rs485_data(frame)
 
     def _process_rs485_data(self, data: bytes) -> None:
         """RS485 데이터를 처리합니다."""
-        data_hex = data.hex().upper()
-        _LOGGER.debug(f"도어벨 {self.index + 1} RS485 데이터 수신: {data_hex}")
-        
+        event = decode_doorbell(data)
+
         # 벨 울림 패킷 감지 (15바이트 패킷)
-        if len(data) >= 15 and data_hex.startswith("100109120101091201"):
+        if event == DOORBELL_RING:
             if self._state != "ON":
                 self._state = "ON"
                 self._attr_is_on = True
                 self.async_write_ha_state()
                 _LOGGER.info(f"도어벨 {self.index + 1} 벨 울림 감지!")
-        
+
         # 통화 종료 패킷 감지 (16바이트 패킷)
-        elif len(data) >= 16 and data_hex.startswith("0212010912010109120161"):
+        elif event == DOORBELL_CALL_END:
             if self._state != "OFF":
                 self._state = "OFF"
                 self._attr_is_on = False
                 self.async_write_ha_state()
                 _LOGGER.info(f"도어벨 {self.index + 1} 통화 종료 감지!")
-        
+
         # 알 수 없는 패킷
-        else:
-            _LOGGER.debug(f"도어벨 {self.index + 1} 알 수 없는 RS485 패킷: {data_hex}")
+        elif _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(f"도어벨 {self.index + 1} 알 수 없는 RS485 패킷: {data.hex().upper()}")
 
     async def async_added_to_hass(self) -> None:
         """엔티티가 Home Assistant에 추가될 때 호출됩니다."""
         await super().async_added_to_hass()
         
-        # RS485 모니터링 시작
-        self.hass.async_create_task(self._start_rs485_monitoring())
-
-    async def _start_rs485_monitoring(self) -> None:
-        """RS485 모니터링을 시작합니다."""
-        while True:
-            await self._monitor_rs485()
-            await asyncio.sleep(0.05)  # 50ms 간격으로 모니터링 
\ No newline at end of file
+        # 버스에서 수신되는 도어벨 프레임을 구독합니다.
+        self.async_on_remove(
+            self._bus.async_add_listener(DOORBELL_FRAME_HEADERS, self._handle_frame)
+        )
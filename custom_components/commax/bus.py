@@ -0,0 +1,543 @@
+"""Shared RS485 bus for Commax Integration."""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    CONF_PORT,
+    CONF_BAUD_RATE,
+    CONF_TIMEOUT,
+    CONF_SEGMENT_PORT,
+    CONF_SEGMENT_BAUD_RATE,
+    DEFAULT_BAUD_RATE,
+    DEFAULT_TIMEOUT,
+    SEGMENTS,
+)
+from .capture import CaptureWriter
+from .framer import FRAME_LENGTH, CommaxFramer
+from .ring import DIRECTION_RX, DIRECTION_TX, FrameRing
+from .stats import BusStatistics
+from .supervisor import BusUnavailable, ConnectionSupervisor
+from .trace import KIND_COMMAND, KIND_QUERY, CommandTracer, Span
+from .transport import (
+    SerialTransport,
+    TcpTransport,
+    async_open_transport,
+    frame_airtime,
+    inter_frame_gap,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# 어댑터가 멈췄을 때 송신 락을 무한정 잡고 있지 않도록 하는 쓰기 제한 시간
+WRITE_TIMEOUT = 1.0
+
+# 버스가 계속 사용 중이어도 이 프레임 수의 전송 시간 이상은 기다리지 않습니다.
+IDLE_MAX_WAIT_FRAMES = 10
+
+# 송신 우선순위 (작을수록 먼저 전송)
+PRIORITY_COMMAND = 0  # 사용자 명령
+PRIORITY_POLL = 1  # 백그라운드 상태 조회
+
+FrameCallback = Callable[[bytes], None]
+
+
+@dataclass
+class _TransmitJob:
+    """송신 대기열의 항목 하나."""
+
+    frame: bytes
+    priority: int
+    reply_key: tuple[int, int] | None
+    timeout: float
+    future: asyncio.Future[bytes | None]
+    span: Span
+    coalesce_key: Hashable | None = None
+    handle: asyncio.TimerHandle | None = None
+
+
+class CommaxBus:
+    """Representation of a shared Commax RS485 bus.
+
+    시리얼 포트 하나당 하나만 생성되며(create_buses 참고), 그 포트와
+    유일한 송신 작업(transmit worker)을 소유합니다. 같은 구간에 연결된
+    모든 엔티티가 이 객체를 공유합니다.
+
+    전송 요청은 우선순위 대기열에 들어가 한 번에 하나씩 전송됩니다.
+    사용자 명령은 대기 중인 상태 조회보다 먼저 전송되므로, 명령은 최대
+    진행 중인 요청 하나만 기다립니다. 이미 대기 중인 것과 같은 상태 조회는
+    새로 넣지 않고 기존 요청의 결과를 함께 받습니다.
+
+    같은 병합 키(coalesce_key, 예: (기기, 명령 종류))의 명령이 아직 전송되지
+    않고 대기 중이면 새 명령은 그 패킷을 최신 값으로 바꾸고 결과를 함께
+    받습니다. 병합 창(coalesce_window)을 주면 그 시간 동안 대기열에 넣지 않고
+    기다리며 이어지는 명령을 하나로 모읍니다 (예: 온도 슬라이더).
+
+    포트가 열려 있는 동안 수신 데이터는 계속 프레이머로 들어가고,
+    완성된 프레임은 헤더별로 등록된 리스너에게 전달됩니다.
+    응답을 기다리는 요청은 (응답 헤더, 기기 주소) 로 등록되어,
+    해당 프레임이 파싱되는 즉시 완료됩니다.
+
+    송수신 프레임, 체크섬 오류, 응답 시간 초과, 재연결, 명령 왕복 지연은
+    stats 에 누적되고, 요청마다 구간별 시각이 tracer 에 기록됩니다.
+    최근 송수신 프레임은 frames 링 버퍼에 남고, 캡처를 켜면 모든 송수신
+    바이트가 캡처 파일에 기록됩니다.
+    """
+
+    def __init__(self, hass: HomeAssistant, config: dict[str, Any]) -> None:
+        """Initialize the bus."""
+        self.hass = hass
+        self.config = config
+        self._transport: SerialTransport | TcpTransport | None = None
+        self._framer = CommaxFramer(self._dispatch)
+        self._listeners: dict[int, list[FrameCallback]] = {}
+        self._pending: dict[tuple[int, int], tuple[asyncio.Future[bytes], Span]] = {}
+        self._lock = asyncio.Lock()
+        self._queue: asyncio.PriorityQueue[tuple[int, int, _TransmitJob]] = (
+            asyncio.PriorityQueue()
+        )
+        # 아직 전송되지 않은 병합 가능한 요청 (상태 조회는 프레임 자체가 키)
+        self._queued: dict[Hashable, _TransmitJob] = {}
+        # 지금 전송 중(응답 대기 포함)인 요청
+        self._active: _TransmitJob | None = None
+        self._sequence = itertools.count()
+        self._worker: asyncio.Task | None = None
+        self._connected_once = False
+        self.stats = BusStatistics(config.get(CONF_BAUD_RATE, DEFAULT_BAUD_RATE))
+        self.supervisor = ConnectionSupervisor(config[CONF_PORT], self._async_reconnect)
+        self.tracer = CommandTracer()
+        self.frames = FrameRing()
+        self.capture: CaptureWriter | None = None
+        # 마지막으로 유효한 프레임을 받은 시각 (time.monotonic)
+        self.last_frame: float | None = None
+
+    @property
+    def port(self) -> str:
+        """Return the serial port of the bus."""
+        return self.config[CONF_PORT]
+
+    @property
+    def connected(self) -> bool:
+        """Return true if the serial port is open."""
+        return self._transport is not None and not self._transport.is_closed
+
+    @property
+    def reply_timeout(self) -> float:
+        """Return the reply timeout in seconds."""
+        return self.config.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+
+    def has_pending(self, coalesce_key: Hashable) -> bool:
+        """병합 키가 같은 요청이 아직 대기 중이거나 전송 중이면 True 를 반환합니다.
+
+        확인된 상태와 같은 명령을 생략하기 전에 확인합니다. 대기 중인 다른
+        값의 명령이 있으면 새 명령으로 대체해야 마지막 요청이 반영됩니다.
+        """
+        if coalesce_key in self._queued:
+            return True
+        active = self._active
+        return active is not None and active.coalesce_key == coalesce_key
+
+    def async_add_listener(
+        self, headers: int | Iterable[int], callback: FrameCallback
+    ) -> CALLBACK_TYPE:
+        """헤더에 해당하는 프레임 리스너를 등록하고 해제 함수를 반환합니다."""
+        if isinstance(headers, int):
+            headers = (headers,)
+        headers = tuple(headers)
+        for header in headers:
+            self._listeners.setdefault(header, []).append(callback)
+
+        def _remove() -> None:
+            for header in headers:
+                self._listeners[header].remove(callback)
+
+        return _remove
+
+    async def async_start(self) -> None:
+        """포트를 열어 수신을 시작합니다 (실패하면 백그라운드에서 재연결)."""
+        try:
+            await self.async_connect()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    async def async_connect(self) -> None:
+        """포트가 닫혀 있으면 다시 엽니다. 아무것도 전송하지 않습니다.
+
+        연결이 끊겨 재연결을 기다리는 동안에는 포트를 열어 보지 않고 바로
+        BusUnavailable 로 실패합니다.
+        """
+        async with self._lock:
+            await self._async_ensure_connected()
+
+    async def async_send(self, frame: bytes, priority: int = PRIORITY_COMMAND) -> None:
+        """응답을 기다리지 않는 프레임을 전송합니다."""
+        await self._async_submit(frame, priority, None, 0)
+
+    async def async_request(
+        self,
+        frame: bytes,
+        reply_header: int,
+        address: int,
+        timeout: float | None = None,
+        priority: int = PRIORITY_COMMAND,
+        coalesce_key: Hashable | None = None,
+        coalesce_window: float = 0,
+    ) -> bytes | None:
+        """프레임을 전송하고 (응답 헤더, 기기 주소)가 일치하는 응답을 기다립니다.
+
+        응답 프레임을 반환하며, 제한 시간 안에 응답이 없으면 None 을 반환합니다.
+        응답 프레임은 리스너에게도 그대로 전달됩니다.
+        """
+        return await self._async_submit(
+            frame,
+            priority,
+            (reply_header, address),
+            self.reply_timeout if timeout is None else timeout,
+            coalesce_key,
+            coalesce_window,
+        )
+
+    async def async_close(self) -> None:
+        """재연결과 송신 작업을 멈추고 시리얼 포트를 닫습니다."""
+        await self.supervisor.async_stop()
+        # 전송 중이거나 응답을 기다리던 요청도 함께 실패로 끝냅니다 (취소되면 비워짐).
+        jobs = [self._active] if self._active is not None else []
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # 전송되지 못한 요청은 실패로 끝냅니다.
+        jobs += self._queued.values()
+        while not self._queue.empty():
+            jobs.append(self._queue.get_nowait()[2])
+        for job in jobs:
+            if job.handle is not None:
+                job.handle.cancel()
+            if not job.future.done():
+                job.future.set_exception(
+                    HomeAssistantError(f"RS485 버스 {self.port} 가 닫혔습니다")
+                )
+                # 요청자가 이미 취소되어 아무도 읽지 않는 결과를 로그에 남기지 않습니다.
+                job.future.exception()
+        self._queued.clear()
+
+        async with self._lock:
+            self._close()
+        await asyncio.get_running_loop().run_in_executor(None, self.tracer.close)
+        await self.async_stop_capture()
+
+    def start_capture(self, path: str) -> None:
+        """송수신 바이트를 캡처 파일에 기록하기 시작합니다."""
+        if self.capture is None:
+            self.capture = CaptureWriter(path)
+            _LOGGER.info("RS485 캡처 시작: %s", path)
+
+    async def async_stop_capture(self) -> None:
+        """캡처를 멈추고 남은 데이터를 파일에 씁니다."""
+        capture, self.capture = self.capture, None
+        if capture is not None:
+            await asyncio.get_running_loop().run_in_executor(None, capture.close)
+            _LOGGER.info("RS485 캡처 종료: %s (레코드 %d개)", capture.path, capture.records)
+
+    def feed(self, data: bytes) -> None:
+        """수신 바이트를 프레임으로 나눠 전달합니다 (캡처 재생에도 사용)."""
+        framer = self._framer
+        errors = framer.checksum_errors
+        self.stats.bytes_received(len(data))
+        framer.feed(data)
+        if framer.checksum_errors != errors:
+            self.stats.checksum_failed(framer.checksum_errors - errors)
+
+    async def _async_submit(
+        self,
+        frame: bytes,
+        priority: int,
+        reply_key: tuple[int, int] | None,
+        timeout: float,
+        coalesce_key: Hashable | None = None,
+        coalesce_window: float = 0,
+    ) -> bytes | None:
+        """요청을 우선순위 대기열에 넣고 전송 결과를 기다립니다."""
+        if coalesce_key is None and priority == PRIORITY_POLL:
+            coalesce_key = frame
+
+        job = self._queued.get(coalesce_key) if coalesce_key is not None else None
+        if job is not None:
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "대기 중인 요청과 병합: %s -> %s", job.frame.hex().upper(), frame.hex().upper()
+                )
+            # 아직 전송 전이므로 최신 값으로 바꿔 한 번만 전송합니다.
+            job.frame = frame
+        else:
+            loop = asyncio.get_running_loop()
+            kind = KIND_COMMAND if priority == PRIORITY_COMMAND else KIND_QUERY
+            job = _TransmitJob(
+                frame,
+                priority,
+                reply_key,
+                timeout,
+                loop.create_future(),
+                self.tracer.start(kind),
+                coalesce_key,
+            )
+            if coalesce_key is not None:
+                self._queued[coalesce_key] = job
+            if coalesce_window > 0:
+                job.handle = loop.call_later(coalesce_window, self._enqueue, job)
+            else:
+                self._enqueue(job)
+
+        # 요청자가 취소되어도 같은 요청을 기다리는 다른 요청자에게는 영향이 없습니다.
+        # 병합된 요청자들은 기다리기 시작한 순서대로 깨어나므로 마지막 값이 마지막에 반영됩니다.
+        return await asyncio.shield(job.future)
+
+    def _enqueue(self, job: _TransmitJob) -> None:
+        """요청을 송신 대기열에 넣고 송신 작업이 없으면 시작합니다."""
+        job.handle = None
+        self._queue.put_nowait((job.priority, next(self._sequence), job))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(
+                self._async_transmit_worker()
+            )
+
+    async def _async_transmit_worker(self) -> None:
+        """대기열에서 우선순위가 가장 높은 요청부터 하나씩 전송합니다."""
+        while True:
+            _, _, job = await self._queue.get()
+            # 전송이 시작되면 더 이상 병합하지 않습니다.
+            if job.coalesce_key is not None and self._queued.get(job.coalesce_key) is job:
+                del self._queued[job.coalesce_key]
+            if job.future.done():
+                continue
+            self._active = job
+            try:
+                result = await self._async_transact(job)
+            except Exception as e:  # pylint: disable=broad-except
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if result is not None and job.priority == PRIORITY_COMMAND:
+                    # 대기열 대기 시간을 포함한, 사용자가 체감하는 명령 지연
+                    self.stats.command_completed(job.span.reply - job.span.enqueued)
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._active = None
+            self.tracer.finish(job.span, job.frame)
+
+    async def _async_transact(self, job: _TransmitJob) -> bytes | None:
+        """요청 하나를 전송하고 필요하면 응답을 기다립니다."""
+        # 끊겨 있으면 앞선 요청의 응답 대기를 기다리지 않고 바로 실패합니다.
+        self.supervisor.check()
+        async with self._lock:
+            if job.reply_key is None:
+                await self._async_write(job.frame, job.span)
+                return None
+
+            future: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+            self._pending[job.reply_key] = (future, job.span)
+            try:
+                # 연결과 쓰기 제한 시간 초과는 응답 없음이 아니라 전송 실패로 올려 보냅니다.
+                await self._async_write(job.frame, job.span)
+                try:
+                    # wait_for 는 응답과 동시에 온 취소를 삼킬 수 있어 timeout 을 씁니다.
+                    async with asyncio.timeout(job.timeout):
+                        return await future
+                except asyncio.TimeoutError:
+                    self.stats.reply_timed_out()
+                    if _LOGGER.isEnabledFor(logging.DEBUG):
+                        _LOGGER.debug(
+                            "응답 없음: %s (헤더 %02X, 주소 %d)",
+                            job.frame.hex().upper(),
+                            *job.reply_key,
+                        )
+                    return None
+            finally:
+                pending = self._pending.get(job.reply_key)
+                if pending is not None and pending[0] is future:
+                    del self._pending[job.reply_key]
+
+    async def _async_write(self, data: bytes, span: Span) -> None:
+        """버스가 조용해지면 데이터를 쓰고 마지막 바이트가 나갈 때까지 기다립니다.
+
+        응답 제한 시간은 이 함수가 끝난 뒤, 즉 요청이 선로를 떠난 뒤부터 흐릅니다.
+        """
+        await self._async_ensure_connected()
+        try:
+            await self._async_wait_idle()
+            span.tx_start = self.tracer.clock()
+            self._transport.write(data)
+            self.frames.record(DIRECTION_TX, data)
+            if self.capture is not None:
+                self.capture.record(DIRECTION_TX, data)
+            async with asyncio.timeout(WRITE_TIMEOUT):
+                await self._transport.async_wait_sent()
+            span.tx_done = self.tracer.clock()
+            self.stats.frame_sent(len(data))
+        except Exception as e:
+            # 포트를 닫고 재연결은 supervisor 에 맡깁니다.
+            self._close()
+            if not self.supervisor.is_open:
+                self.supervisor.connection_failed(e)
+            raise
+
+    async def _async_wait_idle(self) -> None:
+        """마지막 송수신 후 프레임 간 최소 간격만큼 버스가 조용해질 때까지 기다립니다."""
+        transport = self._transport
+        loop = asyncio.get_running_loop()
+        gap = inter_frame_gap(transport.baudrate)
+        deadline = loop.time() + IDLE_MAX_WAIT_FRAMES * frame_airtime(
+            FRAME_LENGTH, transport.baudrate
+        )
+        while True:
+            now = loop.time()
+            wait = max(transport.last_rx, transport.tx_done_at) + gap - now
+            if wait <= 0:
+                return
+            if now >= deadline:
+                _LOGGER.debug("버스가 계속 사용 중이어서 대기 없이 전송합니다")
+                return
+            await asyncio.sleep(min(wait, deadline - now))
+
+    async def _async_ensure_connected(self) -> None:
+        """시리얼 포트(또는 TCP 게이트웨이)가 열려 있지 않으면 연결합니다."""
+        if self._transport and not self._transport.is_closed:
+            return
+        # 끊긴 동안에는 요청마다 포트를 열어 보지 않습니다 (재연결은 supervisor 가).
+        self.supervisor.check()
+        await self._async_open()
+
+    async def _async_reconnect(self) -> None:
+        """supervisor 의 재연결 시도.
+
+        연결 시도(TCP 게이트웨이는 최대 TCP_CONNECT_TIMEOUT)는 송신 잠금 밖에서
+        합니다. 차단기가 열려 있는 동안 요청은 포트를 열지 않으므로 겹치지 않고,
+        그동안 들어온 요청은 잠금을 기다리지 않고 바로 BusUnavailable 로 실패합니다.
+        """
+        if not self.connected:
+            await self._async_open()
+
+    async def _async_open(self) -> None:
+        """트랜스포트를 엽니다. 실패는 supervisor 에 기록합니다."""
+        try:
+            self._transport = await async_open_transport(
+                self.config[CONF_PORT],
+                self.config[CONF_BAUD_RATE],
+                self._data_received,
+                self._connection_lost,
+            )
+        except Exception as e:
+            self.supervisor.connection_failed(e)
+            raise
+        if self._connected_once:
+            self.stats.reconnected()
+        else:
+            _LOGGER.info(f"시리얼 포트 {self.port} 연결 성공")
+        self._connected_once = True
+        self.supervisor.connected()
+
+    def _data_received(self, data: bytes) -> None:
+        """트랜스포트 수신 콜백: 캡처 중이면 기록하고 프레임을 나눕니다."""
+        if self.capture is not None:
+            self.capture.record(DIRECTION_RX, data)
+        self.feed(data)
+
+    def _dispatch(self, frame: bytes) -> None:
+        """완성된 프레임을 대기 중인 요청과 헤더별 리스너에게 전달합니다."""
+        self.last_frame = time.monotonic()
+        self.stats.frame_received()
+        self.frames.record(DIRECTION_RX, frame)
+        span: Span | None = None
+        if self._pending:
+            # 8바이트 응답 프레임: 헤더 + 상태 + 기기 주소 + ...
+            pending = self._pending.get((frame[0], frame[2]))
+            if pending is not None and not pending[0].done():
+                future, span = pending
+                span.reply = self.tracer.clock()
+                future.set_result(frame)
+
+        listeners = self._listeners.get(frame[0])
+        if not listeners:
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("처리되지 않은 프레임: %s", frame.hex().upper())
+            return
+
+        # 이 응답으로 엔티티 상태가 기록되면 요청의 Span 에 시각이 찍힙니다.
+        self.tracer.active = span
+        try:
+            for callback in tuple(listeners):
+                try:
+                    callback(frame)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("프레임 처리 실패: %s", frame.hex().upper())
+        finally:
+            self.tracer.active = None
+
+    def _connection_lost(self, exc: Exception | None) -> None:
+        """트랜스포트 연결 끊김 콜백.
+
+        응답을 기다리던 요청은 제한 시간까지 기다리지 않고 바로 실패합니다
+        (기기의 응답 없음으로 세지 않습니다).
+        """
+        self._transport = None
+        self._framer.reset()
+        self.supervisor.connection_failed(exc)
+        pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception(
+                    BusUnavailable(f"RS485 버스 {self.port} 연결 끊김: {exc}")
+                )
+                # 요청자가 이미 취소되어 아무도 읽지 않는 결과를 로그에 남기지 않습니다.
+                future.exception()
+
+    def _close(self) -> None:
+        """열려 있는 시리얼 포트를 닫습니다."""
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+        self._framer.reset()
+
+
+def create_buses(hass: HomeAssistant, config: dict[str, Any]) -> dict[str, CommaxBus]:
+    """구간(기기 종류)별 버스를 만들어 {구간: 버스} 로 반환합니다.
+
+    구간마다 포트와 통신 속도를 따로 지정할 수 있고, 지정하지 않은 구간은
+    기본 포트와 속도를 씁니다. 같은 포트를 쓰는 구간은 버스 하나를 공유하며,
+    버스마다 송신 작업이 따로 돌아 느린 구간이 다른 구간을 막지 않습니다.
+    """
+    default_baud_rate = config.get(CONF_BAUD_RATE, DEFAULT_BAUD_RATE)
+    by_port: dict[str, CommaxBus] = {}
+    buses: dict[str, CommaxBus] = {}
+    for segment in SEGMENTS:
+        port = config.get(CONF_SEGMENT_PORT.format(segment)) or config[CONF_PORT]
+        baud_rate = config.get(CONF_SEGMENT_BAUD_RATE.format(segment)) or default_baud_rate
+        bus = by_port.get(port)
+        if bus is None:
+            bus = by_port[port] = CommaxBus(
+                hass, {**config, CONF_PORT: port, CONF_BAUD_RATE: baud_rate}
+            )
+        elif bus.config[CONF_BAUD_RATE] != baud_rate:
+            _LOGGER.warning(
+                "%s 구간의 통신 속도 %s 를 무시합니다: %s 포트는 이미 %s 로 사용 중입니다",
+                segment,
+                baud_rate,
+                port,
+                bus.config[CONF_BAUD_RATE],
+            )
+        buses[segment] = bus
+    return buses
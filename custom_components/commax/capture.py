@@ -0,0 +1,280 @@
+"""Binary RS485 bus capture, memory-mapped reader and replay for Commax Integration.
+
+캡처 파일 형식 (리틀 엔디언)::
+
+    헤더 16바이트: 매직 "CMXCAP" + 버전(u16) + 캡처 시작 유닉스 시각(double)
+    레코드 반복:   직전 레코드로부터의 시간(µs, varint) + 방향(u8)
+                   + 길이(varint) + 원시 바이트
+
+수신은 프레임 분리 전의 원시 청크를 그대로 기록하므로 깨진 바이트와
+나뉜 프레임까지 재현됩니다. 파일이 MAX_FILE_BYTES 에 이르면 <파일>.1 로
+옮기고 새 헤더로 다시 시작하므로, 디스크에는 최대 두 파일만 남습니다.
+
+    python -m custom_components.commax.capture dump capture.cmxcap
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING, NamedTuple
+
+from .ring import DIRECTION_NAMES, DIRECTION_RX
+
+if TYPE_CHECKING:
+    from .bus import CommaxBus
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b"CMXCAP"
+CAPTURE_VERSION = 1
+_HEADER = struct.Struct("<6sHd")
+
+# 이 크기가 쌓이거나 이 시간이 지나면 파일 쓰기 스레드로 넘깁니다.
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = 1.0
+# 캡처 파일 하나의 최대 크기. 넘으면 이전 파일 하나만 남기고 새 파일로 넘어갑니다.
+MAX_FILE_BYTES = 32 * 1024 * 1024
+ROTATED_SUFFIX = ".1"
+
+# 파일 쓰기 스레드에 파일을 바꾸라고 알리는 표시
+_ROTATE = object()
+
+
+class CapturedFrame(NamedTuple):
+    """One record of a capture file."""
+
+    timestamp: float  # 캡처 시작 후 경과 시간 (초)
+    direction: int
+    data: bytes
+
+
+def _encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(buffer: mmap.mmap | bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class CaptureWriter:
+    """Append-only capture writer.
+
+    record() 는 메모리 버퍼에 덧붙이기만 하므로 수신 경로에서 부르기에
+    충분히 가볍습니다. 파일 열기와 쓰기, 크기 제한에 따른 파일 교체는
+    모두 전용 스레드에서 합니다. 파일을 열거나 교체하지 못하면 오류를 한 번
+    남기고 캡처를 멈춥니다 (이후 record() 는 아무것도 하지 않습니다).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: int = MAX_FILE_BYTES,
+    ) -> None:
+        """Initialize the writer and start its file thread."""
+        self.path = path
+        self._clock = clock
+        self._max_bytes = max_bytes
+        self._buffer = bytearray(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time()))
+        self._last = clock()
+        self._last_flush = self._last
+        # 현재 파일에 쓰도록 넘긴 바이트 수 (버퍼에 남은 것 제외)
+        self._written = 0
+        self._chunks: queue.SimpleQueue[bytes | object | None] = queue.SimpleQueue()
+        # 파일 쓰기 스레드가 실패하면 True 가 되어 더 이상 쌓지 않습니다.
+        self.failed = False
+        self._thread = threading.Thread(
+            target=self._write_chunks, name="commax_capture", daemon=True
+        )
+        self._thread.start()
+        self.records = 0
+        self.rotations = 0
+
+    def record(self, direction: int, data: bytes) -> None:
+        """레코드 하나를 덧붙입니다."""
+        if self.failed:
+            return
+        now = self._clock()
+        buffer = self._buffer
+        _encode_varint(max(0, round((now - self._last) * 1_000_000)), buffer)
+        buffer.append(direction)
+        _encode_varint(len(data), buffer)
+        buffer += data
+        self._last = now
+        self.records += 1
+        if self._written + len(buffer) >= self._max_bytes:
+            self._rotate()
+        elif len(buffer) >= FLUSH_BYTES or now - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        """버퍼를 파일 쓰기 스레드로 넘깁니다."""
+        if self.failed:
+            self._buffer.clear()
+        elif self._buffer:
+            self._chunks.put(bytes(self._buffer))
+            self._written += len(self._buffer)
+            self._buffer.clear()
+        self._last_flush = self._clock()
+
+    def _rotate(self) -> None:
+        """지금까지를 현재 파일에 쓰고, 다음 레코드부터 새 헤더의 새 파일에 씁니다.
+
+        새 파일의 시작 시각은 이 레코드의 시각이므로 레코드의 시간 차가 이어집니다.
+        """
+        self.flush()
+        self._chunks.put(_ROTATE)
+        self._buffer += _HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time())
+        self._written = 0
+        self.rotations += 1
+
+    def close(self) -> None:
+        """남은 버퍼를 쓰고 파일을 닫습니다 (블로킹, executor 에서 호출)."""
+        self.flush()
+        self._chunks.put(None)
+        self._thread.join()
+
+    def _write_chunks(self) -> None:
+        file = None
+        try:
+            file = open(self.path, "ab")
+            while (chunk := self._chunks.get()) is not None:
+                if chunk is _ROTATE:
+                    file.close()
+                    os.replace(self.path, self.path + ROTATED_SUFFIX)
+                    file = open(self.path, "ab")
+                    continue
+                file.write(chunk)
+                file.flush()
+        except OSError as err:
+            self.failed = True
+            _LOGGER.error("RS485 캡처 파일 쓰기 실패, 캡처를 멈춥니다: %s", err)
+            # close() 가 보낼 종료 표시까지 남은 청크를 버립니다.
+            while self._chunks.get() is not None:
+                pass
+        finally:
+            if file is not None:
+                file.close()
+
+
+class CaptureReader:
+    """Iterate a capture file through mmap without reading it into memory."""
+
+    def __init__(self, path: str) -> None:
+        """Open and map the capture file."""
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"빈 캡처 파일입니다: {path}") from None
+        magic, version, self.started_at = _HEADER.unpack_from(self._map)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            self.close()
+            raise ValueError(f"Commax 캡처 파일이 아닙니다: {path}")
+
+    def __enter__(self) -> CaptureReader:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[CapturedFrame]:
+        buffer = self._map
+        end = len(buffer)
+        pos = _HEADER.size
+        elapsed_us = 0
+        while pos < end:
+            try:
+                delta, pos = _decode_varint(buffer, pos)
+                direction = buffer[pos]
+                length, pos = _decode_varint(buffer, pos + 1)
+            except IndexError:
+                # 기록 중이던 마지막 레코드가 잘린 경우
+                return
+            if pos + length > end:
+                return
+            elapsed_us += delta
+            yield CapturedFrame(elapsed_us / 1_000_000, direction, buffer[pos:pos + length])
+            pos += length
+
+    def close(self) -> None:
+        """매핑과 파일을 닫습니다."""
+        self._map.close()
+        self._file.close()
+
+
+async def async_replay(
+    reader: CaptureReader,
+    bus: CommaxBus,
+    speed: float | None = 1.0,
+) -> int:
+    """캡처의 수신 데이터를 버스의 프레임 분리기와 리스너에 흘려 넣습니다.
+
+    speed=1.0 이면 기록된 시간 간격대로, 2.0 이면 두 배 빠르게, None 이면
+    기다리지 않고 최대 속도로 재생합니다. 송신 레코드(이 통합구성요소가
+    보낸 요청)는 건너뜁니다. 재생한 레코드 수를 반환합니다.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    replayed = 0
+    for timestamp, direction, data in reader:
+        if direction != DIRECTION_RX:
+            continue
+        if speed is not None:
+            delay = start + timestamp / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif replayed % 256 == 0:
+            # 최대 속도에서도 다른 작업이 돌 수 있게 가끔 양보합니다.
+            await asyncio.sleep(0)
+        bus.feed(data)
+        replayed += 1
+    return replayed
+
+
+def main() -> None:
+    """Entry point for dumping a capture file."""
+    parser = argparse.ArgumentParser(description="Commax RS485 capture tool")
+    parser.add_argument("command", choices=["dump", "stats"])
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    with CaptureReader(args.path) as reader:
+        if args.command == "dump":
+            for timestamp, direction, data in reader:
+                print(f"{timestamp:12.6f} {DIRECTION_NAMES[direction]} {data.hex().upper()}")
+            return
+
+        counts = {name: [0, 0] for name in DIRECTION_NAMES.values()}
+        duration = 0.0
+        for timestamp, direction, data in reader:
+            counts[DIRECTION_NAMES[direction]][0] += 1
+            counts[DIRECTION_NAMES[direction]][1] += len(data)
+            duration = timestamp
+        print(f"시작: {time.ctime(reader.started_at)}, 길이: {duration:.1f}초")
+        for name, (records, nbytes) in counts.items():
+            print(f"{name}: 레코드 {records}, {nbytes} 바이트")
+
+
+if __name__ == "__main__":
+    main()
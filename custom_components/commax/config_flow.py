@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import socket
 import serial
 import serial.tools.list_ports
 from typing import Any
@@ -19,16 +20,45 @@ from .const import (
     DEFAULT_BAUD_RATE, 
     DEFAULT_TIMEOUT,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_PASSIVE,
+    DEFAULT_TRACE_SPANS,
+    DEFAULT_CAPTURE,
+    DEFAULT_UNAVAILABLE_AFTER,
     CONF_NAME, 
     CONF_PORT,
     CONF_BAUD_RATE,
     CONF_TIMEOUT,
-    CONF_SCAN_INTERVAL
+    CONF_SCAN_INTERVAL,
+    CONF_PASSIVE,
+    CONF_NIGHT_START,
+    CONF_NIGHT_END,
+    CONF_TRACE_SPANS,
+    CONF_CAPTURE,
+    CONF_UNAVAILABLE_AFTER,
+    CONF_SEGMENT_PORT,
+    CONF_SEGMENT_BAUD_RATE,
+    SEGMENTS,
 )
+from .transport import TCP_CONNECT_TIMEOUT, parse_tcp_url
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _segment_schema(user_input: dict[str, Any] | None = None) -> dict:
+    """구간별 포트/통신 속도 항목 (선택, 비우면 기본 포트/속도)."""
+    user_input = user_input or {}
+    schema = {}
+    for segment in SEGMENTS:
+        for key, type_ in (
+            (CONF_SEGMENT_PORT.format(segment), str),
+            (CONF_SEGMENT_BAUD_RATE.format(segment), int),
+        ):
+            schema[
+                vol.Optional(key, description={"suggested_value": user_input.get(key)})
+            ] = type_
+    return schema
+
+
 class CommaxLightingConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Commax Lighting Integration."""
 
@@ -47,10 +77,23 @@ class CommaxLightingConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data_schema=vol.Schema(
                     {
                         vol.Required(CONF_NAME, default=DEFAULT_NAME): str,
-                        vol.Required(CONF_PORT): vol.In(ports) if ports else str,
+                        # 목록에 없는 게이트웨이 주소(tcp://호스트:포트)도 입력할 수 있게 자유 입력
+                        vol.Required(
+                            CONF_PORT,
+                            description={"suggested_value": ports[0] if ports else None},
+                        ): str,
                         vol.Optional(CONF_BAUD_RATE, default=DEFAULT_BAUD_RATE): int,
                         vol.Optional(CONF_TIMEOUT, default=DEFAULT_TIMEOUT): float,
                         vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
+                        vol.Optional(CONF_PASSIVE, default=DEFAULT_PASSIVE): bool,
+                        vol.Optional(CONF_NIGHT_START): vol.All(int, vol.Range(min=0, max=23)),
+                        vol.Optional(CONF_NIGHT_END): vol.All(int, vol.Range(min=0, max=23)),
+                        vol.Optional(CONF_TRACE_SPANS, default=DEFAULT_TRACE_SPANS): bool,
+                        vol.Optional(CONF_CAPTURE, default=DEFAULT_CAPTURE): bool,
+                        vol.Optional(
+                            CONF_UNAVAILABLE_AFTER, default=DEFAULT_UNAVAILABLE_AFTER
+                        ): vol.All(int, vol.Range(min=1)),
+                        **_segment_schema(),
                     }
                 ),
                 description_placeholders={
@@ -58,11 +101,15 @@ class CommaxLightingConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 }
             )
 
-        # 시리얼 포트 연결 테스트
+        # 시리얼 포트 연결 테스트 (구간별로 지정한 포트 포함)
+        ports = [user_input[CONF_PORT]]
+        for segment in SEGMENTS:
+            port = user_input.get(CONF_SEGMENT_PORT.format(segment))
+            if port and port not in ports:
+                ports.append(port)
         try:
-            await self.hass.async_add_executor_job(
-                self._test_serial_connection, user_input[CONF_PORT]
-            )
+            for port in ports:
+                await self.hass.async_add_executor_job(self._test_serial_connection, port)
         except Exception as ex:
             return self.async_show_form(
                 step_id="user",
@@ -73,6 +120,22 @@ class CommaxLightingConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         vol.Optional(CONF_BAUD_RATE, default=user_input[CONF_BAUD_RATE]): int,
                         vol.Optional(CONF_TIMEOUT, default=user_input[CONF_TIMEOUT]): float,
                         vol.Optional(CONF_SCAN_INTERVAL, default=user_input[CONF_SCAN_INTERVAL]): int,
+                        vol.Optional(CONF_PASSIVE, default=user_input.get(CONF_PASSIVE, DEFAULT_PASSIVE)): bool,
+                        vol.Optional(
+                            CONF_NIGHT_START,
+                            description={"suggested_value": user_input.get(CONF_NIGHT_START)},
+                        ): vol.All(int, vol.Range(min=0, max=23)),
+                        vol.Optional(
+                            CONF_NIGHT_END,
+                            description={"suggested_value": user_input.get(CONF_NIGHT_END)},
+                        ): vol.All(int, vol.Range(min=0, max=23)),
+                        vol.Optional(CONF_TRACE_SPANS, default=user_input.get(CONF_TRACE_SPANS, DEFAULT_TRACE_SPANS)): bool,
+                        vol.Optional(CONF_CAPTURE, default=user_input.get(CONF_CAPTURE, DEFAULT_CAPTURE)): bool,
+                        vol.Optional(
+                            CONF_UNAVAILABLE_AFTER,
+                            default=user_input.get(CONF_UNAVAILABLE_AFTER, DEFAULT_UNAVAILABLE_AFTER),
+                        ): vol.All(int, vol.Range(min=1)),
+                        **_segment_schema(user_input),
                     }
                 ),
                 errors={"base": f"시리얼 포트 연결 실패: {str(ex)}"}
@@ -91,8 +154,11 @@ class CommaxLightingConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return ports
 
     def _test_serial_connection(self, port: str) -> None:
-        """시리얼 포트 연결을 테스트합니다."""
+        """시리얼 포트(또는 TCP 게이트웨이) 연결을 테스트합니다."""
         try:
+            if (address := parse_tcp_url(port)) is not None:
+                socket.create_connection(address, timeout=TCP_CONNECT_TIMEOUT).close()
+                return
             ser = serial.Serial(
                 port=port,
                 baudrate=DEFAULT_BAUD_RATE,
@@ -0,0 +1,564 @@
+"""Data update coordinator for Commax Integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .bus import PRIORITY_POLL, CommaxBus
+from .const import (
+    DOMAIN,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    CONF_PASSIVE,
+    DEFAULT_PASSIVE,
+    CONF_NIGHT_START,
+    CONF_NIGHT_END,
+    CONF_UNAVAILABLE_AFTER,
+    DEFAULT_UNAVAILABLE_AFTER,
+    UNAVAILABLE_MISSED_POLLS,
+    PROBE_INTERVAL,
+    BOILER_POLL_MAX_INTERVAL,
+    MASTER_POLL_MAX_INTERVAL,
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+    MASTER_DOMAIN,
+    LIGHT_STATUS_RESPONSE_HEADER,
+    LIGHT_CONTROL_RESPONSE_HEADER,
+    BOILER_STATUS_RESPONSE_HEADER,
+    BOILER_CONTROL_RESPONSE_HEADER,
+    MASTER_STATUS_RESPONSE_HEADER,
+    MASTER_CONTROL_RESPONSE_HEADER,
+    MASTER_ADDRESS,
+    SEGMENT_LIGHT,
+    SEGMENT_BOILER,
+    SEGMENTS,
+)
+from .codec import (
+    LIGHT_QUERY_FRAMES,
+    BOILER_QUERY_FRAMES,
+    MASTER_QUERY_FRAME,
+    encode_light_query,
+    encode_light_power,
+    encode_boiler_query,
+    encode_master_power,
+    decode_light_status,
+    decode_boiler_status,
+    decode_master_status,
+)
+from .scheduler import PollScheduler
+from .watchdog import HealthWatchdog
+
+_LOGGER = logging.getLogger(__name__)
+
+# 조회 대상 도메인이 연결된 버스 구간
+_QUERY_SEGMENTS = {
+    LIGHTING_DOMAIN: SEGMENT_LIGHT,
+    BOILER_DOMAIN: SEGMENT_BOILER,
+    MASTER_DOMAIN: SEGMENT_LIGHT,
+}
+
+
+def all_off_achieves(
+    requests: dict[int, bool], states: dict[int, bool], lights: Iterable[int]
+) -> bool:
+    """일괄소등 프레임 하나로 요청한 조명 상태를 만들 수 있는지 판단합니다.
+
+    요청이 모두 끄기이고, 요청하지 않은 조명도 이미 꺼져 있다고 알려져
+    있으며, 실제로 꺼야 하는 조명이 두 개 이상일 때만 참입니다 (하나면
+    개별 프레임도 한 개이므로 일괄소등 상태를 건드리지 않습니다).
+    """
+    if any(requests.values()):
+        return False
+    to_switch = 0
+    for number in lights:
+        if number in requests:
+            to_switch += states.get(number) is not False
+        elif states.get(number) is not False:
+            return False
+    return to_switch >= 2
+
+
+class CommaxCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Coordinate the Commax poll cycle for one config entry.
+
+    기기마다 PollScheduler 가 정한 시각에 조명, 보일러, 일괄소등 상태를
+    조회합니다. 상태가 바뀌었거나 명령을 보낸 기기는 빠르게, 변화가 없는
+    기기는 점점 느리게 조회합니다. 응답은 버스 리스너를 통해 상태
+    캐시(data)에 반영되며, 엔티티는 캐시만 읽습니다.
+
+    기기 종류마다 다른 버스(구간)에 연결될 수 있습니다. bus 는 조명 구간의
+    버스이며, 다른 구간은 bus_for() 로 찾습니다. 조회는 각 구간의 버스로
+    나뉘어 구간마다 병렬로 전송됩니다.
+
+    watchdog 은 기기마다 마지막 응답을 기록합니다. 조회에 계속 응답하지
+    않는 기기와 연결이 끊긴 버스의 기기는 사용 불가로 표시되고, 다시
+    응답할 때까지 PROBE_INTERVAL 간격으로만 조회됩니다.
+
+    수동 모드(passive)에서는 아무것도 조회하지 않습니다. 월패드가 스스로
+    주고받는 B0/82/A0 응답만으로 캐시를 채우며, scan_interval 마다 포트가
+    열려 있는지만 확인합니다. 버스에는 사용자 명령만 전송됩니다.
+
+    data 구조::
+
+        {
+            "lighting": {조명번호: bool},
+            "boiler": {방번호: {"state", "current_temp", "set_temp"}},
+            "master": bool | None,
+        }
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        bus: CommaxBus,
+        lights: Iterable[int] | None = None,
+        boilers: Iterable[int] | None = None,
+        buses: Mapping[str, CommaxBus] | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        scan_interval = bus.config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        passive = bus.config.get(CONF_PASSIVE, DEFAULT_PASSIVE)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            # 능동 모드의 조회 시각은 스케줄러가 정하므로 HA 타이머를 쓰지 않습니다.
+            update_interval=timedelta(seconds=scan_interval) if passive else None,
+        )
+        self.bus = bus
+        # 구간 -> 버스 (지정하지 않은 구간은 조명 구간의 버스를 씁니다)
+        self._segment_buses: dict[str, CommaxBus] = {
+            segment: (buses or {}).get(segment, bus) for segment in SEGMENTS
+        }
+        # 서로 다른 버스 목록 (조명 구간의 버스가 처음)
+        self.buses: list[CommaxBus] = list(dict.fromkeys([bus, *self._segment_buses.values()]))
+        self.passive: bool = passive
+        # 실제로 있는 기기 (탐색 결과, 없으면 패킷 표의 기본 구성)
+        self.lights: list[int] = sorted(
+            lights if lights is not None else range(1, len(LIGHT_QUERY_FRAMES) + 1)
+        )
+        self.boilers: list[int] = sorted(
+            boilers if boilers is not None else range(1, len(BOILER_QUERY_FRAMES) + 1)
+        )
+        self.data = {
+            LIGHTING_DOMAIN: {},
+            BOILER_DOMAIN: {},
+            MASTER_DOMAIN: None,
+        }
+
+        # (도메인, 주소) -> (조회 프레임, 응답 헤더, 주소)
+        self._queries: dict[tuple[str, int], tuple[bytes, int, int]] = {
+            **{
+                (LIGHTING_DOMAIN, n): (encode_light_query(n), LIGHT_STATUS_RESPONSE_HEADER, n)
+                for n in self.lights
+            },
+            **{
+                (BOILER_DOMAIN, room): (
+                    encode_boiler_query(room), BOILER_STATUS_RESPONSE_HEADER, room
+                )
+                for room in self.boilers
+            },
+            (MASTER_DOMAIN, MASTER_ADDRESS): (
+                MASTER_QUERY_FRAME, MASTER_STATUS_RESPONSE_HEADER, MASTER_ADDRESS
+            ),
+        }
+        max_intervals = {
+            LIGHTING_DOMAIN: scan_interval,
+            BOILER_DOMAIN: max(scan_interval, BOILER_POLL_MAX_INTERVAL),
+            MASTER_DOMAIN: max(scan_interval, MASTER_POLL_MAX_INTERVAL),
+        }
+        night_hours = None
+        if CONF_NIGHT_START in bus.config and CONF_NIGHT_END in bus.config:
+            night_hours = (bus.config[CONF_NIGHT_START], bus.config[CONF_NIGHT_END])
+        self.scheduler = PollScheduler(
+            {key: max_intervals[key[0]] for key in self._queries}, night_hours
+        )
+        self.watchdog = HealthWatchdog(
+            bus.config.get(CONF_UNAVAILABLE_AFTER, DEFAULT_UNAVAILABLE_AFTER),
+            missed_polls=0 if passive else UNAVAILABLE_MISSED_POLLS,
+        )
+        # 버스 프레임으로 확인된 마지막 상태 (명령 후 낙관적 갱신은 포함하지 않음)
+        self._confirmed: dict[tuple[str, int], Any] = {}
+        # 같은 순간에 들어온 조명 명령 (조명번호 -> 켜짐)과 이를 보낼 작업
+        self._light_requests: dict[int, bool] = {}
+        self._light_batch: asyncio.Task | None = None
+        self._start_task: asyncio.Task | None = None
+        self._poll_task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+        self._remove_listeners = [
+            bus.async_add_listener(
+                (LIGHT_STATUS_RESPONSE_HEADER, LIGHT_CONTROL_RESPONSE_HEADER),
+                self._handle_light_frame,
+            ),
+            self.bus_for(SEGMENT_BOILER).async_add_listener(
+                (BOILER_STATUS_RESPONSE_HEADER, BOILER_CONTROL_RESPONSE_HEADER),
+                self._handle_boiler_frame,
+            ),
+            bus.async_add_listener(
+                (MASTER_STATUS_RESPONSE_HEADER, MASTER_CONTROL_RESPONSE_HEADER),
+                self._handle_master_frame,
+            ),
+        ]
+
+    @callback
+    def bus_for(self, segment: str) -> CommaxBus:
+        """구간(SEGMENT_*)에 연결된 버스를 반환합니다."""
+        return self._segment_buses[segment]
+
+    @callback
+    def device_available(self, domain: str, key: int) -> bool:
+        """기기가 응답하고 있고 그 구간의 버스가 끊겨 있지 않으면 True 를 반환합니다."""
+        return not self.bus_for(
+            _QUERY_SEGMENTS[domain]
+        ).supervisor.is_open and self.watchdog.available((domain, key))
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """조회 시각이 된 기기의 상태를 조회합니다.
+
+        각 조회는 해당 기기의 응답이 파싱되는 즉시 다음 조회로 넘어가며,
+        응답이 없으면 버스의 응답 제한 시간(CONF_TIMEOUT) 후 넘어갑니다.
+        조회는 낮은 우선순위(PRIORITY_POLL)로 전송됩니다.
+        처음 호출되면 모든 기기가 조회 대상입니다.
+        """
+        if self.passive:
+            for bus in self.buses:
+                try:
+                    await bus.async_connect()
+                except Exception as e:
+                    raise UpdateFailed(f"RS485 버스 {bus.port} 연결 실패: {e}") from e
+            self._check_health()
+            return self.data
+
+        # 조회 시각이 된 기기를 한꺼번에 송신 대기열에 넣습니다. 대기열이
+        # 순서대로 전송하며, 그 사이 들어온 사용자 명령은 앞쪽에 끼어듭니다.
+        keys = self.scheduler.due()
+        for key in keys:
+            # 버스가 끊긴 동안에는 기기 탓이 아니므로 느린 확인 조회로 돌리지 않습니다.
+            outage = self.bus_for(_QUERY_SEGMENTS[key[0]]).supervisor.is_open
+            self.scheduler.polled(key, probe=not outage and not self.watchdog.available(key))
+        results = await asyncio.gather(
+            *(
+                self.bus_for(_QUERY_SEGMENTS[key[0]]).async_request(
+                    *self._queries[key], priority=PRIORITY_POLL
+                )
+                for key in keys
+            ),
+            return_exceptions=True,
+        )
+        failures = 0
+        last_error: Exception | None = None
+        for key, result in zip(keys, results):
+            if result is None:
+                self.watchdog.missed(key)
+            elif isinstance(result, Exception):
+                # 전송 실패(버스 끊김 등)는 기기가 응답하지 않은 것이 아닙니다.
+                failures += 1
+                last_error = result
+                _LOGGER.debug("상태 조회 실패 %s: %s", key, result)
+        self._check_health()
+
+        if keys and failures == len(keys):
+            ports = ", ".join(bus.port for bus in self.buses)
+            raise UpdateFailed(f"RS485 버스 {ports} 상태 조회 실패: {last_error}")
+
+        return self.data
+
+    @callback
+    def async_start(self, discover: Callable[[], Awaitable[None]] | None = None) -> None:
+        """모든 버스를 동시에 열고, discover 를 기다린 뒤 조회를 시작하는 백그라운드 작업을 만듭니다.
+
+        연결(TCP 게이트웨이는 최대 TCP_CONNECT_TIMEOUT)을 기다리지 않고 바로
+        반환하므로 HA 시작이 막히지 않습니다. 열리지 않은 버스는 감독자가
+        백그라운드에서 다시 연결합니다.
+        """
+        if self._start_task is not None:
+            return
+        self._start_task = self.hass.async_create_background_task(
+            self._async_start(discover), name=f"{DOMAIN} start {self.bus.port}"
+        )
+
+    async def _async_start(self, discover: Callable[[], Awaitable[None]] | None) -> None:
+        await asyncio.gather(*(bus.async_start() for bus in self.buses))
+        if discover is not None:
+            await discover()
+        self.async_start_polling()
+
+    @callback
+    def async_start_polling(self) -> None:
+        """스케줄러에 따라 조회하는 백그라운드 작업을 시작합니다."""
+        if self.passive or self._poll_task is not None:
+            return
+        self._poll_task = self.hass.async_create_background_task(
+            self._async_poll_loop(), name=f"{DOMAIN} poll {self.bus.port}"
+        )
+
+    async def _async_poll_loop(self) -> None:
+        """첫 전체 조회 후, 다음 조회 시각까지 기다렸다가 조회를 반복합니다."""
+        started = time.monotonic()
+        await self.async_refresh()
+        _LOGGER.debug(
+            "%s 첫 전체 조회 완료: %.1f ms",
+            self.bus.port,
+            (time.monotonic() - started) * 1000,
+        )
+        while True:
+            self._wakeup.clear()
+            try:
+                async with asyncio.timeout(self.scheduler.next_delay()):
+                    await self._wakeup.wait()
+            except asyncio.TimeoutError:
+                pass
+            if self.scheduler.due():
+                await self.async_refresh()
+
+    async def async_close(self) -> None:
+        """조회를 멈추고 버스 리스너를 해제한 뒤 모든 버스를 닫습니다."""
+        if self._start_task is not None:
+            # 연결 중이면 연결 시도도 함께 취소됩니다.
+            self._start_task.cancel()
+            try:
+                await self._start_task
+            except asyncio.CancelledError:
+                pass
+            self._start_task = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+        if self._light_batch is not None:
+            # 아직 모으는 중인 조명 명령은 보내지 않습니다 (보내는 중인 명령은 버스가 실패로 끝냄).
+            self._light_batch.cancel()
+            try:
+                await self._light_batch
+            except asyncio.CancelledError:
+                pass
+            self._light_batch = None
+            self._light_requests.clear()
+        for remove in self._remove_listeners:
+            remove()
+        self._remove_listeners.clear()
+        for bus in self.buses:
+            await bus.async_close()
+
+    @callback
+    def confirmed(self, domain: str, key: int) -> Any:
+        """월패드 응답으로 확인된 마지막 상태를 반환합니다 (없으면 None).
+
+        조명과 일괄소등은 bool, 보일러는 상태 dict 입니다.
+        """
+        return self._confirmed.get((domain, key))
+
+    @callback
+    def light_command_pending(self, number: int) -> bool:
+        """아직 보내지 않았거나 전송 중인 조명 켜기/끄기 명령이 있으면 True 를 반환합니다."""
+        return number in self._light_requests or self.bus.has_pending(
+            (LIGHTING_DOMAIN, number, "power")
+        )
+
+    async def async_set_light_power(self, number: int, is_on: bool) -> None:
+        """조명 켜기/끄기 명령을 보내고 상태 캐시를 갱신합니다.
+
+        그룹이나 장면처럼 같은 이벤트 루프 순회에 들어온 명령은 한꺼번에
+        계획합니다. 모든 조명을 끄는 경우라면 조명별 프레임 대신 일괄소등
+        프레임 하나를 보냅니다.
+        """
+        self._light_requests[number] = is_on
+        if self._light_batch is None:
+            self._light_batch = self.hass.async_create_task(
+                self._async_send_light_requests(), f"{DOMAIN} light batch"
+            )
+        await asyncio.shield(self._light_batch)
+
+    async def _async_send_light_requests(self) -> None:
+        """모인 조명 명령을 일괄소등 하나 또는 조명별 프레임으로 보냅니다."""
+        # 같은 순회에서 실행을 기다리는 다른 엔티티의 명령이 먼저 들어오게 합니다.
+        await asyncio.sleep(0)
+        requests, self._light_requests = self._light_requests, {}
+        self._light_batch = None
+
+        if all_off_achieves(requests, self.data[LIGHTING_DOMAIN], self.lights):
+            _LOGGER.debug("조명 %s 끄기를 일괄소등 한 프레임으로 전송", sorted(requests))
+            try:
+                await self.bus.async_request(
+                    encode_master_power(False),
+                    MASTER_CONTROL_RESPONSE_HEADER,
+                    MASTER_ADDRESS,
+                    coalesce_key=(MASTER_DOMAIN, MASTER_ADDRESS, "power"),
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                _LOGGER.error("일괄소등 명령 전송 실패: %s", e)
+            self.async_set_master(False)
+            return
+
+        await asyncio.gather(
+            *(self._async_send_light(number, is_on) for number, is_on in requests.items())
+        )
+
+    async def _async_send_light(self, number: int, is_on: bool) -> None:
+        """조명 하나의 켜기/끄기 프레임을 보냅니다.
+
+        아직 전송되지 않은 이전 켜기/끄기 명령은 이 명령으로 대체됩니다.
+        """
+        packet = encode_light_power(number, is_on)
+        try:
+            await self.bus.async_request(
+                packet,
+                LIGHT_CONTROL_RESPONSE_HEADER,
+                number,
+                coalesce_key=(LIGHTING_DOMAIN, number, "power"),
+            )
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("조명 %s 명령 전송: %s", number, packet.hex().upper())
+        except Exception as e:  # pylint: disable=broad-except
+            _LOGGER.error("조명 %s 명령 전송 실패: %s", number, e)
+        self.async_set_light(number, is_on)
+
+    @callback
+    def async_set_light(self, number: int, is_on: bool) -> None:
+        """명령 전송 후 조명 상태 캐시를 갱신합니다."""
+        self._async_update_cache(LIGHTING_DOMAIN, number, is_on)
+        if is_on:
+            self._async_update_master(True)
+        self._async_commanded([(LIGHTING_DOMAIN, number)])
+
+    @callback
+    def async_set_boiler(self, room: int, **changes: Any) -> None:
+        """명령 전송 후 보일러 상태 캐시를 갱신합니다."""
+        status = dict(self.data[BOILER_DOMAIN].get(room) or {})
+        status.update(changes)
+        self._async_update_cache(BOILER_DOMAIN, room, status)
+        self._async_commanded([(BOILER_DOMAIN, room)])
+
+    @callback
+    def async_set_master(self, is_on: bool) -> None:
+        """명령 전송 후 일괄소등 상태 캐시를 갱신합니다."""
+        self._async_update_master(is_on)
+        # 일괄소등은 모든 조명 상태를 바꿉니다.
+        self._async_commanded(
+            key for key in self._queries if key[0] in (LIGHTING_DOMAIN, MASTER_DOMAIN)
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """엔티티 상태를 기록하고, 응답 처리 중이면 그 시각을 요청 Span 에 찍습니다."""
+        super().async_update_listeners()
+        for bus in self.buses:
+            bus.tracer.state_written()
+
+    @callback
+    def _async_commanded(self, keys: Iterable[tuple[str, int]]) -> None:
+        """명령을 보낸 기기를 곧바로 다시 조회하도록 스케줄러를 깨웁니다."""
+        if self.passive:
+            return
+        self.scheduler.commanded(keys)
+        self._wakeup.set()
+
+    @callback
+    def _check_health(self) -> None:
+        """오래 응답하지 않은 기기를 사용 불가로 표시합니다 (엔티티는 조회 후 갱신)."""
+        expired = self.watchdog.check(self._queries)
+        if expired:
+            _LOGGER.warning(
+                "%s초 이상 응답이 없는 기기를 사용 불가로 표시하고 %s초마다 확인합니다: %s",
+                self.watchdog.silence,
+                PROBE_INTERVAL,
+                ", ".join(f"{domain} {key}" for domain, key in expired),
+            )
+
+    @callback
+    def _async_observed(self, key: tuple[str, int], changed: bool) -> None:
+        """기기 응답을 스케줄러와 watchdog 에 알립니다."""
+        self.scheduler.observed(key, changed)
+        if self.watchdog.seen(key):
+            _LOGGER.info("%s %s 다시 응답: 사용 가능", *key)
+            if not changed:
+                self.async_update_listeners()
+
+    @callback
+    def _async_update_cache(self, domain: str, key: int, value: Any) -> bool:
+        """캐시 값이 바뀐 경우에만 엔티티에 알리고 변경 여부를 반환합니다."""
+        if self.data[domain].get(key) == value:
+            return False
+        self.data[domain][key] = value
+        self.async_update_listeners()
+        return True
+
+    @callback
+    def _async_update_master(self, is_on: bool, lights_off: bool = True) -> bool:
+        """일괄소등 캐시 값이 바뀐 경우에만 엔티티에 알리고 변경 여부를 반환합니다.
+
+        일괄소등이 걸리면(False) 모든 조명이 꺼지므로 lights_off 이면 조명
+        캐시도 함께 끕니다. 조회를 기다리지 않고 모든 엔티티가 한 번에
+        맞춰집니다.
+        """
+        changed = self.data[MASTER_DOMAIN] != is_on
+        self.data[MASTER_DOMAIN] = is_on
+        lights = self.data[LIGHTING_DOMAIN]
+        if not is_on and lights_off and any(lights.get(n) is not False for n in self.lights):
+            lights.update(dict.fromkeys(self.lights, False))
+            self.async_update_listeners()
+        elif changed:
+            self.async_update_listeners()
+        return changed
+
+    @callback
+    def _handle_light_frame(self, frame: bytes) -> None:
+        """조명 응답(B0/B1 + 상태 + 조명번호)을 캐시에 반영합니다."""
+        status = decode_light_status(frame)
+        if status is None:
+            return
+        number, is_on = status
+        self._confirmed[(LIGHTING_DOMAIN, number)] = is_on
+        changed = self._async_update_cache(LIGHTING_DOMAIN, number, is_on)
+        self._async_observed((LIGHTING_DOMAIN, number), changed)
+        # 켜진 조명이 있으면 일괄소등은 풀린 상태입니다 (캐시만, 확인 아님).
+        if is_on:
+            self._async_update_master(True)
+
+    @callback
+    def _handle_boiler_frame(self, frame: bytes) -> None:
+        """보일러 상태/제어 응답을 캐시에 반영합니다."""
+        status = decode_boiler_status(frame)
+        if status is None:
+            return
+        value = {
+            'state': status.state,
+            'current_temp': status.current_temp,
+            'set_temp': status.set_temp,
+        }
+        self._confirmed[(BOILER_DOMAIN, status.room)] = dict(value)
+        changed = self._async_update_cache(BOILER_DOMAIN, status.room, value)
+        self._async_observed((BOILER_DOMAIN, status.room), changed)
+
+    @callback
+    def _handle_master_frame(self, frame: bytes) -> None:
+        """일괄소등 상태/제어 응답을 캐시에 반영합니다.
+
+        일괄소등 제어 응답이나 상태 응답이 꺼짐으로 바뀐 것을 보면 모든
+        조명이 꺼진 것으로 확인합니다. 이미 꺼짐인 상태 응답이 반복될 때는
+        그 사이 벽 스위치로 켠 조명이 있을 수 있어 조명 상태를 건드리지 않습니다.
+        """
+        status = decode_master_status(frame)
+        if status is None:
+            return
+        key = (MASTER_DOMAIN, MASTER_ADDRESS)
+        lights_off = not status and (
+            frame[0] == MASTER_CONTROL_RESPONSE_HEADER or self._confirmed.get(key) is not False
+        )
+        if lights_off:
+            for number in self.lights:
+                self._confirmed[(LIGHTING_DOMAIN, number)] = False
+        self._confirmed[key] = status
+        changed = self._async_update_master(status, lights_off)
+        self._async_observed(key, changed)
@@ -0,0 +1,53 @@
+"""Diagnostics support for Commax Integration."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .bus import CommaxBus
+from .const import DOMAIN, SEGMENTS
+from .coordinator import CommaxCoordinator
+
+
+def _bus_diagnostics(bus: CommaxBus) -> dict[str, Any]:
+    """버스 하나의 연결 상태, 통계, 지연 히스토그램을 반환합니다."""
+    return {
+        "port": bus.port,
+        "connected": bus.connected,
+        "connection": bus.supervisor.as_dict(),
+        "last_frame_age": None
+        if bus.last_frame is None
+        else round(time.monotonic() - bus.last_frame, 1),
+        "stats": bus.stats.as_dict(),
+        "latency_histograms": bus.tracer.as_dict(),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    요청할 때만 링 버퍼와 카운터를 읽어 변환하므로 평소 비용은 없습니다.
+    """
+    coordinator: CommaxCoordinator = hass.data[DOMAIN][entry.entry_id]
+    bus = coordinator.bus
+
+    return {
+        "config": dict(entry.data),
+        "passive": coordinator.passive,
+        "cache": coordinator.data,
+        "unavailable": sorted(f"{domain} {key}" for domain, key in coordinator.watchdog.unavailable),
+        "segments": {segment: coordinator.bus_for(segment).port for segment in SEGMENTS},
+        "bus": _bus_diagnostics(bus),
+        "frames": bus.frames.as_list(),
+        # 조명 구간과 다른 포트를 쓰는 구간의 버스
+        "segment_buses": [
+            {**_bus_diagnostics(other), "frames": other.frames.as_list()}
+            for other in coordinator.buses
+            if other is not bus
+        ],
+    }
@@ -0,0 +1,105 @@
+"""Streaming frame decoder for the Commax RS485 protocol."""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# 조명/보일러/일괄소등 프레임: 8바이트, data[7] = sum(data[:7]) & 0xFF
+FRAME_LENGTH = 8
+
+# 도어벨 프레임 규격: 헤더 -> (길이, 체크섬 계산 시작 위치)
+# 마지막 바이트는 ETX(0x03), 그 앞 바이트가 체크섬입니다.
+#   10 01 09 12 ... 5A 03          (15바이트, 벨 울림)
+#   02 12 01 09 ... B2 03          (16바이트, 통화 종료/문열기, STX 제외 합)
+DOORBELL_FRAME_SPECS: dict[int, tuple[int, int]] = {
+    0x10: (15, 0),
+    0x02: (16, 1),
+}
+DOORBELL_ETX = 0x03
+
+
+class CommaxFramer:
+    """Byte-stream framer for Commax frames.
+
+    임의로 나뉘거나 합쳐져 들어오는 바이트를 이어 붙여 완전한 프레임만
+    콜백으로 전달합니다. 체크섬이 맞지 않으면 한 바이트씩 버리면서
+    다음 프레임 경계를 다시 찾습니다.
+    """
+
+    def __init__(self, on_frame: Callable[[bytes], None]) -> None:
+        """Initialize the framer."""
+        self._on_frame = on_frame
+        self._buffer = bytearray()
+        self._resyncing = False
+        self.dropped_bytes = 0
+        # 재동기화를 시작한 횟수 (깨진 프레임 수)
+        self.checksum_errors = 0
+
+    def feed(self, data: bytes) -> None:
+        """수신 바이트를 넣고 완성된 프레임을 모두 전달합니다."""
+        buffer = self._buffer
+        buffer += data
+        pos = 0
+
+        while pos < len(buffer):
+            length = self._match(buffer, pos)
+            if length == 0:
+                # 프레임이 아직 다 들어오지 않았습니다. 다만 도어벨 머리(0x02/0x10)처럼
+                # 보이는 떠도는 바이트 뒤에 완전한 8바이트 프레임이 이미 들어와 있으면,
+                # 긴 도어벨 프레임을 기다리느라 그 응답을 붙잡아 두지 않고 재동기화합니다.
+                if not self._frame_at_end(buffer, pos):
+                    break
+                length = -1
+            if length < 0:
+                # 체크섬 불일치: 한 바이트 버리고 재동기화합니다.
+                if not self._resyncing:
+                    self._resyncing = True
+                    self.checksum_errors += 1
+                pos += 1
+                self.dropped_bytes += 1
+                continue
+            frame = bytes(buffer[pos:pos + length])
+            pos += length
+            self._resyncing = False
+            self._on_frame(frame)
+
+        del buffer[:pos]
+
+    def reset(self) -> None:
+        """버퍼에 남은 미완성 데이터를 버립니다."""
+        self._buffer.clear()
+        self._resyncing = False
+
+    @staticmethod
+    def _frame_at_end(buffer: bytearray, pos: int) -> bool:
+        """pos 뒤, 버퍼 끝에 체크섬이 맞는 8바이트 프레임이 있으면 True 를 반환합니다."""
+        start = len(buffer) - FRAME_LENGTH
+        return start > pos and sum(buffer[start:start + 7]) & 0xFF == buffer[start + 7]
+
+    @staticmethod
+    def _match(buffer: bytearray, pos: int) -> int:
+        """pos 위치의 프레임 길이를 반환합니다 (0: 데이터 부족, -1: 불일치)."""
+        available = len(buffer) - pos
+        need_more = False
+
+        if available >= FRAME_LENGTH:
+            if sum(buffer[pos:pos + 7]) & 0xFF == buffer[pos + 7]:
+                return FRAME_LENGTH
+        else:
+            need_more = True
+
+        spec = DOORBELL_FRAME_SPECS.get(buffer[pos])
+        if spec is not None:
+            length, start = spec
+            if available < length:
+                need_more = True
+            elif (
+                buffer[pos + length - 1] == DOORBELL_ETX
+                and sum(buffer[pos + start:pos + length - 2]) & 0xFF
+                == buffer[pos + length - 2]
+            ):
+                return length
+
+        return 0 if need_more else -1
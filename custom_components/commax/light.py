@@ -2,34 +2,25 @@
 from __future__ import annotations
 
 import logging
-import serial
-import asyncio
-from datetime import datetime
 from typing import Any
 
 from homeassistant.components.light import (
     LightEntity,
     ColorMode,
-    ATTR_BRIGHTNESS,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_ON, STATE_OFF
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.typing import StateType
-from homeassistant.const import CONF_NAME
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
-    CONF_PORT,
-    CONF_BAUD_RATE,
-    CONF_TIMEOUT,
-    STATUS_QUERY_PACKETS,
-    LIGHT_ON_PACKETS,
-    LIGHT_OFF_PACKETS,
-    STATUS_ON_PREFIX,
-    STATUS_OFF_PREFIX,
+    LIGHTING_DOMAIN,
     LIGHT_NAMES,
 )
+from .coordinator import CommaxCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,44 +31,37 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Commax Lighting platform."""
-    config = hass.data[DOMAIN][config_entry.entry_id]
-    
-    # 5개의 조명 엔티티 생성
+    coordinator: CommaxCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    # 탐색으로 찾은 조명만 생성
     lights = []
-    for i in range(5):
+    for number in coordinator.lights:
+        i = number - 1
         light = CommaxLight(
-            hass,
-            config,
+            coordinator,
             i,
             LIGHT_NAMES[i] if i < len(LIGHT_NAMES) else f"조명 {i+1}"
         )
         lights.append(light)
-    
-    async_add_entities(lights, True)
+
+    async_add_entities(lights)
 
 
-class CommaxLight(LightEntity):
+class CommaxLight(CoordinatorEntity[CommaxCoordinator], LightEntity, RestoreEntity):
     """Representation of a Commax Light."""
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any], light_index: int, name: str) -> None:
+    def __init__(self, coordinator: CommaxCoordinator, light_index: int, name: str) -> None:
         """Initialize the light."""
-        self.hass = hass
-        self.config = config
+        super().__init__(coordinator)
         self.light_index = light_index
+        self.light_number = light_index + 1
         self._attr_name = name
         self._attr_unique_id = f"{DOMAIN}_light_{light_index + 1}"
         self._attr_is_on = False
         self._attr_color_mode = ColorMode.ONOFF
         self._attr_supported_color_modes = {ColorMode.ONOFF}
-        
-        # 시리얼 통신 관련
-        self._serial_port = None
-        self._serial_lock = asyncio.Lock()
-        
-        # 상태 조회 관련
-        self._last_status_check = None
-        self._status_check_interval = config.get("scan_interval", 1)
-        
+        self._update_from_cache()
+
         _LOGGER.info(f"Commax Light {name} (index: {light_index}) 초기화 완료")
 
     @property
@@ -90,99 +74,55 @@ class CommaxLight(LightEntity):
         """Return true if light is on."""
         return self._attr_is_on
 
+    @property
+    def available(self) -> bool:
+        """조명이 월패드 조회에 응답하고 있으면 사용 가능합니다."""
+        return super().available and self.coordinator.device_available(
+            LIGHTING_DOMAIN, self.light_number
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """첫 조회 응답 전까지는 마지막으로 기록된 상태를 표시합니다."""
+        await super().async_added_to_hass()
+        if self.coordinator.data[LIGHTING_DOMAIN].get(self.light_number) is not None:
+            return
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.state in (STATE_ON, STATE_OFF):
+            self._attr_is_on = last_state.state == STATE_ON
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
-        await self._send_command(LIGHT_ON_PACKETS[self.light_index])
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        await self._async_set_power(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        await self._send_command(LIGHT_OFF_PACKETS[self.light_index])
-        self._attr_is_on = False
-        self.async_write_ha_state()
-
-    async def _send_command(self, packet: str) -> None:
-        """시리얼 포트로 명령을 전송합니다."""
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    # HEX 문자열을 바이트로 변환
-                    data = bytes.fromhex(packet)
-                    self._serial_port.write(data)
-                    _LOGGER.debug(f"조명 {self.light_index + 1} 명령 전송: {packet}")
-                    
-                    # 응답 대기
-                    await asyncio.sleep(0.075)  # 75ms 대기
-                    
-            except Exception as e:
-                _LOGGER.error(f"조명 {self.light_index + 1} 명령 전송 실패: {e}")
-                await self._reconnect_serial()
-
-    async def _connect_serial(self) -> None:
-        """시리얼 포트에 연결합니다."""
-        try:
-            self._serial_port = serial.Serial(
-                port=self.config[CONF_PORT],
-                baudrate=self.config[CONF_BAUD_RATE],
-                timeout=self.config[CONF_TIMEOUT],
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE
-            )
-            _LOGGER.info(f"시리얼 포트 {self.config[CONF_PORT]} 연결 성공")
-        except Exception as e:
-            _LOGGER.error(f"시리얼 포트 연결 실패: {e}")
-            self._serial_port = None
-
-    async def _reconnect_serial(self) -> None:
-        """시리얼 포트를 재연결합니다."""
-        if self._serial_port:
-            self._serial_port.close()
-            self._serial_port = None
-        await self._connect_serial()
-
-    async def async_update(self) -> None:
-        """조명 상태를 업데이트합니다."""
-        # 상태 조회 간격 체크
-        now = datetime.now()
-        if (self._last_status_check and 
-            (now - self._last_status_check).total_seconds() < self._status_check_interval):
+        await self._async_set_power(False)
+
+    async def _async_set_power(self, is_on: bool) -> None:
+        """확인된 상태와 다를 때만 켜기/끄기 명령을 전송합니다.
+
+        대기 중인 다른 켜기/끄기 명령이 있으면 생략하지 않고 대체합니다.
+        """
+        if self.coordinator.confirmed(
+            LIGHTING_DOMAIN, self.light_number
+        ) is is_on and not self.coordinator.light_command_pending(self.light_number):
+            _LOGGER.debug(f"조명 {self.light_number} 이미 {'ON' if is_on else 'OFF'} 상태, 명령 생략")
+            return
+
+        # 다른 조명과 함께 꺼지는 경우 코디네이터가 일괄소등 한 프레임으로 보냅니다.
+        await self.coordinator.async_set_light_power(self.light_number, is_on)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """코디네이터 상태 캐시가 갱신되면 호출됩니다."""
+        self._update_from_cache()
+        super()._handle_coordinator_update()
+
+    def _update_from_cache(self) -> None:
+        """상태 캐시에서 조명 상태를 읽어옵니다."""
+        is_on = self.coordinator.data[LIGHTING_DOMAIN].get(self.light_number)
+        if is_on is None or is_on == self._attr_is_on:
             return
-        
-        self._last_status_check = now
-        
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    # 상태 조회 패킷 전송
-                    packet = STATUS_QUERY_PACKETS[self.light_index]
-                    data = bytes.fromhex(packet)
-                    self._serial_port.write(data)
-                    
-                    # 응답 읽기
-                    await asyncio.sleep(0.075)  # 75ms 대기
-                    
-                    if self._serial_port.in_waiting > 0:
-                        response = self._serial_port.read(self._serial_port.in_waiting)
-                        response_hex = response.hex().upper()
-                        
-                        # 상태 파싱
-                        old_state = self._attr_is_on
-                        if response_hex.startswith(STATUS_ON_PREFIX):
-                            self._attr_is_on = True
-                        elif response_hex.startswith(STATUS_OFF_PREFIX):
-                            self._attr_is_on = False
-                        
-                        if old_state != self._attr_is_on:
-                            _LOGGER.info(f"조명 {self.light_index + 1} 상태 변경: {old_state} -> {self._attr_is_on}")
-                    
-            except Exception as e:
-                _LOGGER.error(f"조명 {self.light_index + 1} 상태 조회 실패: {e}")
-                await self._reconnect_serial() 
\ No newline at end of file
+
+        _LOGGER.info(f"조명 {self.light_number} 상태 변경: {self._attr_is_on} -> {is_on}")
+        self._attr_is_on = is_on
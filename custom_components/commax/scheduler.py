@@ -0,0 +1,107 @@
+"""Adaptive poll scheduler for Commax Integration."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+
+from homeassistant.util import dt as dt_util
+
+from .const import POLL_FAST_INTERVAL, NIGHT_INTERVAL_FACTOR, PROBE_INTERVAL
+
+
+@dataclass
+class _DeviceSchedule:
+    """기기 하나의 현재 조회 간격과 다음 조회 시각."""
+
+    max_interval: float
+    interval: float
+    due: float = 0.0
+
+
+class PollScheduler:
+    """Assign a dynamic poll interval to each device.
+
+    상태가 바뀌었거나 방금 명령을 보낸 기기는 POLL_FAST_INTERVAL 로 곧바로
+    다시 조회하고, 같은 상태가 확인될 때마다 간격을 두 배로 늘려 기기
+    종류별 최대 간격까지 물러납니다. 월패드가 스스로 조회한 응답을
+    엿들은 경우에도 확인으로 간주하므로 그 기기의 조회는 뒤로 밀립니다.
+
+    야간 시간대(night_hours)가 주어지면 그 시간 동안 최대 간격에
+    NIGHT_INTERVAL_FACTOR 를 곱합니다.
+
+    응답하지 않는 기기는 probe 로 조회해 PROBE_INTERVAL 간격으로만 다시
+    확인하므로, 조회 시간은 응답하는 기기에 쓰입니다.
+    """
+
+    def __init__(
+        self,
+        max_intervals: dict[Hashable, float],
+        night_hours: tuple[int, int] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        hour: Callable[[], int] | None = None,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._devices = {
+            key: _DeviceSchedule(max_interval, min(POLL_FAST_INTERVAL, max_interval))
+            for key, max_interval in max_intervals.items()
+        }
+        self._night_hours = night_hours
+        self._clock = clock
+        self._hour = hour or (lambda: dt_util.now().hour)
+
+    @property
+    def is_night(self) -> bool:
+        """Return True during the configured night hours."""
+        if self._night_hours is None:
+            return False
+        start, end = self._night_hours
+        hour = self._hour()
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+
+    def due(self) -> list[Hashable]:
+        """조회 시각이 지난 기기를 오래 기다린 순서대로 반환합니다."""
+        now = self._clock()
+        return [
+            key
+            for key, device in sorted(self._devices.items(), key=lambda item: item[1].due)
+            if device.due <= now
+        ]
+
+    def next_delay(self) -> float:
+        """다음 기기 조회까지 남은 시간(초)을 반환합니다."""
+        if not self._devices:
+            return float("inf")
+        next_due = min(device.due for device in self._devices.values())
+        return max(0.0, next_due - self._clock())
+
+    def polled(self, key: Hashable, probe: bool = False) -> None:
+        """조회를 보냈습니다. 응답이 없어도 현재 간격 뒤에 다시 조회합니다.
+
+        probe 이면 (사용 불가 기기) PROBE_INTERVAL 뒤에 다시 조회합니다.
+        """
+        device = self._devices[key]
+        interval = max(device.interval, PROBE_INTERVAL) if probe else device.interval
+        device.due = self._clock() + interval
+
+    def observed(self, key: Hashable, changed: bool) -> None:
+        """기기 응답을 받았습니다 (직접 조회했든 월패드 트래픽이든)."""
+        device = self._devices.get(key)
+        if device is None:
+            return
+        if changed:
+            device.interval = min(POLL_FAST_INTERVAL, device.max_interval)
+        else:
+            max_interval = device.max_interval
+            if self.is_night:
+                max_interval *= NIGHT_INTERVAL_FACTOR
+            device.interval = min(device.interval * 2, max_interval)
+        device.due = self._clock() + device.interval
+
+    def commanded(self, keys: Iterable[Hashable]) -> None:
+        """명령을 보낸 기기는 결과 확인을 위해 곧바로 다시 조회합니다."""
+        for key in keys:
+            if key in self._devices:
+                self.observed(key, changed=True)
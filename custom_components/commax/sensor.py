@@ -1,61 +1,152 @@
-"""Sensor platform for My Custom Integration."""
+"""Sensor platform for Commax bus diagnostics."""
 from __future__ import annotations
 
 import logging
-from datetime import datetime
-from typing import Any
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 
-from .const import DOMAIN, CONF_NAME, CONF_SCAN_INTERVAL
+from .bus import CommaxBus
+from .const import DOMAIN, SEGMENTS
+from .coordinator import CommaxCoordinator
+from .stats import BusStatistics
 
 _LOGGER = logging.getLogger(__name__)
 
+# 통계는 메모리에 누적되어 있으므로 읽기만 하며 버스 트래픽은 없습니다.
+SCAN_INTERVAL = timedelta(seconds=10)
+
+FRAMES_PER_SECOND = "frames/s"
+
+
+def _latency_ms(percent: float) -> Callable[[BusStatistics], StateType]:
+    """명령 왕복 지연 백분위수(ms)를 읽는 함수를 만듭니다."""
+
+    def _value(stats: BusStatistics) -> StateType:
+        latency = stats.latency_percentile(percent)
+        return None if latency is None else round(latency * 1000, 1)
+
+    return _value
+
+
+@dataclass(frozen=True, kw_only=True)
+class CommaxBusSensorEntityDescription(SensorEntityDescription):
+    """Describes a Commax bus statistics sensor."""
+
+    value_fn: Callable[[BusStatistics], StateType]
+
+
+BUS_SENSORS: tuple[CommaxBusSensorEntityDescription, ...] = (
+    CommaxBusSensorEntityDescription(
+        key="rx_frames_per_second",
+        name="RS485 수신 프레임",
+        native_unit_of_measurement=FRAMES_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda stats: round(stats.rx_frames_per_second, 2),
+    ),
+    CommaxBusSensorEntityDescription(
+        key="tx_frames_per_second",
+        name="RS485 송신 프레임",
+        native_unit_of_measurement=FRAMES_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda stats: round(stats.tx_frames_per_second, 2),
+    ),
+    CommaxBusSensorEntityDescription(
+        key="utilization",
+        name="RS485 버스 점유율",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda stats: round(stats.utilization, 2),
+    ),
+    CommaxBusSensorEntityDescription(
+        key="checksum_failures",
+        name="RS485 체크섬 오류",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.checksum_failures,
+    ),
+    CommaxBusSensorEntityDescription(
+        key="reply_timeouts",
+        name="RS485 응답 시간 초과",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.reply_timeouts,
+    ),
+    CommaxBusSensorEntityDescription(
+        key="reconnects",
+        name="RS485 재연결",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.reconnects,
+    ),
+    *(
+        CommaxBusSensorEntityDescription(
+            key=f"command_latency_p{percent}",
+            name=f"RS485 명령 지연 p{percent}",
+            device_class=SensorDeviceClass.DURATION,
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+            value_fn=_latency_ms(percent),
+        )
+        for percent in (50, 95, 99)
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up the sensor platform."""
-    config = hass.data[DOMAIN][config_entry.entry_id]
-    
-    async_add_entities([MyCustomSensor(config)], True)
+    """Set up the Commax bus diagnostic sensors."""
+    coordinator: CommaxCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
+    # 버스(포트)마다 센서를 만듭니다. 조명 구간의 버스는 구간 이름을 붙이지 않습니다.
+    sensors = []
+    for bus in coordinator.buses:
+        segment = None
+        if bus is not coordinator.bus:
+            segment = next(s for s in SEGMENTS if coordinator.bus_for(s) is bus)
+        sensors.extend(
+            CommaxBusSensor(bus, description, segment) for description in BUS_SENSORS
+        )
+    async_add_entities(sensors)
 
-class MyCustomSensor(SensorEntity):
-    """Representation of a My Custom Sensor."""
 
-    def __init__(self, config: dict[str, Any]) -> None:
-        """Initialize the sensor."""
-        self._config = config
-        self._attr_name = config[CONF_NAME]
-        self._attr_unique_id = f"{DOMAIN}_{config[CONF_NAME]}"
-        self._attr_native_value = None
-        self._attr_native_unit_of_measurement = "count"
+class CommaxBusSensor(SensorEntity):
+    """Diagnostic sensor reporting one statistic of a Commax RS485 bus."""
 
-    @property
-    def name(self) -> str:
-        """Return the name of the sensor."""
-        return self._attr_name
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    entity_description: CommaxBusSensorEntityDescription
 
-    @property
-    def native_value(self) -> StateType:
-        """Return the state of the sensor."""
-        return self._attr_native_value
+    def __init__(
+        self,
+        bus: CommaxBus,
+        description: CommaxBusSensorEntityDescription,
+        segment: str | None = None,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._bus = bus
+        if segment is None:
+            self._attr_unique_id = f"{DOMAIN}_bus_{description.key}"
+        else:
+            self._attr_unique_id = f"{DOMAIN}_bus_{segment}_{description.key}"
+            self._attr_name = f"{description.name} ({bus.port})"
 
     @property
-    def native_unit_of_measurement(self) -> str | None:
-        """Return the unit of measurement."""
-        return self._attr_native_unit_of_measurement
-
-    async def async_update(self) -> None:
-        """Fetch new state data for the sensor."""
-        # 여기에 실제 센서 데이터를 가져오는 로직을 구현하세요
-        # 예시: 현재 시간을 초 단위로 반환
-        self._attr_native_value = int(datetime.now().timestamp())
-        _LOGGER.debug("Updated sensor value: %s", self._attr_native_value) 
\ No newline at end of file
+    def native_value(self) -> StateType:
+        """Return the current value of the statistic."""
+        return self.entity_description.value_fn(self._bus.stats)
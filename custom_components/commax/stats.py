@@ -0,0 +1,166 @@
+"""Incremental bus statistics for Commax Integration."""
+from __future__ import annotations
+
+import bisect
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+
+from .transport import frame_airtime
+
+# 처리량과 점유율을 계산하는 구간 (초)
+STATS_WINDOW = 60
+# 명령 왕복 지연 백분위수를 계산할 최근 표본 수
+LATENCY_SAMPLES = 200
+
+
+class _RateWindow:
+    """최근 window 초 동안의 합계를 1초 단위 칸으로 누적합니다."""
+
+    def __init__(self, window: int, clock: Callable[[], float]) -> None:
+        self._window = window
+        self._clock = clock
+        self._buckets: deque[list[int]] = deque()  # [초, 합계]
+        self._total = 0
+
+    def add(self, amount: int = 1) -> None:
+        second = int(self._clock())
+        self._expire(second)
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += amount
+        else:
+            self._buckets.append([second, amount])
+        self._total += amount
+
+    def per_second(self) -> float:
+        self._expire(int(self._clock()))
+        return self._total / self._window
+
+    def _expire(self, second: int) -> None:
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= second - self._window:
+            self._total -= buckets.popleft()[1]
+
+
+class _LatencyWindow:
+    """최근 표본을 정렬된 상태로 유지해 백분위수를 바로 읽습니다."""
+
+    def __init__(self, size: int) -> None:
+        self._samples: deque[float] = deque()
+        self._sorted: list[float] = []
+        self._size = size
+
+    def add(self, value: float) -> None:
+        if len(self._samples) == self._size:
+            oldest = self._samples.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._samples.append(value)
+        bisect.insort(self._sorted, value)
+
+    def percentile(self, percent: float) -> float | None:
+        if not self._sorted:
+            return None
+        # nearest-rank 방식
+        rank = math.ceil(len(self._sorted) * percent / 100)
+        return self._sorted[max(rank, 1) - 1]
+
+
+class BusStatistics:
+    """Counters and sliding-window figures for one RS485 bus.
+
+    버스가 이미 하는 송수신과 응답 대기 중에 값을 누적하기만 하므로
+    통계를 위한 추가 버스 트래픽은 없습니다. 처리량과 점유율은 최근
+    STATS_WINDOW 초, 지연 백분위수는 최근 LATENCY_SAMPLES 개의 명령 기준입니다.
+    """
+
+    def __init__(
+        self,
+        baudrate: int,
+        window: int = STATS_WINDOW,
+        latency_samples: int = LATENCY_SAMPLES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the statistics."""
+        self.baudrate = baudrate
+        self.rx_frames = 0
+        self.tx_frames = 0
+        self.checksum_failures = 0
+        self.reply_timeouts = 0
+        self.reconnects = 0
+        self._rx_frame_rate = _RateWindow(window, clock)
+        self._tx_frame_rate = _RateWindow(window, clock)
+        self._byte_rate = _RateWindow(window, clock)
+        self._latency = _LatencyWindow(latency_samples)
+
+    # ===== 기록 =====
+
+    def bytes_received(self, nbytes: int) -> None:
+        """수신 바이트 (깨진 바이트 포함) 를 기록합니다."""
+        self._byte_rate.add(nbytes)
+
+    def frame_received(self) -> None:
+        """완성된 수신 프레임을 기록합니다."""
+        self.rx_frames += 1
+        self._rx_frame_rate.add()
+
+    def frame_sent(self, nbytes: int) -> None:
+        """송신 프레임을 기록합니다."""
+        self.tx_frames += 1
+        self._tx_frame_rate.add()
+        self._byte_rate.add(nbytes)
+
+    def checksum_failed(self, count: int = 1) -> None:
+        """체크섬이 맞지 않아 버린 프레임을 기록합니다."""
+        self.checksum_failures += count
+
+    def reply_timed_out(self) -> None:
+        """응답 제한 시간 초과를 기록합니다."""
+        self.reply_timeouts += 1
+
+    def reconnected(self) -> None:
+        """끊긴 뒤 다시 연결된 것을 기록합니다."""
+        self.reconnects += 1
+
+    def command_completed(self, latency: float) -> None:
+        """명령을 대기열에 넣은 뒤 응답을 받기까지 걸린 시간(초)을 기록합니다."""
+        self._latency.add(latency)
+
+    # ===== 조회 =====
+
+    @property
+    def rx_frames_per_second(self) -> float:
+        """Return received frames per second."""
+        return self._rx_frame_rate.per_second()
+
+    @property
+    def tx_frames_per_second(self) -> float:
+        """Return transmitted frames per second."""
+        return self._tx_frame_rate.per_second()
+
+    @property
+    def utilization(self) -> float:
+        """Return the share of bus airtime in use, in percent."""
+        busy = frame_airtime(self._byte_rate.per_second(), self.baudrate)
+        return min(100.0, busy * 100)
+
+    def latency_percentile(self, percent: float) -> float | None:
+        """Return a command round-trip latency percentile in seconds."""
+        return self._latency.percentile(percent)
+
+    def as_dict(self) -> dict[str, int | float | None]:
+        """카운터와 현재 구간 값을 반환합니다."""
+        return {
+            "rx_frames": self.rx_frames,
+            "tx_frames": self.tx_frames,
+            "checksum_failures": self.checksum_failures,
+            "reply_timeouts": self.reply_timeouts,
+            "reconnects": self.reconnects,
+            "rx_frames_per_second": round(self.rx_frames_per_second, 3),
+            "tx_frames_per_second": round(self.tx_frames_per_second, 3),
+            "utilization": round(self.utilization, 3),
+            **{
+                f"command_latency_p{percent}": self.latency_percentile(percent)
+                for percent in (50, 95, 99)
+            },
+        }
@@ -0,0 +1,147 @@
+"""Connection supervisor with backoff and a circuit breaker for Commax Integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+# 재연결 간격: 첫 재시도 간격부터 두 배씩 늘려 최대 간격까지 (초)
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 60.0
+
+
+class BusUnavailable(HomeAssistantError):
+    """Raised while the connection is down and the breaker rejects requests."""
+
+
+class ConnectionSupervisor:
+    """Reconnect one bus with jittered exponential backoff.
+
+    연결이 끊기면 회로 차단기가 열립니다. 열려 있는 동안 요청은 포트를
+    열어 보지 않고 바로 BusUnavailable 로 실패하고, 재연결은 백그라운드
+    작업 하나가 백오프 간격으로 시도합니다. 재연결에 성공하면 차단기가
+    닫힙니다. 로그는 끊길 때와 복구될 때 한 줄씩만 남깁니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        reconnect: Callable[[], Awaitable[None]],
+        base_delay: float = RECONNECT_BASE_DELAY,
+        max_delay: float = RECONNECT_MAX_DELAY,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize the supervisor."""
+        self.name = name
+        self._reconnect = reconnect
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._task: asyncio.Task | None = None
+        self.outage_started: float | None = None
+        self.failures = 0
+        self.outages = 0
+        self.last_error: Exception | None = None
+        self.next_attempt: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return true while the connection is down (breaker open)."""
+        return self.outage_started is not None
+
+    def check(self) -> None:
+        """차단기가 열려 있으면 바로 BusUnavailable 을 발생시킵니다."""
+        if self.outage_started is not None:
+            raise BusUnavailable(
+                f"RS485 버스 {self.name} 연결 끊김, 재연결 대기 중: {self.last_error}"
+            )
+
+    def backoff(self, attempt: int) -> float:
+        """attempt 번째(0부터) 재시도 전 기다릴 시간: 지수 증가 상한의 절반~전체 사이 임의 값."""
+        ceiling = min(self._max_delay, self._base_delay * 2 ** min(attempt, 32))
+        return self._rng.uniform(ceiling / 2, ceiling)
+
+    def connection_failed(self, exc: Exception | None) -> None:
+        """연결 실패나 끊김을 기록하고, 처음이면 차단기를 열고 재연결을 시작합니다."""
+        self.failures += 1
+        self.last_error = exc
+        if self.outage_started is not None:
+            _LOGGER.debug("RS485 버스 %s 재연결 실패: %s", self.name, exc)
+            return
+
+        self.outage_started = self._clock()
+        self.outages += 1
+        _LOGGER.warning(
+            "RS485 버스 %s 연결 끊김: %s (복구될 때까지 요청은 바로 실패하고 백오프 간격으로 재연결합니다)",
+            self.name,
+            exc,
+        )
+        self._task = asyncio.get_running_loop().create_task(
+            self._async_reconnect_loop(), name=f"commax reconnect {self.name}"
+        )
+
+    def connected(self) -> None:
+        """연결에 성공했습니다: 끊겨 있었다면 복구를 한 줄로 기록하고 차단기를 닫습니다."""
+        if self.outage_started is not None:
+            _LOGGER.info(
+                "RS485 버스 %s 복구: %.1f초 동안 끊김, 실패 %d회",
+                self.name,
+                self._clock() - self.outage_started,
+                self.failures,
+            )
+        self._reset()
+
+    async def async_stop(self) -> None:
+        """재연결 작업을 멈추고 상태를 초기화합니다."""
+        task, self._task = self._task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._reset()
+
+    def as_dict(self) -> dict[str, Any]:
+        """진단용 상태를 반환합니다."""
+        now = self._clock()
+        return {
+            "state": "open" if self.is_open else "closed",
+            "outages": self.outages,
+            "failures": self.failures,
+            "down_for": None
+            if self.outage_started is None
+            else round(now - self.outage_started, 1),
+            "next_attempt_in": None
+            if self.next_attempt is None
+            else round(max(0.0, self.next_attempt - now), 1),
+            "last_error": None if self.last_error is None else str(self.last_error),
+        }
+
+    async def _async_reconnect_loop(self) -> None:
+        """백오프 간격으로 재연결을 시도합니다 (연결 실패는 connection_failed 로 기록)."""
+        attempt = 0
+        while self.outage_started is not None:
+            delay = self.backoff(attempt)
+            self.next_attempt = self._clock() + delay
+            await asyncio.sleep(delay)
+            attempt += 1
+            try:
+                await self._reconnect()
+            except Exception:  # pylint: disable=broad-except
+                continue
+        self._task = None
+
+    def _reset(self) -> None:
+        self.outage_started = None
+        self.next_attempt = None
+        self.failures = 0
@@ -0,0 +1,200 @@
+"""Per-command latency tracing for Commax Integration."""
+from __future__ import annotations
+
+import bisect
+import logging
+import queue
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any
+
+from .const import (
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+    DOOR_DOMAIN,
+    ELEVATOR_DOMAIN,
+    MASTER_DOMAIN,
+)
+from .framer import FRAME_LENGTH
+
+_LOGGER = logging.getLogger(__name__)
+
+# 히스토그램 버킷 상한 (ms). 마지막 버킷은 그 이상 전부입니다.
+HISTOGRAM_BUCKETS_MS: tuple[float, ...] = (5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+# 구간: 대기열+락+버스 유휴 대기 / 송신 / 월패드 응답 / HA 상태 기록 / 전체
+PHASES = ("queue", "transmit", "reply", "state", "total")
+
+KIND_COMMAND = "command"
+KIND_QUERY = "query"
+
+# 스팬 파일 회전 설정
+SPAN_FILE_MAX_BYTES = 1024 * 1024
+SPAN_FILE_BACKUP_COUNT = 3
+
+# 요청 프레임 헤더 -> 기기 종류
+_DEVICE_CLASSES: dict[int, str] = {
+    0x30: LIGHTING_DOMAIN,
+    0x31: LIGHTING_DOMAIN,
+    0x02: BOILER_DOMAIN,
+    0x04: BOILER_DOMAIN,
+    0x20: MASTER_DOMAIN,
+    0x22: MASTER_DOMAIN,
+    0xA0: ELEVATOR_DOMAIN,
+}
+
+
+def device_class(frame: bytes) -> str:
+    """요청 프레임의 기기 종류를 반환합니다 (16바이트 02 프레임은 문열기)."""
+    if len(frame) > FRAME_LENGTH:
+        return DOOR_DOMAIN
+    return _DEVICE_CLASSES.get(frame[0], "other")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    def __init__(self, buckets: tuple[float, ...] = HISTOGRAM_BUCKETS_MS) -> None:
+        """Initialize the histogram."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        """값 하나를 해당 버킷에 더합니다."""
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        """버킷 상한별 개수와 합계를 반환합니다."""
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+@dataclass(slots=True)
+class Span:
+    """Monotonic timestamps of one command or query."""
+
+    kind: str
+    enqueued: float
+    tx_start: float | None = None
+    tx_done: float | None = None
+    reply: float | None = None
+    state_written: float | None = None
+
+    def phases(self) -> dict[str, float]:
+        """기록된 시각으로 계산할 수 있는 구간 시간(ms)을 반환합니다."""
+        marks = (self.enqueued, self.tx_start, self.tx_done, self.reply, self.state_written)
+        durations: dict[str, float] = {}
+        for phase, start, end in zip(PHASES, marks, marks[1:]):
+            if start is None or end is None:
+                break
+            durations[phase] = (end - start) * 1000
+        last = next((mark for mark in reversed(marks) if mark is not None))
+        durations["total"] = (last - self.enqueued) * 1000
+        return durations
+
+
+class CommandTracer:
+    """Collect spans into per-device histograms and an optional span file.
+
+    버스가 요청마다 Span 을 만들고 대기열 진입, 송신 시작, 송신 완료,
+    응답 수신 시각을 찍습니다. 응답 프레임을 리스너에 전달하는 동안
+    active 로 표시된 Span 에는 코디네이터가 엔티티 상태를 기록한 시각을
+    찍습니다. 끝난 Span 은 (기기 종류, 요청 종류) 별 구간 히스토그램에
+    더해지고, 스팬 파일을 켜면 한 줄씩 기록됩니다.
+
+    스팬 파일 한 줄 형식 (시간 단위 ms, 없는 구간은 -)::
+
+        <유닉스 시각> <기기> <요청 종류> <프레임> q=<대기> tx=<송신> rp=<응답> st=<상태> tot=<전체>
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize the tracer."""
+        self.clock = clock
+        self.histograms: dict[tuple[str, str], dict[str, Histogram]] = {}
+        self.active: Span | None = None
+        self._span_logger: logging.Logger | None = None
+        self._listener: QueueListener | None = None
+
+    def start(self, kind: str) -> Span:
+        """대기열에 들어가는 요청의 Span 을 만듭니다."""
+        return Span(kind, self.clock())
+
+    def state_written(self) -> None:
+        """응답 처리 중 엔티티 상태가 기록된 시각을 찍습니다."""
+        span = self.active
+        if span is not None and span.state_written is None:
+            span.state_written = self.clock()
+
+    def finish(self, span: Span, frame: bytes) -> None:
+        """끝난 Span 을 히스토그램과 스팬 파일에 기록합니다."""
+        device = device_class(frame)
+        phases = span.phases()
+        histograms = self.histograms.get((device, span.kind))
+        if histograms is None:
+            histograms = self.histograms[(device, span.kind)] = {
+                phase: Histogram() for phase in PHASES
+            }
+        for phase, value in phases.items():
+            histograms[phase].observe(value)
+
+        if self._span_logger is not None:
+            fields = " ".join(
+                f"{label}={phases[phase]:.1f}" if phase in phases else f"{label}=-"
+                for label, phase in zip(("q", "tx", "rp", "st", "tot"), PHASES)
+            )
+            self._span_logger.info(
+                "%.3f %s %s %s %s", time.time(), device, span.kind, frame.hex().upper(), fields
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """히스토그램을 "기기/요청 종류" 별로 반환합니다."""
+        return {
+            f"{device}/{kind}": {phase: h.as_dict() for phase, h in histograms.items()}
+            for (device, kind), histograms in self.histograms.items()
+        }
+
+    def enable_span_file(
+        self,
+        path: str,
+        max_bytes: int = SPAN_FILE_MAX_BYTES,
+        backup_count: int = SPAN_FILE_BACKUP_COUNT,
+    ) -> None:
+        """스팬을 회전 파일에 기록합니다. 파일 쓰기는 별도 스레드에서 합니다."""
+        if self._listener is not None:
+            return
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, delay=True
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self._listener = QueueListener(records, handler)
+        self._listener.start()
+
+        span_logger = logging.getLogger(f"{__name__}.spans.{id(self)}")
+        span_logger.setLevel(logging.INFO)
+        span_logger.propagate = False
+        span_logger.addHandler(QueueHandler(records))
+        self._span_logger = span_logger
+        _LOGGER.info("명령 스팬 기록: %s", path)
+
+    def close(self) -> None:
+        """스팬 파일 기록을 멈추고 파일을 닫습니다."""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        for handler in list(self._span_logger.handlers):
+            self._span_logger.removeHandler(handler)
+        self._listener = None
+        self._span_logger = None
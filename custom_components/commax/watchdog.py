@@ -0,0 +1,69 @@
+"""Device health watchdog for Commax Integration."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Hashable, Iterable
+
+from .const import UNAVAILABLE_MISSED_POLLS
+
+
+class HealthWatchdog:
+    """Track the last valid frame of each device and flag silent devices.
+
+    기기가 응답하면 seen(), 조회에 응답이 없으면 missed() 를 부릅니다.
+    check() 는 missed_polls 번 이상 조회에 응답하지 않았고 마지막 응답
+    (없으면 감시 시작) 후 silence 초가 지난 기기를 사용 불가로 표시합니다.
+    사용 불가 기기는 다시 응답하는 즉시 사용 가능으로 돌아옵니다.
+
+    수동 모드처럼 직접 조회하지 않을 때는 missed_polls=0 으로 두어 응답이
+    없는 시간만으로 판단합니다.
+    """
+
+    def __init__(
+        self,
+        silence: float,
+        missed_polls: int = UNAVAILABLE_MISSED_POLLS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the watchdog."""
+        self.silence = silence
+        self._missed_polls = missed_polls
+        self._clock = clock
+        self._started = clock()
+        self._last_seen: dict[Hashable, float] = {}
+        self._missed: dict[Hashable, int] = {}
+        self.unavailable: set[Hashable] = set()
+
+    def available(self, key: Hashable) -> bool:
+        """Return true unless the device has been flagged silent."""
+        return key not in self.unavailable
+
+    def last_seen(self, key: Hashable) -> float | None:
+        """마지막으로 유효한 응답을 받은 시각 (없으면 None)."""
+        return self._last_seen.get(key)
+
+    def seen(self, key: Hashable) -> bool:
+        """유효한 응답을 받았습니다. 사용 불가였다가 돌아왔으면 True 를 반환합니다."""
+        self._last_seen[key] = self._clock()
+        self._missed[key] = 0
+        if key in self.unavailable:
+            self.unavailable.discard(key)
+            return True
+        return False
+
+    def missed(self, key: Hashable) -> None:
+        """조회에 응답이 없었습니다."""
+        self._missed[key] = self._missed.get(key, 0) + 1
+
+    def check(self, keys: Iterable[Hashable]) -> list[Hashable]:
+        """새로 사용 불가가 된 기기 목록을 반환합니다."""
+        now = self._clock()
+        expired = [
+            key
+            for key in keys
+            if key not in self.unavailable
+            and self._missed.get(key, 0) >= self._missed_polls
+            and now - self._last_seen.get(key, self._started) >= self.silence
+        ]
+        self.unavailable.update(expired)
+        return expired
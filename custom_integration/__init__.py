@@ -1,33 +1,160 @@
 """Commax Integration for Home Assistant."""
 from __future__ import annotations
 
+import logging
+import os
+import time
+from functools import partial
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .bus import CommaxBus, create_buses
+from .const import (
+    DOMAIN,
+    CONF_PASSIVE,
+    CONF_LIGHTS,
+    CONF_BOILERS,
+    CONF_TRACE_SPANS,
+    CONF_CAPTURE,
+    SEGMENT_LIGHT,
+    SEGMENT_BOILER,
+    SEGMENTS,
+    SPAN_FILE_NAME,
+    CAPTURE_FILE_FORMAT,
+    SERVICE_RESCAN,
+)
+from .coordinator import CommaxCoordinator
+from .discovery import async_discover
 
-from .const import DOMAIN
+_LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [
     Platform.LIGHT,      # 조명
     Platform.CLIMATE,    # 보일러
     Platform.SWITCH,     # 도어, 엘리베이터, 일괄소등
     Platform.BINARY_SENSOR,  # 도어벨
+    Platform.SENSOR,     # 버스 진단
 ]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
+    started = time.monotonic()
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    # 포트마다 하나의 RS485 버스를 만들고, 같은 구간의 기기가 공유합니다.
+    buses = create_buses(hass, dict(entry.data))
+    bus = buses[SEGMENT_LIGHT]
+    # 버스 -> 그 버스를 쓰는 첫 구간 (조명 구간의 버스가 처음)
+    first_segments: dict[CommaxBus, str] = {}
+    for segment in SEGMENTS:
+        first_segments.setdefault(buses[segment], segment)
+
+    capture_path = hass.config.path(dt_util.now().strftime(CAPTURE_FILE_FORMAT))
+    for segment_bus, segment in first_segments.items():
+        # 조명 구간이 아닌 버스의 파일 이름에는 구간 이름을 붙입니다.
+        suffix = None if segment_bus is bus else segment
+        if entry.data.get(CONF_TRACE_SPANS):
+            segment_bus.tracer.enable_span_file(
+                _segment_path(hass.config.path(SPAN_FILE_NAME), suffix)
+            )
+        if entry.data.get(CONF_CAPTURE):
+            segment_bus.start_capture(_segment_path(capture_path, suffix))
+
+    # 하나의 코디네이터가 기기별 적응형 간격으로 모든 기기를 조회합니다.
+    # 탐색 전이면 기본 구성으로 시작합니다.
+    coordinator = CommaxCoordinator(
+        hass, bus, entry.data.get(CONF_LIGHTS), entry.data.get(CONF_BOILERS), buses
+    )
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # 엔티티는 마지막 상태를 복원해 바로 추가합니다. 버스 연결, 처음 시작할
+    # 때의 기기 탐색, 첫 전체 조회는 모두 백그라운드에서 합니다. 수신은 항상
+    # 켜 두고, 프레임은 헤더별로 각 기기에 전달됩니다.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    discover = None
+    if CONF_LIGHTS not in entry.data and not entry.data.get(CONF_PASSIVE):
+        discover = partial(_async_discover_topology, hass, entry, coordinator)
+    coordinator.async_start(discover)
+
+    if not hass.services.has_service(DOMAIN, SERVICE_RESCAN):
+        hass.services.async_register(
+            DOMAIN, SERVICE_RESCAN, partial(_async_handle_rescan, hass)
+        )
+
+    _LOGGER.debug(
+        "%s 설정 완료: %.1f ms", bus.port, (time.monotonic() - started) * 1000
+    )
 
     return True
 
 
+async def _async_discover_topology(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: CommaxCoordinator,
+    merge: bool = False,
+) -> None:
+    """실제 기기를 탐색해 설정 항목에 저장하고, 구성이 다르면 다시 불러옵니다.
+
+    처음 시작할 때는 포트가 열리지 않았으면 탐색하지 않고 기본 구성을 유지합니다
+    (다음 시작 때 다시 탐색). merge 이면 찾은 기기를 저장된 구성에 더하며,
+    그때 꺼져 있어 응답하지 않은 기기는 빼지 않습니다.
+    """
+    bus = coordinator.bus
+    boiler_bus = coordinator.bus_for(SEGMENT_BOILER)
+    if not (bus.connected and boiler_bus.connected):
+        if merge:
+            raise HomeAssistantError(f"RS485 버스 {bus.port} 가 연결되지 않아 탐색할 수 없습니다")
+        return
+    topology = await async_discover(bus, boiler_bus=boiler_bus)
+    if topology is None:
+        if merge:
+            _LOGGER.warning("다시 탐색했지만 응답하는 기기가 없어 구성을 그대로 둡니다")
+        else:
+            _LOGGER.warning("응답하는 기기가 없어 기본 구성을 사용합니다 (다음 시작 때 다시 탐색)")
+        return
+    if merge:
+        topology = {
+            key: sorted({*entry.data.get(key, []), *found})
+            for key, found in topology.items()
+        }
+    hass.config_entries.async_update_entry(entry, data={**entry.data, **topology})
+    if (
+        topology[CONF_LIGHTS] != coordinator.lights
+        or topology[CONF_BOILERS] != coordinator.boilers
+    ):
+        # 엔티티 목록이 바뀌므로 저장된 구성으로 다시 설정합니다.
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
+async def _async_handle_rescan(hass: HomeAssistant, call: ServiceCall) -> None:
+    """commax.rescan: 모든 설정 항목에서 새로 설치한 기기를 찾아 구성에 더합니다."""
+    for entry_id, coordinator in list(hass.data[DOMAIN].items()):
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is None or entry.data.get(CONF_PASSIVE):
+            # 수동 모드는 버스에 아무것도 보내지 않으므로 탐색하지 않습니다.
+            continue
+        await _async_discover_topology(hass, entry, coordinator, merge=True)
+
+
+def _segment_path(path: str, segment: str | None) -> str:
+    """파일 이름 끝(확장자 앞)에 구간 이름을 붙입니다 (None 이면 그대로)."""
+    if segment is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{segment}{ext}"
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: CommaxCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_close()
+        if not hass.data[DOMAIN]:
+            hass.services.async_remove(DOMAIN, SERVICE_RESCAN)
 
     return unload_ok 
\ No newline at end of file
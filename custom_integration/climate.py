@@ -2,34 +2,29 @@
 from __future__ import annotations
 
 import logging
-import serial
-import asyncio
-from datetime import datetime
 from typing import Any
 
 from homeassistant.components.climate import (
+    ATTR_CURRENT_TEMPERATURE,
+    ATTR_HVAC_ACTION,
     ClimateEntity,
     ClimateEntityFeature,
     HVACMode,
     HVACAction,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.const import (
-    CONF_NAME,
     UnitOfTemperature,
     ATTR_TEMPERATURE,
 )
-from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
-    CONF_PORT,
-    CONF_BAUD_RATE,
-    CONF_TIMEOUT,
-    BOILER_STATUS_QUERY_PACKETS,
-    BOILER_STATUS_RESPONSE_HEADER,
+    BOILER_DOMAIN,
     BOILER_CONTROL_RESPONSE_HEADER,
     BOILER_STATE_HEATING,
     BOILER_STATE_IDLE,
@@ -37,7 +32,11 @@ from .const import (
     BOILER_MIN_TEMP,
     BOILER_MAX_TEMP,
     BOILER_NAMES,
+    COMMAND_COALESCE_WINDOW,
+    SEGMENT_BOILER,
 )
+from .codec import encode_boiler_mode, encode_boiler_temperature
+from .coordinator import CommaxCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,31 +47,30 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Commax Boiler platform."""
-    config = hass.data[DOMAIN][config_entry.entry_id]
-    
-    # 4개 방의 보일러 엔티티 생성
+    coordinator: CommaxCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    # 탐색으로 찾은 방의 보일러만 생성
     boilers = []
-    for i, name in enumerate(BOILER_NAMES):
+    for room in coordinator.boilers:
+        i = room - 1
         boiler = CommaxBoiler(
-            hass,
-            config,
+            coordinator,
             i,
-            name
+            BOILER_NAMES[i] if i < len(BOILER_NAMES) else f"보일러 {room}"
         )
         boilers.append(boiler)
-    
-    async_add_entities(boilers, True)
+
+    async_add_entities(boilers)
 
 
-class CommaxBoiler(ClimateEntity):
+class CommaxBoiler(CoordinatorEntity[CommaxCoordinator], ClimateEntity, RestoreEntity):
     """Representation of a Commax Boiler."""
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any], room_index: int, name: str) -> None:
+    def __init__(self, coordinator: CommaxCoordinator, room_index: int, name: str) -> None:
         """Initialize the boiler."""
-        self.hass = hass
-        self.config = config
+        super().__init__(coordinator)
         self.room_index = room_index
-        self.room_number = room_index + 1  # 1-4번 방
+        self.room_number = room_index + 1  # 1번 방부터
         self._attr_name = name
         self._attr_unique_id = f"{DOMAIN}_boiler_{room_index + 1}"
         
@@ -90,14 +88,7 @@ class CommaxBoiler(ClimateEntity):
         self._attr_current_temperature = 20
         self._attr_min_temp = 5  # 0x05
         self._attr_max_temp = 53  # 0x35
-        
-        # 시리얼 통신 관련
-        self._serial_port = None
-        self._serial_lock = asyncio.Lock()
-        
-        # 상태 조회 관련
-        self._last_status_check = None
-        self._status_check_interval = config.get("scan_interval", 1)
+        self._update_from_cache()
         
         _LOGGER.info(f"Commax Boiler {name} (방 {self.room_number}) 초기화 완료")
 
@@ -126,20 +117,52 @@ class CommaxBoiler(ClimateEntity):
         """Return the current temperature."""
         return self._attr_current_temperature
 
+    @property
+    def available(self) -> bool:
+        """보일러가 월패드 조회에 응답하고 있으면 사용 가능합니다."""
+        return super().available and self.coordinator.device_available(
+            BOILER_DOMAIN, self.room_number
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """첫 조회 응답 전까지는 마지막으로 기록된 상태를 표시합니다."""
+        await super().async_added_to_hass()
+        if self.coordinator.data[BOILER_DOMAIN].get(self.room_number):
+            return
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state not in self._attr_hvac_modes:
+            return
+        self._attr_hvac_mode = HVACMode(last_state.state)
+        attributes = last_state.attributes
+        if attributes.get(ATTR_HVAC_ACTION) in list(HVACAction):
+            self._attr_hvac_action = HVACAction(attributes[ATTR_HVAC_ACTION])
+        if attributes.get(ATTR_CURRENT_TEMPERATURE) is not None:
+            self._attr_current_temperature = attributes[ATTR_CURRENT_TEMPERATURE]
+        if attributes.get(ATTR_TEMPERATURE) is not None:
+            self._attr_target_temperature = attributes[ATTR_TEMPERATURE]
+
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set the HVAC mode."""
+        confirmed = self.coordinator.confirmed(BOILER_DOMAIN, self.room_number)
+        is_heat = confirmed is not None and confirmed['state'] in [
+            BOILER_STATE_HEATING, BOILER_STATE_IDLE
+        ]
+        # 대기 중인 다른 모드 명령이 있으면 생략하지 않고 대체합니다.
+        pending = self._command_pending("mode")
         if hvac_mode == HVACMode.HEAT:
-            packet = self._make_boiler_packet(self.room_number, 0x04, 0x81)  # 모드 ON
-            await self._send_command(packet)
-            self._attr_hvac_mode = HVACMode.HEAT
-            self._attr_hvac_action = HVACAction.HEATING
+            if is_heat and not pending:
+                _LOGGER.debug(f"보일러 방 {self.room_number} 이미 난방 모드, 명령 생략")
+                return
+            packet = encode_boiler_mode(self.room_number, True)
+            await self._send_command(packet, "mode")
+            self.coordinator.async_set_boiler(self.room_number, state=BOILER_STATE_HEATING)
         elif hvac_mode == HVACMode.OFF:
-            packet = self._make_boiler_packet(self.room_number, 0x04, 0x00)  # 모드 OFF
-            await self._send_command(packet)
-            self._attr_hvac_mode = HVACMode.OFF
-            self._attr_hvac_action = HVACAction.OFF
-        
-        self.async_write_ha_state()
+            if confirmed is not None and not is_heat and not pending:
+                _LOGGER.debug(f"보일러 방 {self.room_number} 이미 꺼짐, 명령 생략")
+                return
+            packet = encode_boiler_mode(self.room_number, False)
+            await self._send_command(packet, "mode")
+            self.coordinator.async_set_boiler(self.room_number, state=BOILER_STATE_OFF)
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set the target temperature."""
@@ -147,141 +170,76 @@ class CommaxBoiler(ClimateEntity):
         if temperature is not None:
             # 온도를 HEX로 변환 (5-53도 범위)
             temp_hex = max(BOILER_MIN_TEMP, min(BOILER_MAX_TEMP, int(temperature)))
-            packet = self._make_boiler_packet(self.room_number, 0x03, temp_hex)  # 온도 설정
-            await self._send_command(packet)
-            self._attr_target_temperature = temperature
-            self.async_write_ha_state()
+            confirmed = self.coordinator.confirmed(BOILER_DOMAIN, self.room_number)
+            if (
+                confirmed is not None
+                and confirmed['set_temp'] == temp_hex
+                and not self._command_pending("temperature")
+            ):
+                _LOGGER.debug(f"보일러 방 {self.room_number} 이미 {temp_hex}도, 명령 생략")
+                return
+            packet = encode_boiler_temperature(self.room_number, temp_hex)
+            # 슬라이더를 끄는 동안의 연속 호출은 마지막 값 하나로 모아 전송합니다.
+            await self._send_command(packet, "temperature", COMMAND_COALESCE_WINDOW)
+            self.coordinator.async_set_boiler(self.room_number, set_temp=temp_hex)
+
+    def _command_pending(self, command_type: str) -> bool:
+        """같은 종류의 명령이 아직 전송 대기 중이거나 전송 중이면 True 를 반환합니다."""
+        return self.coordinator.bus_for(SEGMENT_BOILER).has_pending(
+            (BOILER_DOMAIN, self.room_number, command_type)
+        )
 
-    async def _send_command(self, packet: str) -> None:
-        """시리얼 포트로 명령을 전송합니다."""
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    # HEX 문자열을 바이트로 변환
-                    data = bytes.fromhex(packet)
-                    self._serial_port.write(data)
-                    _LOGGER.debug(f"보일러 방 {self.room_number} 명령 전송: {packet}")
-                    
-                    # 응답 대기
-                    await asyncio.sleep(0.075)  # 75ms 대기
-                    
-            except Exception as e:
-                _LOGGER.error(f"보일러 방 {self.room_number} 명령 전송 실패: {e}")
-                await self._reconnect_serial()
+    async def _send_command(
+        self, packet: bytes, command_type: str, coalesce_window: float = 0
+    ) -> None:
+        """공유 버스로 명령을 전송합니다.
 
-    async def _connect_serial(self) -> None:
-        """시리얼 포트에 연결합니다."""
+        아직 전송되지 않은 같은 종류의 이전 명령은 이 명령으로 대체됩니다.
+        """
         try:
-            self._serial_port = serial.Serial(
-                port=self.config[CONF_PORT],
-                baudrate=self.config[CONF_BAUD_RATE],
-                timeout=self.config[CONF_TIMEOUT],
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE
+            await self.coordinator.bus_for(SEGMENT_BOILER).async_request(
+                packet,
+                BOILER_CONTROL_RESPONSE_HEADER,
+                self.room_number,
+                coalesce_key=(BOILER_DOMAIN, self.room_number, command_type),
+                coalesce_window=coalesce_window,
             )
-            _LOGGER.info(f"시리얼 포트 {self.config[CONF_PORT]} 연결 성공")
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"보일러 방 {self.room_number} 명령 전송: {packet.hex().upper()}")
         except Exception as e:
-            _LOGGER.error(f"시리얼 포트 연결 실패: {e}")
-            self._serial_port = None
+            _LOGGER.error(f"보일러 방 {self.room_number} 명령 전송 실패: {e}")
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """코디네이터 상태 캐시가 갱신되면 호출됩니다."""
+        self._update_from_cache()
+        super()._handle_coordinator_update()
+
+    def _update_from_cache(self) -> None:
+        """상태 캐시에서 보일러 상태를 읽어옵니다."""
+        status = self.coordinator.data[BOILER_DOMAIN].get(self.room_number)
+        if not status:
+            return
 
-    async def _reconnect_serial(self) -> None:
-        """시리얼 포트를 재연결합니다."""
-        if self._serial_port:
-            self._serial_port.close()
-            self._serial_port = None
-        await self._connect_serial()
+        old_mode = self._attr_hvac_mode
 
-    async def async_update(self) -> None:
-        """보일러 상태를 업데이트합니다."""
-        # 상태 조회 간격 체크
-        now = datetime.now()
-        if (self._last_status_check and 
-            (now - self._last_status_check).total_seconds() < self._status_check_interval):
-            return
-        
-        self._last_status_check = now
-        
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    # 해당 방의 상태 조회 패킷 전송
-                    status_packet = BOILER_STATUS_QUERY_PACKETS[self.room_index]
-                    data = bytes.fromhex(status_packet)
-                    self._serial_port.write(data)
-                    
-                    # 응답 읽기
-                    await asyncio.sleep(0.075)  # 75ms 대기
-                    
-                    if self._serial_port.in_waiting > 0:
-                        response = self._serial_port.read(self._serial_port.in_waiting)
-                        response_hex = response.hex().upper()
-                        
-                        # 상태 파싱
-                        old_mode = self._attr_hvac_mode
-                        old_action = self._attr_hvac_action
-                        
-                        if len(response) >= 8:
-                            status = self._parse_boiler_status(response)
-                            if status and status['room'] == self.room_number:
-                                # HVAC 모드 설정
-                                if status['state'] in [BOILER_STATE_HEATING, BOILER_STATE_IDLE]:
-                                    self._attr_hvac_mode = HVACMode.HEAT
-                                    if status['state'] == BOILER_STATE_HEATING:
-                                        self._attr_hvac_action = HVACAction.HEATING
-                                    else:
-                                        self._attr_hvac_action = HVACAction.IDLE
-                                else:
-                                    self._attr_hvac_mode = HVACMode.OFF
-                                    self._attr_hvac_action = HVACAction.OFF
-                                
-                                # 온도 설정
-                                self._attr_current_temperature = status['current_temp']
-                                self._attr_target_temperature = status['set_temp']
-                                
-                                if old_mode != self._attr_hvac_mode:
-                                    _LOGGER.info(f"보일러 방 {self.room_number} 상태 변경: {old_mode} -> {self._attr_hvac_mode}")
-                    
-            except Exception as e:
-                _LOGGER.error(f"보일러 방 {self.room_number} 상태 조회 실패: {e}")
-                await self._reconnect_serial()
+        # HVAC 모드 설정
+        state = status.get('state')
+        if state in [BOILER_STATE_HEATING, BOILER_STATE_IDLE]:
+            self._attr_hvac_mode = HVACMode.HEAT
+            if state == BOILER_STATE_HEATING:
+                self._attr_hvac_action = HVACAction.HEATING
+            else:
+                self._attr_hvac_action = HVACAction.IDLE
+        elif state is not None:
+            self._attr_hvac_mode = HVACMode.OFF
+            self._attr_hvac_action = HVACAction.OFF
 
-    def _parse_boiler_status(self, data: bytes) -> dict | None:
-        """보일러 상태 응답 패킷을 파싱합니다."""
-        if len(data) < 8:
-            return None
-        
-        # 체크섬 검증
-        checksum = sum(data[:7]) & 0xFF
-        if data[7] != checksum:
-            _LOGGER.warning(f"보일러 체크섬 불일치: 계산={checksum:02X}, 수신={data[7]:02X}")
-            return None
-        
-        # 헤더 검증
-        if data[0] not in [BOILER_STATUS_RESPONSE_HEADER, BOILER_CONTROL_RESPONSE_HEADER]:
-            return None
-        
-        return {
-            'room': data[2],
-            'state': data[1], 
-            'current_temp': data[3],
-            'set_temp': data[4]
-        } 
+        # 온도 설정
+        if status.get('current_temp') is not None:
+            self._attr_current_temperature = status['current_temp']
+        if status.get('set_temp') is not None:
+            self._attr_target_temperature = status['set_temp']
 
-    def _make_boiler_packet(self, device_id: int, cmd_type: int, value: int) -> str:
-        """보일러 제어 패킷을 생성합니다."""
-        # 패킷 구조: 04 + 방번호 + 명령타입 + 값 + 000000 + 체크섬
-        pkt = [0x04, device_id, cmd_type, value, 0x00, 0x00, 0x00]
-        
-        # 체크섬 계산 (Go 코드와 동일)
-        checksum = sum(pkt) & 0xFF
-        pkt.append(checksum)
-        
-        # HEX 문자열로 변환
-        return ''.join(f'{b:02X}' for b in pkt) 
\ No newline at end of file
+        if old_mode != self._attr_hvac_mode:
+            _LOGGER.info(f"보일러 방 {self.room_number} 상태 변경: {old_mode} -> {self._attr_hvac_mode}")
@@ -0,0 +1,176 @@
+"""Binary codec for the Commax RS485 protocol."""
+from __future__ import annotations
+
+import struct
+from functools import lru_cache
+from typing import NamedTuple
+
+from .const import (
+    STATUS_QUERY_PACKETS,
+    LIGHT_QUERY_HEADER,
+    LIGHT_CONTROL_HEADER,
+    LIGHT_ON_PACKETS,
+    LIGHT_OFF_PACKETS,
+    LIGHT_STATUS_RESPONSE_HEADER,
+    LIGHT_CONTROL_RESPONSE_HEADER,
+    BOILER_STATUS_QUERY_PACKETS,
+    BOILER_QUERY_HEADER,
+    BOILER_STATUS_RESPONSE_HEADER,
+    BOILER_CONTROL_RESPONSE_HEADER,
+    BOILER_CONTROL_HEADER,
+    BOILER_CMD_MODE,
+    BOILER_CMD_SET_TEMP,
+    BOILER_MODE_ON,
+    BOILER_MODE_OFF,
+    MASTER_STATUS_QUERY,
+    MASTER_ALL_ON_PACKET,
+    MASTER_ALL_OFF_PACKET,
+    MASTER_STATUS_RESPONSE_HEADER,
+    MASTER_CONTROL_RESPONSE_HEADER,
+    MASTER_ADDRESS,
+    DOOR_OPEN_PACKET,
+    DOORBELL_OPEN_DOOR_PACKET,
+    ELEVATOR_CALL_PACKET,
+)
+
+# 8바이트 프레임 앞부분: 헤더, 상태, 주소, 값1, 값2
+_HEAD = struct.Struct("5B")
+
+# ===== 고정 프레임 (가져올 때 한 번만 bytes 로 변환) =====
+LIGHT_QUERY_FRAMES: tuple[bytes, ...] = tuple(map(bytes.fromhex, STATUS_QUERY_PACKETS))
+LIGHT_ON_FRAMES: tuple[bytes, ...] = tuple(map(bytes.fromhex, LIGHT_ON_PACKETS))
+LIGHT_OFF_FRAMES: tuple[bytes, ...] = tuple(map(bytes.fromhex, LIGHT_OFF_PACKETS))
+BOILER_QUERY_FRAMES: tuple[bytes, ...] = tuple(
+    map(bytes.fromhex, BOILER_STATUS_QUERY_PACKETS)
+)
+MASTER_QUERY_FRAME = bytes.fromhex(MASTER_STATUS_QUERY)
+MASTER_ON_FRAME = bytes.fromhex(MASTER_ALL_ON_PACKET)
+MASTER_OFF_FRAME = bytes.fromhex(MASTER_ALL_OFF_PACKET)
+DOOR_OPEN_FRAME = bytes.fromhex(DOOR_OPEN_PACKET)
+DOORBELL_OPEN_DOOR_FRAME = bytes.fromhex(DOORBELL_OPEN_DOOR_PACKET)
+ELEVATOR_CALL_FRAME = bytes.fromhex(ELEVATOR_CALL_PACKET)
+
+# ===== 도어벨 이벤트 =====
+DOORBELL_RING = "ring"
+DOORBELL_CALL_END = "call_end"
+_DOORBELL_RING_PREFIX = bytes.fromhex("100109120101091201")
+_DOORBELL_CALL_END_PREFIX = bytes.fromhex("0212010912010109120161")
+
+
+class BoilerStatus(NamedTuple):
+    """Decoded boiler status or control reply."""
+
+    room: int
+    state: int
+    current_temp: int
+    set_temp: int
+
+
+def checksum(data: bytes) -> int:
+    """8바이트 프레임의 체크섬(앞 7바이트 합의 하위 바이트)을 계산합니다."""
+    return sum(data[:7]) & 0xFF
+
+
+def _is_valid(frame: bytes) -> bool:
+    """8바이트 이상이고 체크섬이 맞는지 확인합니다."""
+    return len(frame) >= 8 and frame[7] == checksum(frame)
+
+
+# ===== 인코더 =====
+
+def encode_light_query(number: int) -> bytes:
+    """조명 상태 조회 프레임 (조명번호는 1부터)."""
+    if number <= len(LIGHT_QUERY_FRAMES):
+        return LIGHT_QUERY_FRAMES[number - 1]
+    return _frame(LIGHT_QUERY_HEADER, number)
+
+
+def encode_light_power(number: int, is_on: bool) -> bytes:
+    """조명 켜기/끄기 프레임."""
+    frames = LIGHT_ON_FRAMES if is_on else LIGHT_OFF_FRAMES
+    if number <= len(frames):
+        return frames[number - 1]
+    return _frame(LIGHT_CONTROL_HEADER, number, int(is_on))
+
+
+def encode_boiler_query(room: int) -> bytes:
+    """보일러 상태 조회 프레임 (방번호는 1부터)."""
+    if room <= len(BOILER_QUERY_FRAMES):
+        return BOILER_QUERY_FRAMES[room - 1]
+    return _frame(BOILER_QUERY_HEADER, room)
+
+
+def encode_boiler_mode(room: int, heat: bool) -> bytes:
+    """보일러 난방 켜기/끄기 프레임."""
+    return _boiler_frame(room, BOILER_CMD_MODE, BOILER_MODE_ON if heat else BOILER_MODE_OFF)
+
+
+def encode_boiler_temperature(room: int, temperature: int) -> bytes:
+    """보일러 설정 온도 프레임."""
+    return _boiler_frame(room, BOILER_CMD_SET_TEMP, temperature)
+
+
+@lru_cache(maxsize=256)
+def _boiler_frame(room: int, command: int, value: int) -> bytes:
+    """보일러 제어 프레임: 04 + 방번호 + 명령타입 + 값 + 000000 + 체크섬."""
+    data = bytes((BOILER_CONTROL_HEADER, room, command, value, 0x00, 0x00, 0x00))
+    return data + bytes((checksum(data),))
+
+
+@lru_cache(maxsize=64)
+def _frame(header: int, address: int, value: int = 0x00) -> bytes:
+    """패킷 표에 없는 주소의 프레임: 헤더 + 주소 + 값 + 00000000 + 체크섬."""
+    data = bytes((header, address, value, 0x00, 0x00, 0x00, 0x00))
+    return data + bytes((checksum(data),))
+
+
+def encode_master_power(is_on: bool) -> bytes:
+    """일괄소등 켜기/끄기 프레임."""
+    return MASTER_ON_FRAME if is_on else MASTER_OFF_FRAME
+
+
+# ===== 디코더 =====
+
+def decode_light_status(frame: bytes) -> tuple[int, bool] | None:
+    """조명 응답(B0/B1 + 상태 + 조명번호)에서 (조명번호, 켜짐) 을 읽습니다."""
+    if not _is_valid(frame):
+        return None
+    header, state, number, _, _ = _HEAD.unpack_from(frame)
+    if header not in (LIGHT_STATUS_RESPONSE_HEADER, LIGHT_CONTROL_RESPONSE_HEADER):
+        return None
+    if state not in (0x00, 0x01):
+        return None
+    return number, state == 0x01
+
+
+def decode_boiler_status(frame: bytes) -> BoilerStatus | None:
+    """보일러 상태/제어 응답(82/84 + 상태 + 방번호 + 현재온도 + 설정온도)을 읽습니다."""
+    if not _is_valid(frame):
+        return None
+    header, state, room, current_temp, set_temp = _HEAD.unpack_from(frame)
+    if header not in (BOILER_STATUS_RESPONSE_HEADER, BOILER_CONTROL_RESPONSE_HEADER):
+        return None
+    return BoilerStatus(room, state, current_temp, set_temp)
+
+
+def decode_master_status(frame: bytes) -> bool | None:
+    """일괄소등 상태/제어 응답(A0/A2 + 상태 + 01)을 읽습니다."""
+    if not _is_valid(frame):
+        return None
+    header, state, address, _, _ = _HEAD.unpack_from(frame)
+    if header not in (MASTER_STATUS_RESPONSE_HEADER, MASTER_CONTROL_RESPONSE_HEADER):
+        return None
+    if address != MASTER_ADDRESS:
+        return None
+    if state not in (0x00, 0x01):
+        return None
+    return state == 0x01
+
+
+def decode_doorbell(frame: bytes) -> str | None:
+    """도어벨 프레임에서 이벤트(DOORBELL_RING / DOORBELL_CALL_END)를 읽습니다."""
+    if len(frame) >= 15 and frame.startswith(_DOORBELL_RING_PREFIX):
+        return DOORBELL_RING
+    if len(frame) >= 16 and frame.startswith(_DOORBELL_CALL_END_PREFIX):
+        return DOORBELL_CALL_END
+    return None
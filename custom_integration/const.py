@@ -8,6 +8,10 @@ DEFAULT_NAME = "Commax"
 DEFAULT_SCAN_INTERVAL = 1  # 1초마다 상태 조회
 DEFAULT_BAUD_RATE = 9600
 DEFAULT_TIMEOUT = 0.1
+DEFAULT_PASSIVE = False
+DEFAULT_TRACE_SPANS = False
+DEFAULT_CAPTURE = False
+DEFAULT_UNAVAILABLE_AFTER = 30  # 30초 동안 응답이 없으면 사용 불가
 
 # Configuration
 CONF_NAME = "name"
@@ -15,9 +19,64 @@ CONF_PORT = "port"
 CONF_BAUD_RATE = "baud_rate"
 CONF_TIMEOUT = "timeout"
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_PASSIVE = "passive"  # 상태 조회 없이 월패드 트래픽만 수신
+CONF_NIGHT_START = "night_start"  # 야간 조회 시작 시각 (시)
+CONF_NIGHT_END = "night_end"  # 야간 조회 종료 시각 (시)
+CONF_TRACE_SPANS = "trace_spans"  # 명령 구간 기록을 파일로 남김
+CONF_CAPTURE = "capture"  # 모든 송수신 바이트를 캡처 파일로 남김
+CONF_UNAVAILABLE_AFTER = "unavailable_after"  # 이 시간(초) 동안 응답이 없는 기기는 사용 불가
+CONF_LIGHTS = "lights"  # 탐색으로 찾은 조명 번호 목록
+CONF_BOILERS = "boilers"  # 탐색으로 찾은 보일러 방번호 목록
+
+# ===== 버스 구간 =====
+# 기기 종류마다 다른 RS485 구간(포트)에 연결할 수 있습니다.
+SEGMENT_LIGHT = "light"  # 조명, 일괄소등
+SEGMENT_BOILER = "boiler"  # 보일러
+SEGMENT_ELEVATOR = "elevator"  # 엘리베이터
+SEGMENT_DOORBELL = "doorbell"  # 도어벨, 현관문
+SEGMENTS = (SEGMENT_LIGHT, SEGMENT_BOILER, SEGMENT_ELEVATOR, SEGMENT_DOORBELL)
+# 구간별 포트/통신 속도 설정 키 (예: "boiler_port"). 비우면 기본 포트/속도를 씁니다.
+CONF_SEGMENT_PORT = "{}_port"
+CONF_SEGMENT_BAUD_RATE = "{}_baud_rate"
+
+# 명령 구간 기록 파일 (Home Assistant 설정 디렉터리 기준)
+SPAN_FILE_NAME = "commax_spans.log"
+# 버스 캡처 파일 (시작 시각이 붙습니다)
+CAPTURE_FILE_FORMAT = "commax_%Y%m%d_%H%M%S.cmxcap"
+
+# ===== 적응형 폴링 =====
+# 상태 변경/명령 직후 조회 간격 (초). 변화가 없으면 두 배씩 늘어납니다.
+POLL_FAST_INTERVAL = 0.25
+# 기기 종류별 최대 조회 간격 (초). 조명은 scan_interval 을 사용합니다.
+BOILER_POLL_MAX_INTERVAL = 60
+MASTER_POLL_MAX_INTERVAL = 16
+# 야간 시간대에는 최대 조회 간격에 이 값을 곱합니다.
+NIGHT_INTERVAL_FACTOR = 4
+
+# ===== 상태 감시 =====
+# 응답 없는 조회가 이 횟수 이상이고 unavailable_after 동안 응답이 없으면 사용 불가로 표시합니다.
+UNAVAILABLE_MISSED_POLLS = 2
+# 사용 불가 기기는 이 간격(초)으로만 조회해 다시 응답하는지 확인합니다.
+PROBE_INTERVAL = 30
+
+# ===== 기기 탐색 =====
+# 처음 설정할 때 이 번호까지 조회해 응답하는 기기만 만듭니다.
+DISCOVERY_MAX_LIGHTS = 16
+DISCOVERY_MAX_BOILERS = 8
+# 탐색 첫 시도의 응답 제한 시간 (초). 응답이 없던 주소는 설정한 제한 시간으로 한 번 더 조회합니다.
+DISCOVERY_TIMEOUT = 0.05
+DISCOVERY_ATTEMPTS = 2
+# 새로 설치한 기기를 찾아 저장된 구성에 더하는 서비스
+SERVICE_RESCAN = "rescan"
+
+# ===== 명령 병합 =====
+# 온도 슬라이더처럼 연속으로 들어오는 명령을 모으는 시간 (초)
+COMMAND_COALESCE_WINDOW = 0.1
 
 # ===== 조명 (Lighting) =====
 LIGHTING_DOMAIN = "lighting"
+LIGHT_QUERY_HEADER = 0x30
+LIGHT_CONTROL_HEADER = 0x31
 STATUS_QUERY_PACKETS = [
     "3001000000000031",  # 조명 1 상태 조회
     "3002000000000032",  # 조명 2 상태 조회
@@ -42,8 +101,13 @@ LIGHT_OFF_PACKETS = [
     "3105000000000036",  # 조명 5 OFF
 ]
 
+# 조명 응답 헤더 (B0/B1 + 상태 + 조명번호)
+LIGHT_STATUS_RESPONSE_HEADER = 0xB0
+LIGHT_CONTROL_RESPONSE_HEADER = 0xB1
+
 # ===== 보일러 (Boiler) =====
 BOILER_DOMAIN = "boiler"
+BOILER_QUERY_HEADER = 0x02
 
 # 보일러 상태 조회 패킷 (4개 방)
 BOILER_STATUS_QUERY_PACKETS = [
@@ -53,7 +117,13 @@ BOILER_STATUS_QUERY_PACKETS = [
     "0204000000000006",  # 방 4 상태 조회
 ]
 
-# 보일러 제어 패킷은 _make_boiler_packet() 메서드에서 동적 생성
+# 보일러 제어 프레임은 codec.encode_boiler_mode/encode_boiler_temperature 에서 생성
+# 04 + 방번호 + 명령타입 + 값 + 000000 + 체크섬
+BOILER_CONTROL_HEADER = 0x04
+BOILER_CMD_SET_TEMP = 0x03  # 값: 설정 온도
+BOILER_CMD_MODE = 0x04  # 값: 0x81 난방 ON, 0x00 OFF
+BOILER_MODE_ON = 0x81
+BOILER_MODE_OFF = 0x00
 
 # 보일러 응답 패턴
 BOILER_STATUS_RESPONSE_HEADER = 0x82
@@ -80,6 +150,9 @@ DOORBELL_BELL_RING_PACKET = "100109120101091201100000005A03"  # 벨 울림 감
 DOORBELL_CALL_END_PACKET = "0212010912010109120161000005B203"  # 통화 종료 감지
 DOORBELL_OPEN_DOOR_PACKET = "02110202090302020903054000017703"  # 문열기 명령
 
+# 도어벨 프레임 헤더 (0x10: 15바이트 벨 울림, 0x02: 16바이트 통화 종료)
+DOORBELL_FRAME_HEADERS = (0x10, 0x02)
+
 # ===== 엘리베이터 (Elevator) =====
 ELEVATOR_DOMAIN = "elevator"
 
@@ -94,6 +167,11 @@ MASTER_STATUS_QUERY = "2001000000000021"  # 상태 조회
 MASTER_ALL_ON_PACKET = "2201010100000025"  # 일괄소등 ON
 MASTER_ALL_OFF_PACKET = "2201000100000024"  # 일괄소등 OFF
 
+# 일괄소등 응답 헤더 (A0/A2 + 상태 + 01)
+MASTER_STATUS_RESPONSE_HEADER = 0xA0
+MASTER_CONTROL_RESPONSE_HEADER = 0xA2
+MASTER_ADDRESS = 0x01
+
 # 상태 응답 패턴
 STATUS_ON_PREFIX = "B001"
 STATUS_OFF_PREFIX = "B000"
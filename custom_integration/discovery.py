@@ -0,0 +1,93 @@
+"""Bus-scan device discovery for Commax Integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from .bus import PRIORITY_POLL, CommaxBus
+from .const import (
+    CONF_LIGHTS,
+    CONF_BOILERS,
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+    LIGHT_STATUS_RESPONSE_HEADER,
+    BOILER_STATUS_RESPONSE_HEADER,
+    DISCOVERY_MAX_LIGHTS,
+    DISCOVERY_MAX_BOILERS,
+    DISCOVERY_TIMEOUT,
+    DISCOVERY_ATTEMPTS,
+)
+from .codec import encode_light_query, encode_boiler_query
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_discover(
+    bus: CommaxBus,
+    max_lights: int = DISCOVERY_MAX_LIGHTS,
+    max_boilers: int = DISCOVERY_MAX_BOILERS,
+    boiler_bus: CommaxBus | None = None,
+) -> dict[str, list[int]] | None:
+    """조명 1..max_lights, 보일러 1..max_boilers 를 조회해 응답하는 주소를 찾습니다.
+
+    모든 조회를 한꺼번에 대기열에 넣어 버스가 쉬지 않고 다음 조회를 보내게
+    하고 (반이중 버스라 전송 자체는 하나씩), 첫 시도는 짧은 제한 시간을
+    씁니다. 응답이 없던 주소는 설정한 제한 시간으로 다시 조회합니다.
+    보일러가 다른 구간에 있으면 boiler_bus 로 조회하며, 두 구간은 동시에
+    탐색합니다. 아무 기기도 응답하지 않으면 None 을 반환합니다.
+    """
+    boiler_bus = boiler_bus or bus
+    probes: dict[tuple[str, int], tuple[CommaxBus, bytes, int, int]] = {
+        **{
+            (LIGHTING_DOMAIN, n): (bus, encode_light_query(n), LIGHT_STATUS_RESPONSE_HEADER, n)
+            for n in range(1, max_lights + 1)
+        },
+        **{
+            (BOILER_DOMAIN, room): (
+                boiler_bus, encode_boiler_query(room), BOILER_STATUS_RESPONSE_HEADER, room
+            )
+            for room in range(1, max_boilers + 1)
+        },
+    }
+    found: set[tuple[str, int]] = set()
+    first_pass = True
+
+    for _ in range(DISCOVERY_ATTEMPTS):
+        pending = [key for key in probes if key not in found]
+        replies = await asyncio.gather(
+            *(
+                probe_bus.async_request(
+                    frame,
+                    header,
+                    address,
+                    timeout=(
+                        min(probe_bus.reply_timeout, DISCOVERY_TIMEOUT)
+                        if first_pass
+                        else probe_bus.reply_timeout
+                    ),
+                    priority=PRIORITY_POLL,
+                )
+                for probe_bus, frame, header, address in map(probes.get, pending)
+            ),
+            return_exceptions=True,
+        )
+        found.update(
+            key
+            for key, reply in zip(pending, replies)
+            if reply is not None and not isinstance(reply, Exception)
+        )
+        if len(found) == len(probes):
+            break
+        first_pass = False
+
+    if not found:
+        return None
+
+    topology = {
+        CONF_LIGHTS: sorted(n for domain, n in found if domain == LIGHTING_DOMAIN),
+        CONF_BOILERS: sorted(n for domain, n in found if domain == BOILER_DOMAIN),
+    }
+    _LOGGER.info(
+        "기기 탐색 완료: 조명 %s, 보일러 %s", topology[CONF_LIGHTS], topology[CONF_BOILERS]
+    )
+    return topology
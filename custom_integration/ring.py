@@ -0,0 +1,76 @@
+"""Fixed-size ring buffer of recent bus frames for Commax Integration."""
+from __future__ import annotations
+
+import struct
+import time
+from collections.abc import Callable
+
+# 기록할 최근 프레임 수
+FRAME_HISTORY_SIZE = 512
+
+# 방향
+DIRECTION_RX = 0
+DIRECTION_TX = 1
+DIRECTION_NAMES = {DIRECTION_RX: "rx", DIRECTION_TX: "tx"}
+
+# 칸 하나: 단조 시각(double) + 방향 + 길이 + 프레임 (가장 긴 도어벨 프레임 16바이트)
+MAX_FRAME_BYTES = 16
+_SLOT = struct.Struct(f"<dBB{MAX_FRAME_BYTES}s")
+
+
+class FrameRing:
+    """Preallocated ring buffer of raw frames with timestamp and direction.
+
+    미리 할당한 bytearray 의 칸에 struct.pack_into 로 덮어쓰기만 하므로
+    프레임마다 객체를 만들거나 문자열로 바꾸지 않습니다. 해석(16진 문자열
+    변환)은 snapshot() 을 부를 때, 즉 누군가 진단 정보를 요청할 때만 합니다.
+    """
+
+    def __init__(
+        self,
+        capacity: int = FRAME_HISTORY_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the ring buffer."""
+        self.capacity = capacity
+        self._clock = clock
+        self._buffer = bytearray(capacity * _SLOT.size)
+        self._next = 0
+        self.recorded = 0
+
+    def record(self, direction: int, frame: bytes) -> None:
+        """프레임 하나를 가장 오래된 칸에 덮어씁니다."""
+        _SLOT.pack_into(
+            self._buffer,
+            self._next * _SLOT.size,
+            self._clock(),
+            direction,
+            min(len(frame), MAX_FRAME_BYTES),
+            frame,
+        )
+        self._next = (self._next + 1) % self.capacity
+        self.recorded += 1
+
+    def snapshot(self) -> list[tuple[float, int, bytes]]:
+        """기록된 프레임을 오래된 것부터 (시각, 방향, 프레임) 으로 반환합니다."""
+        count = min(self.recorded, self.capacity)
+        start = (self._next - count) % self.capacity
+        frames = []
+        for i in range(count):
+            timestamp, direction, length, data = _SLOT.unpack_from(
+                self._buffer, ((start + i) % self.capacity) * _SLOT.size
+            )
+            frames.append((timestamp, direction, data[:length]))
+        return frames
+
+    def as_list(self) -> list[dict[str, str | float]]:
+        """진단용: 지금 기준 경과 시간(초), 방향, 16진 프레임 목록을 반환합니다."""
+        now = self._clock()
+        return [
+            {
+                "age": round(now - timestamp, 4),
+                "dir": DIRECTION_NAMES[direction],
+                "frame": frame.hex().upper(),
+            }
+            for timestamp, direction, frame in self.snapshot()
+        ]
@@ -2,37 +2,35 @@
 from __future__ import annotations
 
 import logging
-import serial
 import asyncio
-from datetime import datetime
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_ON, STATE_OFF
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.const import CONF_NAME
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .bus import CommaxBus
 from .const import (
     DOMAIN,
-    CONF_PORT,
-    CONF_BAUD_RATE,
-    CONF_TIMEOUT,
     # 도어 관련
-    DOOR_OPEN_PACKET,
     DOOR_NAMES,
     # 엘리베이터 관련
-    ELEVATOR_CALL_PACKET,
     ELEVATOR_NAMES,
     # 일괄소등 관련
-    MASTER_STATUS_QUERY,
-    MASTER_ALL_ON_PACKET,
-    MASTER_ALL_OFF_PACKET,
+    MASTER_DOMAIN,
+    MASTER_CONTROL_RESPONSE_HEADER,
+    MASTER_ADDRESS,
     MASTER_NAMES,
-    # 공통
-    STATUS_ON_PREFIX,
-    STATUS_OFF_PREFIX,
+    # 버스 구간
+    SEGMENT_ELEVATOR,
+    SEGMENT_DOORBELL,
 )
+from .codec import DOOR_OPEN_FRAME, ELEVATOR_CALL_FRAME, encode_master_power
+from .coordinator import CommaxCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,15 +41,15 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Commax Switch platform."""
-    config = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator: CommaxCoordinator = hass.data[DOMAIN][config_entry.entry_id]
     
     switches = []
     
-    # 도어 스위치
+    # 도어 스위치 (도어벨 구간)
     for i, name in enumerate(DOOR_NAMES):
         door = CommaxDoor(
             hass,
-            config,
+            coordinator.bus_for(SEGMENT_DOORBELL),
             i,
             name
         )
@@ -61,7 +59,7 @@ async def async_setup_entry(
     for i, name in enumerate(ELEVATOR_NAMES):
         elevator = CommaxElevator(
             hass,
-            config,
+            coordinator.bus_for(SEGMENT_ELEVATOR),
             i,
             name
         )
@@ -70,35 +68,32 @@ async def async_setup_entry(
     # 일괄소등 스위치
     for i, name in enumerate(MASTER_NAMES):
         master = CommaxMasterSwitch(
-            hass,
-            config,
+            coordinator,
             i,
             name
         )
         switches.append(master)
     
-    async_add_entities(switches, True)
+    async_add_entities(switches)
 
 
 class CommaxDoor(SwitchEntity):
     """Representation of a Commax Door."""
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any], index: int, name: str) -> None:
+    def __init__(self, hass: HomeAssistant, bus: CommaxBus, index: int, name: str) -> None:
         """Initialize the door."""
         self.hass = hass
-        self.config = config
+        self.config = bus.config
         self.index = index
         self._attr_name = name
         self._attr_unique_id = f"{DOMAIN}_door"
         self._attr_is_on = False
         
-        # 시리얼 통신 관련
-        self._serial_port = None
-        self._serial_lock = asyncio.Lock()
+        # 상태 조회 없이 명령만 전송하므로 폴링하지 않습니다.
+        self._attr_should_poll = False
         
-        # 상태 조회 관련
-        self._last_status_check = None
-        self._status_check_interval = config.get("scan_interval", 1)
+        # 공유 RS485 버스
+        self._bus = bus
         
         _LOGGER.info(f"Commax Door {name} (index: {index}) 초기화 완료")
 
@@ -114,7 +109,7 @@ class CommaxDoor(SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Open the door."""
-        await self._send_command(DOOR_OPEN_PACKET)
+        await self._send_command(DOOR_OPEN_FRAME)
         self._attr_is_on = True
         self.async_write_ha_state()
         
@@ -128,72 +123,34 @@ class CommaxDoor(SwitchEntity):
         # 도어는 원격으로 닫을 수 없으므로 아무 동작 안함
         pass
 
-    async def _send_command(self, packet: str) -> None:
-        """시리얼 포트로 명령을 전송합니다."""
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    data = bytes.fromhex(packet)
-                    self._serial_port.write(data)
-                    _LOGGER.debug(f"도어 {self.index + 1} 명령 전송: {packet}")
-                    await asyncio.sleep(0.075)
-                    
-            except Exception as e:
-                _LOGGER.error(f"도어 {self.index + 1} 명령 전송 실패: {e}")
-                await self._reconnect_serial()
-
-    async def _connect_serial(self) -> None:
-        """시리얼 포트에 연결합니다."""
+    async def _send_command(self, packet: bytes) -> None:
+        """공유 버스로 명령을 전송합니다."""
         try:
-            self._serial_port = serial.Serial(
-                port=self.config[CONF_PORT],
-                baudrate=self.config[CONF_BAUD_RATE],
-                timeout=self.config[CONF_TIMEOUT],
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE
-            )
-            _LOGGER.info(f"시리얼 포트 {self.config[CONF_PORT]} 연결 성공")
+            await self._bus.async_send(packet)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"도어 {self.index + 1} 명령 전송: {packet.hex().upper()}")
         except Exception as e:
-            _LOGGER.error(f"시리얼 포트 연결 실패: {e}")
-            self._serial_port = None
-
-    async def _reconnect_serial(self) -> None:
-        """시리얼 포트를 재연결합니다."""
-        if self._serial_port:
-            self._serial_port.close()
-            self._serial_port = None
-        await self._connect_serial()
-
-    async def async_update(self) -> None:
-        """도어 상태를 업데이트합니다."""
-        # 도어는 상태 조회가 아닌 문열기 명령만 있으므로
-        # 주기적인 상태 업데이트는 하지 않습니다.
-        pass
+            _LOGGER.error(f"도어 {self.index + 1} 명령 전송 실패: {e}")
+
 
 
 class CommaxElevator(SwitchEntity):
     """Representation of a Commax Elevator."""
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any], index: int, name: str) -> None:
+    def __init__(self, hass: HomeAssistant, bus: CommaxBus, index: int, name: str) -> None:
         """Initialize the elevator."""
         self.hass = hass
-        self.config = config
+        self.config = bus.config
         self.index = index
         self._attr_name = name
         self._attr_unique_id = f"{DOMAIN}_elevator"
         self._attr_is_on = False
         
-        # 시리얼 통신 관련
-        self._serial_port = None
-        self._serial_lock = asyncio.Lock()
+        # 상태 조회 없이 명령만 전송하므로 폴링하지 않습니다.
+        self._attr_should_poll = False
         
-        # 상태 조회 관련
-        self._last_status_check = None
-        self._status_check_interval = config.get("scan_interval", 1)
+        # 공유 RS485 버스
+        self._bus = bus
         
         _LOGGER.info(f"Commax Elevator {name} (index: {index}) 초기화 완료")
 
@@ -209,7 +166,7 @@ class CommaxElevator(SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Call the elevator."""
-        await self._send_command(ELEVATOR_CALL_PACKET)
+        await self._send_command(ELEVATOR_CALL_FRAME)
         self._attr_is_on = True
         self.async_write_ha_state()
         
@@ -224,72 +181,28 @@ class CommaxElevator(SwitchEntity):
         self._attr_is_on = False
         self.async_write_ha_state()
 
-    async def _send_command(self, packet: str) -> None:
-        """시리얼 포트로 명령을 전송합니다."""
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    data = bytes.fromhex(packet)
-                    self._serial_port.write(data)
-                    _LOGGER.debug(f"엘리베이터 {self.index + 1} 명령 전송: {packet}")
-                    await asyncio.sleep(0.075)
-                    
-            except Exception as e:
-                _LOGGER.error(f"엘리베이터 {self.index + 1} 명령 전송 실패: {e}")
-                await self._reconnect_serial()
-
-    async def _connect_serial(self) -> None:
-        """시리얼 포트에 연결합니다."""
+    async def _send_command(self, packet: bytes) -> None:
+        """공유 버스로 명령을 전송합니다."""
         try:
-            self._serial_port = serial.Serial(
-                port=self.config[CONF_PORT],
-                baudrate=self.config[CONF_BAUD_RATE],
-                timeout=self.config[CONF_TIMEOUT],
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE
-            )
-            _LOGGER.info(f"시리얼 포트 {self.config[CONF_PORT]} 연결 성공")
+            await self._bus.async_send(packet)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"엘리베이터 {self.index + 1} 명령 전송: {packet.hex().upper()}")
         except Exception as e:
-            _LOGGER.error(f"시리얼 포트 연결 실패: {e}")
-            self._serial_port = None
-
-    async def _reconnect_serial(self) -> None:
-        """시리얼 포트를 재연결합니다."""
-        if self._serial_port:
-            self._serial_port.close()
-            self._serial_port = None
-        await self._connect_serial()
-
-    async def async_update(self) -> None:
-        """엘리베이터 상태를 업데이트합니다."""
-        # 엘리베이터는 상태 조회가 아닌 호출 명령만 있으므로
-        # 주기적인 상태 업데이트는 하지 않습니다.
-        pass
+            _LOGGER.error(f"엘리베이터 {self.index + 1} 명령 전송 실패: {e}")
+
 
 
-class CommaxMasterSwitch(SwitchEntity):
+class CommaxMasterSwitch(CoordinatorEntity[CommaxCoordinator], SwitchEntity, RestoreEntity):
     """Representation of a Commax Master Switch."""
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any], index: int, name: str) -> None:
+    def __init__(self, coordinator: CommaxCoordinator, index: int, name: str) -> None:
         """Initialize the master switch."""
-        self.hass = hass
-        self.config = config
+        super().__init__(coordinator)
         self.index = index
         self._attr_name = name
         self._attr_unique_id = f"{DOMAIN}_master"
         self._attr_is_on = False
-        
-        # 시리얼 통신 관련
-        self._serial_port = None
-        self._serial_lock = asyncio.Lock()
-        
-        # 상태 조회 관련
-        self._last_status_check = None
-        self._status_check_interval = config.get("scan_interval", 1)
+        self._update_from_cache()
         
         _LOGGER.info(f"Commax Master Switch {name} (index: {index}) 초기화 완료")
 
@@ -303,104 +216,74 @@ class CommaxMasterSwitch(SwitchEntity):
         """Return true if all lights are on."""
         return self._attr_is_on
 
+    @property
+    def available(self) -> bool:
+        """일괄소등 스위치가 월패드 조회에 응답하고 있으면 사용 가능합니다."""
+        return super().available and self.coordinator.device_available(
+            MASTER_DOMAIN, MASTER_ADDRESS
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """첫 조회 응답 전까지는 마지막으로 기록된 상태를 표시합니다."""
+        await super().async_added_to_hass()
+        if self.coordinator.data[MASTER_DOMAIN] is not None:
+            return
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.state in (STATE_ON, STATE_OFF):
+            self._attr_is_on = last_state.state == STATE_ON
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on all lights."""
-        await self._send_command(MASTER_ALL_ON_PACKET)
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        await self._async_set_power(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off all lights."""
-        await self._send_command(MASTER_ALL_OFF_PACKET)
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        await self._async_set_power(False)
+
+    async def _async_set_power(self, is_on: bool) -> None:
+        """확인된 상태와 다를 때만 일괄소등 명령을 전송합니다.
+
+        대기 중인 다른 일괄소등 명령이 있으면 생략하지 않고 대체합니다.
+        """
+        if self.coordinator.confirmed(
+            MASTER_DOMAIN, MASTER_ADDRESS
+        ) is is_on and not self.coordinator.bus.has_pending(
+            (MASTER_DOMAIN, MASTER_ADDRESS, "power")
+        ):
+            _LOGGER.debug(f"일괄소등 {self.index + 1} 이미 {'ON' if is_on else 'OFF'} 상태, 명령 생략")
+            return
+
+        await self._send_command(encode_master_power(is_on))
+        self.coordinator.async_set_master(is_on)
 
-    async def _send_command(self, packet: str) -> None:
-        """시리얼 포트로 명령을 전송합니다."""
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    data = bytes.fromhex(packet)
-                    self._serial_port.write(data)
-                    _LOGGER.debug(f"일괄소등 {self.index + 1} 명령 전송: {packet}")
-                    await asyncio.sleep(0.075)
-                    
-            except Exception as e:
-                _LOGGER.error(f"일괄소등 {self.index + 1} 명령 전송 실패: {e}")
-                await self._reconnect_serial()
-
-    async def _connect_serial(self) -> None:
-        """시리얼 포트에 연결합니다."""
+    async def _send_command(self, packet: bytes) -> None:
+        """공유 버스로 명령을 전송합니다.
+
+        아직 전송되지 않은 이전 켜기/끄기 명령은 이 명령으로 대체됩니다.
+        """
         try:
-            self._serial_port = serial.Serial(
-                port=self.config[CONF_PORT],
-                baudrate=self.config[CONF_BAUD_RATE],
-                timeout=self.config[CONF_TIMEOUT],
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE
+            await self.coordinator.bus.async_request(
+                packet,
+                MASTER_CONTROL_RESPONSE_HEADER,
+                MASTER_ADDRESS,
+                coalesce_key=(MASTER_DOMAIN, MASTER_ADDRESS, "power"),
             )
-            _LOGGER.info(f"시리얼 포트 {self.config[CONF_PORT]} 연결 성공")
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"일괄소등 {self.index + 1} 명령 전송: {packet.hex().upper()}")
         except Exception as e:
-            _LOGGER.error(f"시리얼 포트 연결 실패: {e}")
-            self._serial_port = None
-
-    async def _reconnect_serial(self) -> None:
-        """시리얼 포트를 재연결합니다."""
-        if self._serial_port:
-            self._serial_port.close()
-            self._serial_port = None
-        await self._connect_serial()
-
-    async def async_update(self) -> None:
-        """일괄소등 상태를 업데이트합니다."""
-        now = datetime.now()
-        if (self._last_status_check and 
-            (now - self._last_status_check).total_seconds() < self._status_check_interval):
+            _LOGGER.error(f"일괄소등 {self.index + 1} 명령 전송 실패: {e}")
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """코디네이터 상태 캐시가 갱신되면 호출됩니다."""
+        self._update_from_cache()
+        super()._handle_coordinator_update()
+
+    def _update_from_cache(self) -> None:
+        """상태 캐시에서 일괄소등 상태를 읽어옵니다."""
+        is_on = self.coordinator.data[MASTER_DOMAIN]
+        if is_on is None or is_on == self._attr_is_on:
             return
-        
-        self._last_status_check = now
-        
-        async with self._serial_lock:
-            try:
-                if not self._serial_port:
-                    await self._connect_serial()
-                
-                if self._serial_port:
-                    data = bytes.fromhex(MASTER_STATUS_QUERY)
-                    self._serial_port.write(data)
-                    await asyncio.sleep(0.1)  # 100ms 대기
-                    
-                    if self._serial_port.in_waiting > 0:
-                        response = self._serial_port.read(self._serial_port.in_waiting)
-                        if len(response) >= 8:
-                            status = self._parse_master_status(response)
-                            if status is not None:
-                                old_state = self._attr_is_on
-                                self._attr_is_on = status
-                                
-                                if old_state != self._attr_is_on:
-                                    _LOGGER.info(f"일괄소등 {self.index + 1} 상태 변경: {old_state} -> {self._attr_is_on}")
-                    
-            except Exception as e:
-                _LOGGER.error(f"일괄소등 {self.index + 1} 상태 조회 실패: {e}")
-                await self._reconnect_serial()
-
-    def _parse_master_status(self, data: bytes) -> bool | None:
-        """일괄소등 상태 응답 패킷을 파싱합니다."""
-        if len(data) < 8:
-            return None
-        
-        # Go 코드의 parseAlloffStatusPacket 로직과 동일
-        if data[0] != 0xA0:
-            return None
-        
-        if data[1] == 0x01 and data[2] == 0x01:
-            return True  # ON
-        elif data[1] == 0x00 and data[2] == 0x01:
-            return False  # OFF
-        
-        return None 
\ No newline at end of file
+
+        _LOGGER.info(f"일괄소등 {self.index + 1} 상태 변경: {self._attr_is_on} -> {is_on}")
+        self._attr_is_on = is_on
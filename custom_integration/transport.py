@@ -0,0 +1,391 @@
+"""Non-blocking RS485 transports for Commax Integration."""
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import logging
+import os
+import socket
+import struct
+import termios
+from collections.abc import Callable
+from functools import partial
+from urllib.parse import urlsplit
+
+import serial
+
+_LOGGER = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 1024
+
+# 8N1: 시작 비트 + 데이터 8비트 + 정지 비트
+BITS_PER_BYTE = 10
+# 프레임 사이 최소 무신호 구간 (문자 시간 단위, Modbus RTU 의 t3.5 와 같음)
+INTER_FRAME_GAP_CHARS = 3.5
+
+# RS485-TCP 게이트웨이 (EW11 등) 주소 형식: tcp://호스트:포트 또는 socket://호스트:포트
+TCP_SCHEMES = ("tcp", "socket")
+TCP_CONNECT_TIMEOUT = 5.0
+# 게이트웨이가 조용히 사라진 경우(전원, Wi-Fi 끊김)를 알아채기 위한 TCP keepalive (초, 횟수)
+TCP_KEEPALIVE_IDLE = 10
+TCP_KEEPALIVE_INTERVAL = 5
+TCP_KEEPALIVE_COUNT = 3
+
+
+def frame_airtime(nbytes: int, baudrate: int) -> float:
+    """nbytes 바이트가 선로 위에서 차지하는 시간(초)을 반환합니다."""
+    return nbytes * BITS_PER_BYTE / baudrate
+
+
+def inter_frame_gap(baudrate: int) -> float:
+    """프레임 사이에 필요한 최소 무신호 시간(초)을 반환합니다."""
+    return frame_airtime(INTER_FRAME_GAP_CHARS, baudrate)
+
+
+def parse_tcp_url(port: str) -> tuple[str, int] | None:
+    """게이트웨이 주소이면 (호스트, 포트) 를, 시리얼 포트 이름이면 None 을 반환합니다."""
+    url = urlsplit(port)
+    if url.scheme not in TCP_SCHEMES:
+        return None
+    if not url.hostname or url.port is None:
+        raise ValueError(f"게이트웨이 주소에 호스트와 포트가 필요합니다: {port}")
+    return url.hostname, url.port
+
+
+async def async_open_transport(
+    port: str,
+    baudrate: int,
+    on_data: Callable[[bytes], None],
+    on_lost: Callable[[Exception | None], None],
+) -> SerialTransport | TcpTransport:
+    """포트 이름에 맞는 트랜스포트(로컬 시리얼 포트 또는 TCP 게이트웨이)를 엽니다."""
+    if parse_tcp_url(port) is not None:
+        return await TcpTransport.async_open(port, baudrate, on_data, on_lost)
+    return await SerialTransport.async_open(port, baudrate, on_data, on_lost)
+
+
+class SerialTransport:
+    """Non-blocking transport for a local serial port.
+
+    serial-asyncio 방식처럼 tty 파일 디스크립터를 이벤트 루프에 등록하고,
+    읽기/쓰기를 모두 루프 콜백에서 처리하여 어댑터가 느리거나 멈춰도
+    Home Assistant 이벤트 루프를 막지 않습니다.
+
+    마지막 수신 시각(last_rx)과 보드레이트로 계산한 송신 완료 예상
+    시각(tx_done_at)을 기록하여 버스가 조용한지 판단할 수 있게 합니다.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        serial_port: serial.Serial,
+        on_data: Callable[[bytes], None],
+        on_lost: Callable[[Exception | None], None],
+    ) -> None:
+        """Initialize the transport."""
+        self._loop = loop
+        self._serial = serial_port
+        self._fd = serial_port.fileno()
+        self.baudrate: int = serial_port.baudrate
+        self.last_rx = 0.0
+        self.tx_done_at = 0.0
+        self._on_data = on_data
+        self._on_lost = on_lost
+        self._write_buffer = bytearray()
+        self._drain_waiters: list[asyncio.Future[None]] = []
+        self._closed = False
+
+        os.set_blocking(self._fd, False)
+        loop.add_reader(self._fd, self._read_ready)
+
+    @classmethod
+    async def async_open(
+        cls,
+        port: str,
+        baudrate: int,
+        on_data: Callable[[bytes], None],
+        on_lost: Callable[[Exception | None], None],
+    ) -> SerialTransport:
+        """시리얼 포트를 열고 이벤트 루프에 등록합니다."""
+        loop = asyncio.get_running_loop()
+        # 포트 열기 자체는 블로킹이므로 executor 에서 수행합니다.
+        serial_port = await loop.run_in_executor(
+            None,
+            partial(
+                serial.Serial,
+                port=port,
+                baudrate=baudrate,
+                timeout=0,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+            ),
+        )
+        return cls(loop, serial_port, on_data, on_lost)
+
+    @property
+    def is_closed(self) -> bool:
+        """Return true if the transport is closed."""
+        return self._closed
+
+    def write(self, data: bytes) -> None:
+        """데이터를 즉시 쓰고, 남은 부분은 쓰기 가능해질 때 이어서 씁니다."""
+        if self._closed:
+            raise ConnectionError("시리얼 포트가 닫혀 있습니다")
+
+        # 앞서 쓴 데이터가 다 나간 뒤부터 이 데이터의 전송 시간이 흐릅니다.
+        self.tx_done_at = max(self._loop.time(), self.tx_done_at) + frame_airtime(
+            len(data), self.baudrate
+        )
+
+        if not self._write_buffer:
+            try:
+                written = os.write(self._fd, data)
+            except BlockingIOError:
+                written = 0
+            except OSError as exc:
+                self._fatal_error(exc)
+                raise
+            if written == len(data):
+                return
+            data = data[written:]
+            self._loop.add_writer(self._fd, self._write_ready)
+
+        self._write_buffer += data
+
+    async def async_drain(self) -> None:
+        """쓰기 버퍼가 모두 커널로 넘어갈 때까지 기다립니다."""
+        if self._closed:
+            raise ConnectionError("시리얼 포트가 닫혀 있습니다")
+        if not self._write_buffer:
+            return
+        waiter = self._loop.create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    async def async_wait_sent(self) -> None:
+        """마지막 바이트가 선로로 나갈 때까지 기다립니다 (tcdrain 과 같은 의미).
+
+        tcdrain 은 블로킹이므로, 보드레이트로 계산한 전송 시간만큼 기다린 뒤
+        커널 출력 큐(TIOCOUTQ)가 빌 때까지 남은 바이트의 전송 시간만큼씩
+        더 기다립니다.
+        """
+        await self.async_drain()
+        delay = self.tx_done_at - self._loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        while not self._closed and (queued := self._output_queued()) > 0:
+            await asyncio.sleep(frame_airtime(queued, self.baudrate))
+
+    def close(self) -> None:
+        """포트를 닫고 대기 중인 drain 을 깨웁니다."""
+        if self._closed:
+            return
+        self._closed = True
+        self._loop.remove_reader(self._fd)
+        self._loop.remove_writer(self._fd)
+        self._write_buffer.clear()
+        self._wake_drain_waiters(ConnectionError("시리얼 포트가 닫혔습니다"))
+        try:
+            self._serial.close()
+        except Exception as e:  # pylint: disable=broad-except
+            _LOGGER.debug("시리얼 포트 닫기 실패: %s", e)
+
+    def _read_ready(self) -> None:
+        """읽기 가능 콜백: 수신 데이터를 버스로 전달합니다."""
+        try:
+            data = os.read(self._fd, READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as exc:
+            self._fatal_error(exc)
+            return
+
+        if not data:
+            self._fatal_error(ConnectionError("시리얼 포트 EOF"))
+            return
+
+        self.last_rx = self._loop.time()
+        self._on_data(data)
+
+    def _write_ready(self) -> None:
+        """쓰기 가능 콜백: 버퍼에 남은 데이터를 씁니다."""
+        try:
+            written = os.write(self._fd, self._write_buffer)
+        except BlockingIOError:
+            return
+        except OSError as exc:
+            self._fatal_error(exc)
+            return
+
+        del self._write_buffer[:written]
+        if not self._write_buffer:
+            self._loop.remove_writer(self._fd)
+            self._wake_drain_waiters()
+
+    def _output_queued(self) -> int:
+        """커널 출력 큐에 남은 바이트 수를 반환합니다 (알 수 없으면 0)."""
+        try:
+            result = fcntl.ioctl(self._fd, termios.TIOCOUTQ, b"\0\0\0\0")
+        except OSError:
+            return 0
+        return struct.unpack("i", result)[0]
+
+    def _wake_drain_waiters(self, exc: Exception | None = None) -> None:
+        """drain 대기자들을 깨웁니다."""
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
+
+    def _fatal_error(self, exc: Exception) -> None:
+        """I/O 오류 시 포트를 닫고 버스에 알립니다."""
+        if self._closed:
+            return
+        self.close()
+        self._on_lost(exc)
+
+
+class TcpTransport(asyncio.Protocol):
+    """Transport for an RS485-to-TCP gateway (EW11 style).
+
+    게이트웨이마다 TCP 연결 하나를 열어 두고 계속 사용하므로 명령마다 연결
+    비용이 들지 않습니다. 버스는 한 번에 프레임 하나만 보내므로 Nagle
+    알고리즘을 끄고 쓰기를 바로 소켓으로 넘깁니다. 게이트웨이가 끊거나
+    keepalive 로 끊긴 연결을 알아채면 버스에 알리고, 버스의 감독자가
+    백그라운드에서 백오프 간격으로 다시 연결합니다.
+
+    선로 위의 전송 시간은 알 수 없으므로 SerialTransport 와 같이 보드레이트로
+    계산한 송신 완료 예상 시각(tx_done_at)을 기록합니다.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        baudrate: int,
+        on_data: Callable[[bytes], None],
+        on_lost: Callable[[Exception | None], None],
+    ) -> None:
+        """Initialize the transport."""
+        self._loop = loop
+        self.baudrate = baudrate
+        self.last_rx = 0.0
+        self.tx_done_at = 0.0
+        self._on_data = on_data
+        self._on_lost = on_lost
+        self._transport: asyncio.Transport | None = None
+        self._drain_waiters: list[asyncio.Future[None]] = []
+        self._paused = False
+        self._closed = False
+
+    @classmethod
+    async def async_open(
+        cls,
+        port: str,
+        baudrate: int,
+        on_data: Callable[[bytes], None],
+        on_lost: Callable[[Exception | None], None],
+    ) -> TcpTransport:
+        """게이트웨이에 연결합니다."""
+        host, tcp_port = parse_tcp_url(port)
+        loop = asyncio.get_running_loop()
+        async with asyncio.timeout(TCP_CONNECT_TIMEOUT):
+            _, protocol = await loop.create_connection(
+                lambda: cls(loop, baudrate, on_data, on_lost), host, tcp_port
+            )
+        return protocol
+
+    @property
+    def is_closed(self) -> bool:
+        """Return true if the transport is closed."""
+        return self._closed
+
+    def write(self, data: bytes) -> None:
+        """데이터를 바로 소켓으로 보냅니다 (남은 부분은 asyncio 가 이어서 보냄)."""
+        if self._closed:
+            raise ConnectionError("게이트웨이 연결이 닫혀 있습니다")
+
+        self.tx_done_at = max(self._loop.time(), self.tx_done_at) + frame_airtime(
+            len(data), self.baudrate
+        )
+        self._transport.write(data)
+
+    async def async_drain(self) -> None:
+        """소켓 버퍼가 넘쳐 있으면 빠질 때까지 기다립니다."""
+        if self._closed:
+            raise ConnectionError("게이트웨이 연결이 닫혀 있습니다")
+        if not self._paused:
+            return
+        waiter = self._loop.create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    async def async_wait_sent(self) -> None:
+        """게이트웨이가 마지막 바이트를 선로로 내보낼 예상 시각까지 기다립니다."""
+        await self.async_drain()
+        delay = self.tx_done_at - self._loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def close(self) -> None:
+        """연결을 닫고 대기 중인 drain 을 깨웁니다."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake_drain_waiters(ConnectionError("게이트웨이 연결이 닫혔습니다"))
+        if self._transport is not None:
+            self._transport.close()
+
+    # ===== asyncio.Protocol =====
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """연결되면 Nagle 을 끄고 keepalive 를 켭니다."""
+        self._transport = transport
+        sock: socket.socket | None = transport.get_extra_info("socket")
+        if sock is None:
+            return
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for option, value in (
+            ("TCP_KEEPIDLE", TCP_KEEPALIVE_IDLE),
+            ("TCP_KEEPINTVL", TCP_KEEPALIVE_INTERVAL),
+            ("TCP_KEEPCNT", TCP_KEEPALIVE_COUNT),
+        ):
+            if hasattr(socket, option):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+    def data_received(self, data: bytes) -> None:
+        """수신 데이터를 버스로 전달합니다."""
+        self.last_rx = self._loop.time()
+        self._on_data(data)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """우리가 닫은 것이 아니면 버스에 연결 끊김을 알립니다."""
+        if self._closed:
+            return
+        self.close()
+        self._on_lost(exc or ConnectionError("게이트웨이가 연결을 끊었습니다"))
+
+    def pause_writing(self) -> None:
+        """소켓 버퍼가 가득 찼습니다."""
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        """소켓 버퍼가 비었습니다."""
+        self._paused = False
+        self._wake_drain_waiters()
+
+    def _wake_drain_waiters(self, exc: Exception | None = None) -> None:
+        """drain 대기자들을 깨웁니다."""
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
@@ -22,6 +22,7 @@ pip install black
 pip install flake8
 pip install pytest-asyncio
 pip install pytest-cov
+pip install pytest-benchmark
 
 Write-Host "개발 환경 설정이 완료되었습니다!" -ForegroundColor Green
 Write-Host "가상환경을 활성화하려면: .\venv\Scripts\Activate.ps1" -ForegroundColor Cyan
@@ -0,0 +1 @@
+"""Micro-benchmarks for the Commax protocol hot paths."""
@@ -0,0 +1,17 @@
+"""Fixtures for the Commax benchmarks."""
+import pytest
+
+
+@pytest.fixture
+def record_fps(benchmark):
+    """한 번 호출에 처리한 프레임 수로 초당 프레임 수를 결과에 기록합니다."""
+
+    def _record(frames: int) -> None:
+        benchmark.extra_info["frames"] = frames
+        # --benchmark-disable 로 실행하면 통계가 없습니다.
+        if benchmark.stats is not None:
+            benchmark.extra_info["frames_per_second"] = round(
+                frames / benchmark.stats.stats.mean
+            )
+
+    return _record
@@ -0,0 +1,49 @@
+"""Benchmark reading and replaying a bus capture."""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_integration.capture import CaptureReader, CaptureWriter
+from custom_integration.framer import CommaxFramer
+from custom_integration.ring import DIRECTION_RX
+
+from .test_framer_benchmark import FRAME_COUNT, _mixed_stream
+
+
+@pytest.fixture(scope="module")
+def capture_path(tmp_path_factory) -> str:
+    """쓰레기 바이트와 나뉜 프레임이 섞인 수신 청크로 만든 캡처 파일."""
+    path = str(tmp_path_factory.mktemp("capture") / "mixed.cmxcap")
+    chunks, _ = _mixed_stream()
+    writer = CaptureWriter(path)
+    for chunk in chunks:
+        writer.record(DIRECTION_RX, chunk)
+    writer.close()
+    return path
+
+
+def test_capture_read(benchmark, record_fps, capture_path) -> None:
+    """mmap 리더로 레코드를 순회하는 비용."""
+
+    def _read() -> int:
+        with CaptureReader(capture_path) as reader:
+            return sum(1 for _ in reader)
+
+    benchmark(_read)
+    record_fps(FRAME_COUNT)
+
+
+def test_capture_replay_framing(benchmark, record_fps, capture_path) -> None:
+    """캡처를 최대 속도로 읽어 프레임으로 나누는 비용."""
+
+    def _replay() -> int:
+        frames: list[bytes] = []
+        framer = CommaxFramer(frames.append)
+        with CaptureReader(capture_path) as reader:
+            for _, _, data in reader:
+                framer.feed(data)
+        return len(frames)
+
+    assert _replay() >= FRAME_COUNT * 0.95
+    benchmark(_replay)
+    record_fps(FRAME_COUNT)
@@ -0,0 +1,85 @@
+"""Benchmark frame encoding and decoding."""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_integration import codec
+from custom_integration.const import (
+    BOILER_CMD_SET_TEMP,
+    DOORBELL_BELL_RING_PACKET,
+    DOORBELL_CALL_END_PACKET,
+)
+
+LIGHT_REPLIES = [
+    bytes([0xB0, state, number, 0, 0, 0, 0, (0xB0 + state + number) & 0xFF])
+    for number in range(1, 6)
+    for state in (0, 1)
+]
+BOILER_REPLIES = [
+    bytes([0x82, 0x83, room, 22, 24, 0, 0, (0x82 + 0x83 + room + 22 + 24) & 0xFF])
+    for room in range(1, 5)
+]
+MASTER_REPLIES = [bytes.fromhex("A0010100000000A2"), bytes.fromhex("A0000100000000A1")]
+DOORBELL_FRAMES = [
+    bytes.fromhex(DOORBELL_BELL_RING_PACKET),
+    bytes.fromhex(DOORBELL_CALL_END_PACKET),
+]
+
+
+def _encode_commands() -> int:
+    count = 0
+    for number in range(1, 6):
+        codec.encode_light_power(number, True)
+        codec.encode_light_power(number, False)
+        count += 2
+    for room in range(1, 5):
+        codec.encode_boiler_mode(room, True)
+        codec.encode_boiler_mode(room, False)
+        for temperature in range(18, 28):
+            codec.encode_boiler_temperature(room, temperature)
+        count += 12
+    codec.encode_master_power(True)
+    codec.encode_master_power(False)
+    return count + 2
+
+
+def test_encode_commands(benchmark, record_fps) -> None:
+    """조명/보일러/일괄소등 명령 프레임 생성."""
+    frames = benchmark(_encode_commands)
+    record_fps(frames)
+
+
+def test_encode_boiler_uncached(benchmark, record_fps) -> None:
+    """캐시를 거치지 않은 보일러 제어 프레임 생성 (체크섬 계산 포함)."""
+    build = codec._boiler_frame.__wrapped__
+
+    def _encode() -> int:
+        for room in range(1, 5):
+            for temperature in range(18, 28):
+                build(room, BOILER_CMD_SET_TEMP, temperature)
+        return 40
+
+    record_fps(benchmark(_encode))
+
+
+@pytest.mark.parametrize(
+    ("decode", "replies"),
+    [
+        (codec.decode_light_status, LIGHT_REPLIES),
+        (codec.decode_boiler_status, BOILER_REPLIES),
+        (codec.decode_master_status, MASTER_REPLIES),
+        (codec.decode_doorbell, DOORBELL_FRAMES),
+    ],
+    ids=["light", "boiler", "master", "doorbell"],
+)
+def test_decode_replies(benchmark, record_fps, decode, replies) -> None:
+    """응답 프레임 해석."""
+    batch = replies * (100 // len(replies))
+
+    def _decode() -> int:
+        for frame in batch:
+            decode(frame)
+        return len(batch)
+
+    assert all(decode(frame) is not None for frame in replies)
+    record_fps(benchmark(_decode))
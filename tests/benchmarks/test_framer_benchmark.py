@@ -0,0 +1,60 @@
+"""Benchmark stream framing."""
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_integration.framer import CommaxFramer
+
+from .test_codec_benchmark import (
+    BOILER_REPLIES,
+    DOORBELL_FRAMES,
+    LIGHT_REPLIES,
+    MASTER_REPLIES,
+)
+
+ALL_FRAMES = [*LIGHT_REPLIES, *BOILER_REPLIES, *MASTER_REPLIES, *DOORBELL_FRAMES]
+FRAME_COUNT = 1000
+
+
+def _mixed_stream(seed: int = 0) -> tuple[list[bytes], int]:
+    """쓰레기 바이트가 섞이고 임의로 나뉜 수신 청크와 실제 프레임 수를 만듭니다."""
+    rng = random.Random(seed)
+    stream = bytearray()
+    for _ in range(FRAME_COUNT):
+        if rng.random() < 0.2:
+            # 충돌/노이즈로 생긴 쓰레기 바이트
+            stream += bytes(rng.randrange(256) for _ in range(rng.randint(1, 5)))
+        stream += rng.choice(ALL_FRAMES)
+
+    chunks = []
+    pos = 0
+    while pos < len(stream):
+        size = rng.randint(1, 24)
+        chunks.append(bytes(stream[pos:pos + size]))
+        pos += size
+    return chunks, FRAME_COUNT
+
+
+def _frame(chunks: list[bytes]) -> int:
+    frames: list[bytes] = []
+    framer = CommaxFramer(frames.append)
+    for chunk in chunks:
+        framer.feed(chunk)
+    return len(frames)
+
+
+def test_frame_clean_stream(benchmark, record_fps) -> None:
+    """프레임 경계에 맞춰 들어오는 깨끗한 스트림."""
+    chunks = ALL_FRAMES * (FRAME_COUNT // len(ALL_FRAMES))
+    assert _frame(chunks) == len(chunks)
+    record_fps(benchmark(_frame, chunks))
+
+
+def test_frame_mixed_stream(benchmark, record_fps) -> None:
+    """쓰레기 바이트와 나뉜 프레임이 섞인 스트림."""
+    chunks, expected = _mixed_stream()
+    # 쓰레기 바이트가 우연히 프레임처럼 보일 수 있어 대부분만 확인합니다.
+    assert _frame(chunks) >= expected * 0.95
+    record_fps(benchmark(_frame, chunks))
@@ -0,0 +1,21 @@
+"""Benchmark frame capture into the ring buffer."""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_integration.ring import DIRECTION_RX, FrameRing
+
+from .test_framer_benchmark import ALL_FRAMES, FRAME_COUNT
+
+
+def test_ring_record(benchmark, record_fps) -> None:
+    """수신 프레임을 링 버퍼에 기록하는 비용."""
+    ring = FrameRing()
+    frames = ALL_FRAMES * (FRAME_COUNT // len(ALL_FRAMES))
+
+    def _record() -> int:
+        for frame in frames:
+            ring.record(DIRECTION_RX, frame)
+        return len(frames)
+
+    record_fps(benchmark(_record))
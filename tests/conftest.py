@@ -0,0 +1,64 @@
+"""Fixtures for the Commax tests."""
+import os
+import tty
+
+import pytest
+import pytest_asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_integration.const import (
+    CONF_PORT,
+    CONF_BAUD_RATE,
+    CONF_TIMEOUT,
+    DEFAULT_BAUD_RATE,
+    DEFAULT_TIMEOUT,
+)
+
+from .simulator import WallpadSimulator
+
+
+@pytest.fixture
+def pty_pair():
+    """가상 시리얼 포트(pty) 쌍을 생성합니다: (마스터 fd, 슬레이브 경로)."""
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    yield master, path
+    os.close(slave)
+    os.close(master)
+
+
+@pytest.fixture
+def bus_config():
+    """포트 이름으로 기본 통신 속도와 타임아웃의 버스 설정을 만드는 함수.
+
+    다른 값이 필요하면 {**bus_config(path), CONF_TIMEOUT: 1} 처럼 덮어씁니다.
+    """
+
+    def _config(port: str) -> dict:
+        return {
+            CONF_PORT: port,
+            CONF_BAUD_RATE: DEFAULT_BAUD_RATE,
+            CONF_TIMEOUT: DEFAULT_TIMEOUT,
+        }
+
+    return _config
+
+
+@pytest_asyncio.fixture
+async def core_hass(tmp_path):
+    """플랫폼 없이 코어만 동작하는 Home Assistant 인스턴스."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest_asyncio.fixture
+async def wallpad():
+    """pty 위에서 동작하는 가상 월패드."""
+    simulator = WallpadSimulator(seed=0)
+    await simulator.async_start()
+    yield simulator
+    await simulator.async_stop()
@@ -0,0 +1,347 @@
+"""Virtual Commax wallpad on a pseudo-terminal.
+
+실제 하드웨어 없이 통합구성요소를 끝에서 끝까지 시험하기 위한 월패드
+시뮬레이터입니다. pty 쌍을 열고 슬레이브 경로를 시리얼 포트처럼
+통합구성요소에 넘기면, 마스터 쪽에서 실제 프로토콜로 응답합니다.
+
+    python -m tests.simulator --latency 0.02 --jitter 0.005 --background 1
+
+- 조명: 30 조회 -> B0, 31 제어 -> B1 (상태 + 조명번호)
+- 보일러: 02 조회 -> 82, 04 제어 -> 84 (상태 + 방번호 + 현재온도 + 설정온도)
+- 일괄소등: 20 조회 -> A0, 22 제어 -> A2
+- 도어벨: 벨 울림(10 ...)/통화 종료(02 ...) 프레임을 임의로 보냅니다.
+- 응답 지연/지터, 바이트 유실, 체크섬 오류를 흉내 낼 수 있습니다.
+- 월패드 자체의 상태 조회(조회 + 응답)를 버스에 흘릴 수 있습니다.
+- RS485-TCP 게이트웨이(EW11 등)처럼 TCP 로도 접속할 수 있습니다 (--tcp).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import signal
+import tty
+
+from custom_integration.const import (
+    BOILER_STATE_HEATING,
+    BOILER_STATE_OFF,
+    DOOR_OPEN_PACKET,
+    DOORBELL_BELL_RING_PACKET,
+    DOORBELL_CALL_END_PACKET,
+    ELEVATOR_CALL_PACKET,
+)
+from custom_integration.framer import CommaxFramer
+
+_LOGGER = logging.getLogger(__name__)
+
+DOOR_OPEN_FRAME = bytes.fromhex(DOOR_OPEN_PACKET)
+ELEVATOR_CALL_FRAME = bytes.fromhex(ELEVATOR_CALL_PACKET)
+DOORBELL_RING_FRAME = bytes.fromhex(DOORBELL_BELL_RING_PACKET)
+DOORBELL_CALL_END_FRAME = bytes.fromhex(DOORBELL_CALL_END_PACKET)
+
+
+def frame(*data: int) -> bytes:
+    """7바이트 데이터에 체크섬을 붙여 8바이트 프레임을 만듭니다."""
+    data = (*data, *(0,) * (7 - len(data)))
+    return bytes([*data, sum(data) & 0xFF])
+
+
+class WallpadSimulator:
+    """Simulate a Commax wallpad and its devices behind a pty."""
+
+    def __init__(
+        self,
+        lights: int = 5,
+        rooms: int = 4,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        drop_rate: float = 0.0,
+        corrupt_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the simulator."""
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self._random = random.Random(seed)
+
+        # 기기 상태
+        self.lights: dict[int, bool] = {n: False for n in range(1, lights + 1)}
+        self.boilers: dict[int, dict[str, int]] = {
+            room: {"state": BOILER_STATE_OFF, "current_temp": 22, "set_temp": 20}
+            for room in range(1, rooms + 1)
+        }
+        self.master = True
+
+        # 관찰 기록
+        self.received: list[bytes] = []
+        self.events: list[str] = []
+
+        self._framer = CommaxFramer(self._handle_request)
+        self._master_fd: int | None = None
+        self._slave_fd: int | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._background: asyncio.Task | None = None
+        self.path: str | None = None
+
+        # TCP 게이트웨이
+        self._server: asyncio.Server | None = None
+        self._tcp_transports: set[asyncio.Transport] = set()
+        self.tcp_connections = 0
+
+    # ===== 수명 주기 =====
+
+    def open(self) -> str:
+        """pty 쌍을 열고 통합구성요소가 사용할 슬레이브 경로를 반환합니다."""
+        self._master_fd, self._slave_fd = os.openpty()
+        tty.setraw(self._master_fd)
+        tty.setraw(self._slave_fd)
+        self.path = os.ttyname(self._slave_fd)
+        return self.path
+
+    async def async_start(self) -> str:
+        """pty 를 열고 요청에 응답하기 시작합니다."""
+        if self._master_fd is None:
+            self.open()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._master_fd, self._read_ready)
+        return self.path
+
+    async def async_serve_tcp(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """RS485-TCP 게이트웨이처럼 TCP 접속을 받고 게이트웨이 주소를 반환합니다."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await self._loop.create_server(
+            lambda: _GatewayProtocol(self), host, port
+        )
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"tcp://{host}:{port}"
+
+    def drop_tcp_connections(self) -> None:
+        """게이트웨이 재부팅처럼 모든 TCP 연결을 끊습니다."""
+        for transport in list(self._tcp_transports):
+            transport.close()
+
+    async def async_stop(self) -> None:
+        """응답을 멈추고 pty 와 TCP 서버를 닫습니다."""
+        if self._server is not None:
+            self._server.close()
+            self.drop_tcp_connections()
+            await self._server.wait_closed()
+            self._server = None
+        self.stop_background_polling()
+        if self._loop is not None and self._master_fd is not None:
+            self._loop.remove_reader(self._master_fd)
+        for fd in (self._slave_fd, self._master_fd):
+            if fd is not None:
+                os.close(fd)
+        self._master_fd = self._slave_fd = None
+
+    # ===== 월패드 동작 =====
+
+    def ring_doorbell(self) -> None:
+        """현관 벨 울림 프레임을 보냅니다."""
+        self.events.append("ring")
+        self._write(DOORBELL_RING_FRAME)
+
+    def end_call(self) -> None:
+        """통화 종료 프레임을 보냅니다."""
+        self.events.append("call_end")
+        self._write(DOORBELL_CALL_END_FRAME)
+
+    def press_wall_switch(self, number: int, is_on: bool) -> None:
+        """벽 스위치로 조명을 바꿉니다 (버스에는 아무것도 보내지 않음)."""
+        self.lights[number] = is_on
+
+    def start_background_polling(self, interval: float) -> None:
+        """월패드 자체의 상태 조회(조회 + 응답)를 interval 초마다 버스에 흘립니다."""
+        self.stop_background_polling()
+        self._background = self._loop.create_task(self._async_background_poll(interval))
+
+    def stop_background_polling(self) -> None:
+        """월패드 자체의 상태 조회를 멈춥니다."""
+        if self._background is not None:
+            self._background.cancel()
+            self._background = None
+
+    async def _async_background_poll(self, interval: float) -> None:
+        """모든 기기를 차례로 조회하는 월패드 트래픽을 흉내 냅니다."""
+        while True:
+            for number in self.lights:
+                self._write(frame(0x30, number) + self._light_reply(0xB0, number))
+                await asyncio.sleep(interval / (len(self.lights) + len(self.boilers) + 1))
+            for room in self.boilers:
+                self._write(frame(0x02, room) + self._boiler_reply(0x82, room))
+                await asyncio.sleep(interval / (len(self.lights) + len(self.boilers) + 1))
+            self._write(frame(0x20, 0x01) + self._master_reply(0xA0))
+            await asyncio.sleep(interval / (len(self.lights) + len(self.boilers) + 1))
+
+    # ===== 요청 처리 =====
+
+    def _read_ready(self) -> None:
+        """통합구성요소가 보낸 바이트를 읽어 프레임으로 나눕니다."""
+        try:
+            data = os.read(self._master_fd, 1024)
+        except OSError:
+            return
+        self._framer.feed(data)
+
+    def _handle_request(self, request: bytes) -> None:
+        """요청 프레임 하나에 응답합니다."""
+        self.received.append(request)
+        header = request[0]
+
+        if request == DOOR_OPEN_FRAME:
+            self.events.append("door_open")
+            return
+        if request == ELEVATOR_CALL_FRAME:
+            self.events.append("elevator_call")
+            return
+
+        reply: bytes | None = None
+        if header == 0x30 and request[1] in self.lights:
+            reply = self._light_reply(0xB0, request[1])
+        elif header == 0x31 and request[1] in self.lights:
+            self.lights[request[1]] = request[2] == 0x01
+            # 조명을 켜면 일괄소등이 풀립니다.
+            if self.lights[request[1]]:
+                self.master = True
+            reply = self._light_reply(0xB1, request[1])
+        elif header == 0x02 and len(request) == 8 and request[1] in self.boilers:
+            reply = self._boiler_reply(0x82, request[1])
+        elif header == 0x04 and request[1] in self.boilers:
+            boiler = self.boilers[request[1]]
+            if request[2] == 0x04:
+                boiler["state"] = BOILER_STATE_HEATING if request[3] else BOILER_STATE_OFF
+            elif request[2] == 0x03:
+                boiler["set_temp"] = request[3]
+            reply = self._boiler_reply(0x84, request[1])
+        elif header == 0x20:
+            reply = self._master_reply(0xA0)
+        elif header == 0x22:
+            self.master = request[2] == 0x01
+            if not self.master:
+                for number in self.lights:
+                    self.lights[number] = False
+            reply = self._master_reply(0xA2)
+
+        if reply is None:
+            _LOGGER.debug("응답하지 않는 요청: %s", request.hex().upper())
+            return
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            self._loop.call_later(delay, self._write, self._inject_faults(reply))
+        else:
+            self._write(self._inject_faults(reply))
+
+    def _light_reply(self, header: int, number: int) -> bytes:
+        return frame(header, int(self.lights[number]), number)
+
+    def _boiler_reply(self, header: int, room: int) -> bytes:
+        boiler = self.boilers[room]
+        return frame(header, boiler["state"], room, boiler["current_temp"], boiler["set_temp"])
+
+    def _master_reply(self, header: int) -> bytes:
+        return frame(header, int(self.master), 0x01)
+
+    def _inject_faults(self, reply: bytes) -> bytes:
+        """설정된 확률로 바이트를 잃거나 체크섬을 망가뜨립니다."""
+        if self.drop_rate and self._random.random() < self.drop_rate:
+            index = self._random.randrange(len(reply))
+            reply = reply[:index] + reply[index + 1:]
+        if self.corrupt_rate and self._random.random() < self.corrupt_rate:
+            reply = reply[:-1] + bytes([reply[-1] ^ 0xFF])
+        return reply
+
+    def _write(self, data: bytes) -> None:
+        if self._master_fd is not None:
+            os.write(self._master_fd, data)
+        for transport in self._tcp_transports:
+            transport.write(data)
+
+
+class _GatewayProtocol(asyncio.Protocol):
+    """TCP 로 받은 바이트를 월패드에 넘기는 게이트웨이 연결 하나."""
+
+    def __init__(self, simulator: WallpadSimulator) -> None:
+        self._simulator = simulator
+        self._transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport
+        self._simulator._tcp_transports.add(transport)
+        self._simulator.tcp_connections += 1
+
+    def data_received(self, data: bytes) -> None:
+        self._simulator._framer.feed(data)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._simulator._tcp_transports.discard(self._transport)
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    """명령행에서 시뮬레이터를 실행합니다."""
+    simulator = WallpadSimulator(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop,
+        corrupt_rate=args.corrupt,
+        seed=args.seed,
+    )
+    path = await simulator.async_start()
+    if args.tcp is not None:
+        print(f"Commax 게이트웨이: {await simulator.async_serve_tcp(args.host, args.tcp)}", flush=True)
+    if args.link:
+        if os.path.lexists(args.link):
+            os.remove(args.link)
+        os.symlink(path, args.link)
+        path = args.link
+    print(f"Commax 월패드 시뮬레이터: {path}", flush=True)
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel
+    )
+
+    if args.background:
+        simulator.start_background_polling(args.background)
+    try:
+        while True:
+            if args.ring_every:
+                await asyncio.sleep(args.ring_every)
+                simulator.ring_doorbell()
+                await asyncio.sleep(1)
+                simulator.end_call()
+            else:
+                await asyncio.sleep(3600)
+    finally:
+        await simulator.async_stop()
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+
+
+def main() -> None:
+    """Entry point for ``python -m tests.simulator``."""
+    parser = argparse.ArgumentParser(description="Virtual Commax wallpad on a pty")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 지연의 최대값 (초)")
+    parser.add_argument("--drop", type=float, default=0.0, help="응답에서 바이트를 잃을 확률")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="응답 체크섬을 망가뜨릴 확률")
+    parser.add_argument("--background", type=float, default=0.0, help="월패드 자체 조회 주기 (초, 0 이면 끔)")
+    parser.add_argument("--ring-every", type=float, default=0.0, help="도어벨을 울리는 주기 (초)")
+    parser.add_argument("--link", help="pty 경로를 가리키는 심볼릭 링크 (예: /tmp/commax)")
+    parser.add_argument("--seed", type=int, help="장애 주입 난수 시드")
+    parser.add_argument("--tcp", type=int, help="RS485-TCP 게이트웨이처럼 이 TCP 포트로도 접속을 받음")
+    parser.add_argument("--host", default="127.0.0.1", help="게이트웨이 주소 (--tcp 와 함께)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_async_main(args))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
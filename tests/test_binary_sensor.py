@@ -0,0 +1,72 @@
+"""Test the doorbell binary sensor platform."""
+import asyncio
+
+import pytest
+
+from custom_integration.binary_sensor import CommaxDoorbell
+from custom_integration.bus import CommaxBus
+from custom_integration.const import (
+    DOORBELL_NAMES,
+)
+
+RINGS = 20
+
+
+async def _wait_for(condition) -> None:
+    async with asyncio.timeout(1):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+@pytest.mark.asyncio
+async def test_doorbell_ring_is_written_from_receive_path(core_hass, wallpad, bus_config) -> None:
+    """벨 울림은 수신 경로에서 바로 처리되고, 기다리는 동안 깨어나는 작업이 없습니다."""
+    bus = CommaxBus(
+        core_hass,
+        bus_config(wallpad.path),
+    )
+    await bus.async_start()
+    transport = bus._transport
+    receiving = False
+    on_data = transport._on_data
+
+    def _on_data(data: bytes) -> None:
+        nonlocal receiving
+        receiving = True
+        try:
+            on_data(data)
+        finally:
+            receiving = False
+
+    transport._on_data = _on_data
+
+    doorbell = CommaxDoorbell(core_hass, bus, 0, DOORBELL_NAMES[0])
+    doorbell.entity_id = "binary_sensor.doorbell"
+    # 상태를 쓸 때마다 수신 콜백 안에서 불렸는지 기록합니다.
+    from_receive_path: list[bool] = []
+    write_ha_state = doorbell.async_write_ha_state
+
+    def _record_write() -> None:
+        from_receive_path.append(receiving)
+        write_ha_state()
+
+    doorbell.async_write_ha_state = _record_write
+    tasks_before = asyncio.all_tasks()
+    await doorbell.async_added_to_hass()
+    assert asyncio.all_tasks() == tasks_before
+
+    try:
+        for _ in range(RINGS):
+            wallpad.ring_doorbell()
+            await _wait_for(lambda: doorbell.is_on)
+            assert core_hass.states.get("binary_sensor.doorbell").state == "on"
+
+            wallpad.end_call()
+            await _wait_for(lambda: not doorbell.is_on)
+            assert core_hass.states.get("binary_sensor.doorbell").state == "off"
+    finally:
+        await bus.async_close()
+
+    # 50ms 주기 감시 루프나 별도 작업을 거치지 않고 프레임을 받은 콜백에서 씁니다.
+    assert len(from_receive_path) == 2 * RINGS
+    assert all(from_receive_path)
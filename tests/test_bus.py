@@ -0,0 +1,312 @@
+"""Test the shared RS485 bus."""
+import asyncio
+import os
+
+import pytest
+from unittest.mock import MagicMock
+
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_integration.bus import PRIORITY_POLL, CommaxBus
+from custom_integration.const import (
+    CONF_TIMEOUT,
+    DEFAULT_TIMEOUT,
+)
+from custom_integration.codec import (
+    LIGHT_ON_FRAMES,
+    LIGHT_QUERY_FRAMES,
+    BOILER_QUERY_FRAMES,
+    encode_boiler_temperature,
+)
+from custom_integration.transport import inter_frame_gap
+
+
+@pytest.mark.asyncio
+async def test_bus_shares_single_port(pty_pair, bus_config) -> None:
+    """여러 엔티티가 동시에 전송해도 프레임이 섞이지 않습니다."""
+    master, path = pty_pair
+    bus = CommaxBus(MagicMock(), bus_config(path))
+
+    await asyncio.gather(
+        *(bus.async_send(frame) for frame in LIGHT_ON_FRAMES)
+    )
+
+    written = b""
+    while len(written) < 8 * len(LIGHT_ON_FRAMES):
+        written += os.read(master, 1024)
+    frames = {written[i:i + 8] for i in range(0, len(written), 8)}
+    assert frames == set(LIGHT_ON_FRAMES)
+    await bus.async_close()
+
+
+@pytest.mark.asyncio
+async def test_bus_dispatches_reply_by_header(pty_pair, bus_config) -> None:
+    """응답 프레임은 헤더가 일치하는 리스너에게만 전달됩니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    bus = CommaxBus(MagicMock(), bus_config(path))
+    lights: list[bytes] = []
+    boilers: list[bytes] = []
+    bus.async_add_listener(0xB0, lights.append)
+    remove = bus.async_add_listener((0x82, 0x84), boilers.append)
+
+    def _answer() -> None:
+        if os.read(master, 1024) == LIGHT_QUERY_FRAMES[0]:
+            # 응답을 두 번에 나눠 보냅니다.
+            os.write(master, bytes.fromhex("B00101"))
+            os.write(master, bytes.fromhex("00000000B2"))
+
+    loop.add_reader(master, _answer)
+    try:
+        reply = await bus.async_request(LIGHT_QUERY_FRAMES[0], 0xB0, 1)
+    finally:
+        loop.remove_reader(master)
+
+    assert reply == bytes.fromhex("B0010100000000B2")
+    assert lights == [bytes.fromhex("B0010100000000B2")]
+    assert boilers == []
+    remove()
+    await bus.async_close()
+
+
+@pytest.mark.asyncio
+async def test_bus_reports_connect_failure(bus_config) -> None:
+    """없는 포트는 예외를 전달하고 다음 요청에서 다시 연결을 시도합니다."""
+    bus = CommaxBus(MagicMock(), bus_config("/dev/does-not-exist"))
+
+    with pytest.raises(Exception):
+        await bus.async_send(LIGHT_ON_FRAMES[0])
+    with pytest.raises(Exception):
+        await bus.async_send(LIGHT_ON_FRAMES[0])
+
+
+@pytest.mark.asyncio
+async def test_request_completes_on_reply(pty_pair, bus_config) -> None:
+    """응답이 도착하는 즉시 요청이 끝나며 제한 시간을 기다리지 않습니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    bus = CommaxBus(MagicMock(), {**bus_config(path), CONF_TIMEOUT: 5})
+
+    def _answer() -> None:
+        os.read(master, 1024)
+        os.write(master, bytes.fromhex("B0010100000000B2"))
+
+    loop.add_reader(master, _answer)
+    try:
+        start = loop.time()
+        reply = await bus.async_request(LIGHT_QUERY_FRAMES[0], 0xB0, 1)
+        elapsed = loop.time() - start
+    finally:
+        loop.remove_reader(master)
+        await bus.async_close()
+
+    assert reply == bytes.fromhex("B0010100000000B2")
+    assert elapsed < 1
+
+
+@pytest.mark.asyncio
+async def test_request_ignores_other_address(pty_pair, bus_config) -> None:
+    """다른 기기의 응답으로는 요청이 끝나지 않고 제한 시간 후 None 을 반환합니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    bus = CommaxBus(MagicMock(), bus_config(path))
+    lights: list[bytes] = []
+    bus.async_add_listener(0xB0, lights.append)
+
+    def _answer() -> None:
+        os.read(master, 1024)
+        # 2번 조명의 응답
+        os.write(master, bytes.fromhex("B0010200000000B3"))
+
+    loop.add_reader(master, _answer)
+    try:
+        start = loop.time()
+        reply = await bus.async_request(LIGHT_QUERY_FRAMES[0], 0xB0, 1)
+        elapsed = loop.time() - start
+    finally:
+        loop.remove_reader(master)
+        await bus.async_close()
+
+    assert reply is None
+    assert elapsed >= DEFAULT_TIMEOUT
+    assert lights == [bytes.fromhex("B0010200000000B3")]
+
+
+def _slow_wallpad(master: int, written: list[bytes], delay: float):
+    """delay 초 뒤에 같은 주소로 응답하는 월패드 reader 콜백을 만듭니다."""
+    loop = asyncio.get_running_loop()
+
+    def _reply(query: bytes) -> None:
+        reply = [query[0] | 0x80, 0x00, query[1], 0, 0, 0, 0]
+        os.write(master, bytes([*reply, sum(reply) & 0xFF]))
+
+    def _answer() -> None:
+        data = os.read(master, 1024)
+        for i in range(0, len(data), 8):
+            written.append(data[i:i + 8])
+            loop.call_later(delay, _reply, data[i:i + 8])
+
+    return _answer
+
+
+@pytest.mark.asyncio
+async def test_command_preempts_queued_polls(pty_pair, bus_config) -> None:
+    """사용자 명령은 대기 중인 상태 조회를 앞질러 진행 중인 요청 하나만 기다립니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    bus = CommaxBus(MagicMock(), {**bus_config(path), CONF_TIMEOUT: 1})
+    written: list[bytes] = []
+    loop.add_reader(master, _slow_wallpad(master, written, 0.02))
+
+    polls = [
+        *((frame, 0xB0, i + 1) for i, frame in enumerate(LIGHT_QUERY_FRAMES)),
+        *((frame, 0x82, i + 1) for i, frame in enumerate(BOILER_QUERY_FRAMES)),
+    ] * 3
+    try:
+        await bus.async_start()
+        poll_tasks = [
+            asyncio.create_task(bus.async_request(*poll, priority=PRIORITY_POLL))
+            for poll in polls
+        ]
+        await asyncio.sleep(0.01)
+
+        reply = await bus.async_request(LIGHT_ON_FRAMES[0], 0xB1, 1)
+        await asyncio.gather(*poll_tasks)
+    finally:
+        loop.remove_reader(master)
+        await bus.async_close()
+
+    assert reply is not None
+    # 진행 중이던 첫 조회 바로 다음에 명령이 전송됩니다.
+    assert written[1] == LIGHT_ON_FRAMES[0]
+    # 같은 조회가 대기 중이면 다시 넣지 않으므로 조회는 기기당 한 번입니다.
+    assert len(written) == 9 + 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_polls_share_one_transmission(pty_pair, bus_config) -> None:
+    """대기 중인 것과 같은 상태 조회는 한 번만 전송되고 결과를 함께 받습니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    bus = CommaxBus(MagicMock(), bus_config(path))
+    written: list[bytes] = []
+    loop.add_reader(master, _slow_wallpad(master, written, 0))
+
+    try:
+        replies = await asyncio.gather(
+            *(
+                bus.async_request(LIGHT_QUERY_FRAMES[0], 0xB0, 1, priority=PRIORITY_POLL)
+                for _ in range(5)
+            )
+        )
+    finally:
+        loop.remove_reader(master)
+        await bus.async_close()
+
+    assert written == [LIGHT_QUERY_FRAMES[0]]
+    assert len(set(replies)) == 1 and replies[0] is not None
+
+
+@pytest.mark.asyncio
+async def test_commands_coalesce_to_latest_value(pty_pair, bus_config) -> None:
+    """병합 창 안의 같은 종류 명령은 마지막 값 하나만 전송됩니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    bus = CommaxBus(MagicMock(), bus_config(path))
+    written: list[bytes] = []
+    loop.add_reader(master, _slow_wallpad(master, written, 0))
+
+    async def _drag() -> list:
+        tasks = []
+        for temp in range(20, 26):
+            tasks.append(asyncio.create_task(bus.async_request(
+                encode_boiler_temperature(1, temp), 0x84, 1,
+                coalesce_key=("boiler", 1, "temperature"), coalesce_window=0.05,
+            )))
+            await asyncio.sleep(0.005)
+        return await asyncio.gather(*tasks)
+
+    try:
+        replies = await _drag()
+    finally:
+        loop.remove_reader(master)
+        await bus.async_close()
+
+    assert written == [encode_boiler_temperature(1, 25)]
+    assert all(reply is not None for reply in replies)
+
+
+@pytest.mark.asyncio
+async def test_transmit_waits_for_bus_silence(pty_pair, bus_config) -> None:
+    """월패드가 전송 중이면 버스가 프레임 간격만큼 조용해진 뒤에 전송합니다."""
+    master, path = pty_pair
+    bus = CommaxBus(MagicMock(), bus_config(path))
+    await bus.async_start()
+    transport = bus._transport
+    gap = inter_frame_gap(transport.baudrate)
+
+    # 전송하는 순간의 시각과, 그때까지 버스가 본 마지막 수신 시각
+    sends: list[tuple[float, float]] = []
+    write = transport.write
+
+    def _record_write(data: bytes) -> None:
+        sends.append((asyncio.get_running_loop().time(), transport.last_rx))
+        write(data)
+
+    transport.write = _record_write
+
+    async def _chatter() -> None:
+        # 월패드 트래픽: 1ms 마다 한 바이트 (간격이 프레임 간격보다 짧음)
+        for _ in range(10):
+            os.write(master, b"\x00")
+            await asyncio.sleep(0.001)
+
+    chatter = asyncio.create_task(_chatter())
+    try:
+        async with asyncio.timeout(1):
+            while not transport.last_rx:
+                await asyncio.sleep(0)
+        busy_at = transport.last_rx
+        await bus.async_send(LIGHT_ON_FRAMES[0])
+        await chatter
+    finally:
+        await bus.async_close()
+
+    # 시각은 모두 버스가 기록한 값이라 이벤트 루프가 늦어져도 관계가 유지됩니다.
+    [(sent_at, last_rx)] = sends
+    assert sent_at >= busy_at + gap
+    assert sent_at >= last_rx + gap
+
+
+@pytest.mark.asyncio
+async def test_write_stall_is_not_a_reply_timeout(pty_pair, monkeypatch, bus_config) -> None:
+    """어댑터가 쓰기에서 멈추면 응답 없음(None)이 아니라 전송 실패로 끝납니다."""
+    _, path = pty_pair
+    monkeypatch.setattr("custom_integration.bus.WRITE_TIMEOUT", 0.05)
+    bus = CommaxBus(MagicMock(), bus_config(path))
+    await bus.async_connect()
+    bus._transport.async_wait_sent = asyncio.Event().wait
+    try:
+        with pytest.raises(TimeoutError):
+            await bus.async_request(LIGHT_QUERY_FRAMES[0], 0xB0, 1)
+    finally:
+        await bus.async_close()
+
+    assert bus.stats.reply_timeouts == 0
+
+
+@pytest.mark.asyncio
+async def test_close_fails_request_in_flight(pty_pair, bus_config) -> None:
+    """응답을 기다리는 중에 버스를 닫으면 그 요청도 바로 실패합니다."""
+    _, path = pty_pair
+    bus = CommaxBus(MagicMock(), {**bus_config(path), CONF_TIMEOUT: 30})
+    request = asyncio.create_task(bus.async_request(LIGHT_ON_FRAMES[0], 0xB1, 1))
+    async with asyncio.timeout(1):
+        while bus._active is None:
+            await asyncio.sleep(0.001)
+
+    await bus.async_close()
+
+    async with asyncio.timeout(1):
+        with pytest.raises(HomeAssistantError):
+            await request
@@ -0,0 +1,185 @@
+"""Test bus capture, the mmap reader and replay."""
+import asyncio
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_integration.bus import CommaxBus
+from custom_integration.capture import (
+    FLUSH_INTERVAL,
+    CaptureReader,
+    CaptureWriter,
+    async_replay,
+)
+from custom_integration.const import (
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+)
+from custom_integration.codec import LIGHT_QUERY_FRAMES
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.ring import DIRECTION_RX, DIRECTION_TX
+
+LIGHT_3_ON = bytes.fromhex("B0010300000000B4")
+BOILER_1 = bytes.fromhex("8283011714000031")
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _write_capture(path, records) -> None:
+    """(경과 시간, 방향, 데이터) 목록으로 캡처 파일을 만듭니다."""
+    clock = _Clock()
+    writer = CaptureWriter(str(path), clock=clock)
+    start = clock.now
+    for elapsed, direction, data in records:
+        clock.now = start + elapsed
+        writer.record(direction, data)
+    writer.close()
+
+
+def test_round_trip(tmp_path) -> None:
+    """기록한 레코드를 시각, 방향, 바이트 그대로 다시 읽습니다."""
+    path = tmp_path / "bus.cmxcap"
+    records = [
+        (0.0, DIRECTION_TX, LIGHT_QUERY_FRAMES[2]),
+        (0.012, DIRECTION_RX, LIGHT_3_ON[:3]),
+        (0.013, DIRECTION_RX, LIGHT_3_ON[3:]),
+        (3600.5, DIRECTION_RX, bytes(300)),
+    ]
+    _write_capture(path, records)
+
+    with CaptureReader(str(path)) as reader:
+        frames = list(reader)
+
+    assert [(direction, data) for _, direction, data in frames] == [
+        (direction, data) for _, direction, data in records
+    ]
+    assert [ts for ts, _, _ in frames] == pytest.approx([ts for ts, _, _ in records])
+    # 헤더 16바이트 + 레코드마다 (시간 1~4 + 방향 1 + 길이 1~2) 바이트
+    assert path.stat().st_size < 16 + sum(len(data) + 7 for _, _, data in records)
+
+
+def test_rotates_at_max_size(tmp_path) -> None:
+    """최대 크기에 이르면 이전 파일 하나만 남기고 새 파일에 이어서 기록합니다."""
+    path = tmp_path / "bus.cmxcap"
+    clock = _Clock()
+    writer = CaptureWriter(str(path), clock=clock, max_bytes=128)
+    frames = [bytes([0xB0, 0x01, n, 0, 0, 0, 0, 0xB1 + n]) for n in range(40)]
+    for frame in frames:
+        clock.now += 0.01
+        writer.record(DIRECTION_RX, frame)
+    writer.close()
+
+    assert writer.rotations > 2
+    rotated = tmp_path / "bus.cmxcap.1"
+    # 파일 하나는 최대 크기에 레코드 하나(시간 1 + 방향 1 + 길이 1 + 데이터 8)를 넘지 않습니다.
+    assert path.stat().st_size < 128 + 11
+    assert rotated.stat().st_size < 128 + 11
+    assert not (tmp_path / "bus.cmxcap.2").exists()
+
+    with CaptureReader(str(rotated)) as old, CaptureReader(str(path)) as new:
+        old_frames, new_frames = list(old), list(new)
+    # 두 파일을 이어 읽으면 마지막 레코드들이 빠짐없이 순서대로 나옵니다.
+    kept = [data for _, _, data in old_frames + new_frames]
+    assert kept == frames[-len(kept):]
+    # 새 파일의 시각은 교체한 시점부터 이어집니다.
+    assert [ts for ts, _, _ in new_frames] == pytest.approx(
+        [0.01 * (i + 1) for i in range(len(new_frames))]
+    )
+
+
+def test_stops_when_file_cannot_be_opened(tmp_path, caplog) -> None:
+    """파일을 열지 못하면 오류를 한 번 남기고 더 이상 레코드를 쌓지 않습니다."""
+    clock = _Clock()
+    writer = CaptureWriter(str(tmp_path / "missing" / "bus.cmxcap"), clock=clock)
+    for _ in range(100):
+        if writer.failed:
+            break
+        time.sleep(0.01)
+    for _ in range(1000):
+        clock.now += FLUSH_INTERVAL
+        writer.record(DIRECTION_RX, LIGHT_3_ON)
+    writer.close()
+
+    assert writer.failed
+    assert writer._chunks.empty()
+    assert not writer._buffer
+    assert len([r for r in caplog.records if r.levelname == "ERROR"]) == 1
+
+
+def test_reader_stops_at_truncated_record(tmp_path) -> None:
+    """기록 도중 끊긴 마지막 레코드는 무시합니다."""
+    path = tmp_path / "bus.cmxcap"
+    _write_capture(path, [(0, DIRECTION_RX, LIGHT_3_ON), (0.1, DIRECTION_RX, BOILER_1)])
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with CaptureReader(str(path)) as reader:
+        assert [data for _, _, data in reader] == [LIGHT_3_ON]
+
+
+def test_reader_rejects_other_files(tmp_path) -> None:
+    """캡처 파일이 아니면 ValueError 입니다."""
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a capture file at all")
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("speed", [None, 1.0])
+async def test_replay_updates_state(core_hass, tmp_path, speed, bus_config) -> None:
+    """재생한 수신 데이터는 포트 없이도 상태 캐시에 반영되고, 실시간 재생은 간격을 지킵니다."""
+    path = tmp_path / "bus.cmxcap"
+    _write_capture(
+        path,
+        [
+            (0.0, DIRECTION_TX, LIGHT_QUERY_FRAMES[2]),
+            (0.01, DIRECTION_RX, b"\xff\x13" + LIGHT_3_ON[:5]),
+            (0.02, DIRECTION_RX, LIGHT_3_ON[5:] + BOILER_1),
+            (0.1, DIRECTION_RX, LIGHT_3_ON[:2] + b"\x00" + LIGHT_3_ON[3:]),
+        ],
+    )
+    bus = CommaxBus(MagicMock(), bus_config("/dev/null"))
+    coordinator = CommaxCoordinator(core_hass, bus)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    with CaptureReader(str(path)) as reader:
+        replayed = await async_replay(reader, bus, speed=speed)
+    elapsed = loop.time() - start
+    await coordinator.async_close()
+
+    assert replayed == 3
+    assert coordinator.data[LIGHTING_DOMAIN] == {3: True}
+    assert coordinator.data[BOILER_DOMAIN][1]["set_temp"] == 0x14
+    assert bus.stats.checksum_failures == 2
+    if speed is None:
+        assert elapsed < 0.05
+    else:
+        assert elapsed >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_bus_capture(core_hass, wallpad, tmp_path, bus_config) -> None:
+    """버스 캡처는 요청과 응답을 순서대로 남깁니다."""
+    path = tmp_path / "live.cmxcap"
+    bus = CommaxBus(core_hass, bus_config(wallpad.path))
+    bus.start_capture(str(path))
+    try:
+        await bus.async_request(LIGHT_QUERY_FRAMES[0], 0xB0, 1)
+    finally:
+        await bus.async_close()
+
+    with CaptureReader(str(path)) as reader:
+        frames = list(reader)
+    assert frames[0].direction == DIRECTION_TX
+    assert frames[0].data == LIGHT_QUERY_FRAMES[0]
+    assert b"".join(f.data for f in frames[1:] if f.direction == DIRECTION_RX) == (
+        bytes.fromhex("B0000100000000B1")
+    )
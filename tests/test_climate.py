@@ -0,0 +1,53 @@
+"""Test the boiler climate platform."""
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from homeassistant.const import ATTR_TEMPERATURE
+
+from custom_integration.bus import CommaxBus
+from custom_integration.climate import CommaxBoiler
+from custom_integration.const import (
+    BOILER_DOMAIN,
+)
+from custom_integration.coordinator import CommaxCoordinator
+
+
+@pytest_asyncio.fixture
+async def coordinator(core_hass, wallpad, bus_config):
+    """가상 월패드에 연결된 코디네이터."""
+    bus = CommaxBus(
+        core_hass,
+        bus_config(wallpad.path),
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+    await coordinator.async_refresh()
+    yield coordinator
+    await coordinator.async_close()
+
+
+@pytest.mark.asyncio
+async def test_slider_back_to_confirmed_temperature(core_hass, coordinator, wallpad) -> None:
+    """슬라이더를 20→21→20 으로 움직이면 대기 중인 21 을 20 으로 대체해 보냅니다."""
+    boiler = CommaxBoiler(coordinator, 0, "거실 보일러")
+    assert coordinator.confirmed(BOILER_DOMAIN, 1)["set_temp"] == 20
+
+    await asyncio.gather(
+        boiler.async_set_temperature(**{ATTR_TEMPERATURE: 21}),
+        boiler.async_set_temperature(**{ATTR_TEMPERATURE: 20}),
+    )
+
+    assert wallpad.boilers[1]["set_temp"] == 20
+    assert coordinator.data[BOILER_DOMAIN][1]["set_temp"] == 20
+
+
+@pytest.mark.asyncio
+async def test_confirmed_temperature_is_not_resent(core_hass, coordinator, wallpad) -> None:
+    """대기 중인 명령이 없고 확인된 온도와 같으면 보내지 않습니다."""
+    boiler = CommaxBoiler(coordinator, 0, "거실 보일러")
+    sent = len(wallpad.received)
+
+    await boiler.async_set_temperature(**{ATTR_TEMPERATURE: 20})
+
+    assert len(wallpad.received) == sent
@@ -0,0 +1,65 @@
+"""Test the Commax protocol codec."""
+from custom_integration import codec
+from custom_integration.const import (
+    STATUS_QUERY_PACKETS,
+    LIGHT_ON_PACKETS,
+    LIGHT_OFF_PACKETS,
+    BOILER_STATUS_QUERY_PACKETS,
+    MASTER_ALL_OFF_PACKET,
+    DOORBELL_BELL_RING_PACKET,
+    DOORBELL_CALL_END_PACKET,
+)
+
+
+def _frame(*data: int) -> bytes:
+    return bytes([*data, sum(data) & 0xFF])
+
+
+def test_fixed_frames_match_packet_tables() -> None:
+    """고정 프레임은 const 의 패킷 표와 같은 바이트입니다."""
+    for number in range(1, 6):
+        assert codec.encode_light_query(number).hex().upper() == STATUS_QUERY_PACKETS[number - 1]
+        assert codec.encode_light_power(number, True).hex().upper() == LIGHT_ON_PACKETS[number - 1]
+        assert codec.encode_light_power(number, False).hex().upper() == LIGHT_OFF_PACKETS[number - 1]
+    for room in range(1, 5):
+        assert codec.encode_boiler_query(room).hex().upper() == BOILER_STATUS_QUERY_PACKETS[room - 1]
+    assert codec.encode_master_power(False).hex().upper() == MASTER_ALL_OFF_PACKET
+
+
+def test_frames_beyond_packet_tables() -> None:
+    """패킷 표에 없는 주소의 프레임도 같은 형식으로 만듭니다."""
+    assert codec.encode_light_query(6) == bytes.fromhex("3006000000000036")
+    assert codec.encode_light_power(12, True) == bytes.fromhex("310C01000000003E")
+    assert codec.encode_light_power(12, False) == bytes.fromhex("310C00000000003D")
+    assert codec.encode_boiler_query(5) == bytes.fromhex("0205000000000007")
+
+
+def test_boiler_frames_are_memoized() -> None:
+    """보일러 제어 프레임은 체크섬을 포함하며 같은 값이면 같은 객체를 돌려줍니다."""
+    assert codec.encode_boiler_mode(2, True) == bytes.fromhex("040204810000008B")
+    assert codec.encode_boiler_mode(2, False) == bytes.fromhex("040204000000000A")
+    assert codec.encode_boiler_temperature(1, 25) == bytes.fromhex("0401031900000021")
+    assert codec.encode_boiler_temperature(1, 25) is codec.encode_boiler_temperature(1, 25)
+
+
+def test_decode_replies() -> None:
+    """응답 프레임을 타입이 있는 값으로 읽습니다."""
+    assert codec.decode_light_status(_frame(0xB0, 0x01, 0x03, 0, 0, 0, 0)) == (3, True)
+    assert codec.decode_light_status(_frame(0xB1, 0x00, 0x05, 0, 0, 0, 0)) == (5, False)
+    assert codec.decode_boiler_status(_frame(0x84, 0x81, 0x02, 22, 24, 0, 0)) == (
+        codec.BoilerStatus(room=2, state=0x81, current_temp=22, set_temp=24)
+    )
+    assert codec.decode_master_status(_frame(0xA0, 0x00, 0x01, 0, 0, 0, 0)) is False
+    assert codec.decode_doorbell(bytes.fromhex(DOORBELL_BELL_RING_PACKET)) == codec.DOORBELL_RING
+    assert codec.decode_doorbell(bytes.fromhex(DOORBELL_CALL_END_PACKET)) == codec.DOORBELL_CALL_END
+
+
+def test_decode_rejects_bad_frames() -> None:
+    """체크섬이나 헤더가 맞지 않으면 None 을 돌려줍니다."""
+    bad_checksum = bytearray(_frame(0xB0, 0x01, 0x01, 0, 0, 0, 0))
+    bad_checksum[7] ^= 0xFF
+    assert codec.decode_light_status(bytes(bad_checksum)) is None
+    assert codec.decode_light_status(_frame(0xB0, 0x02, 0x01, 0, 0, 0, 0)) is None
+    assert codec.decode_boiler_status(_frame(0xB0, 0x01, 0x01, 0, 0, 0, 0)) is None
+    assert codec.decode_master_status(_frame(0xA0, 0x01, 0x02, 0, 0, 0, 0)) is None
+    assert codec.decode_doorbell(codec.encode_boiler_query(1)) is None
@@ -0,0 +1,223 @@
+"""Test the poll cycle coordinator."""
+import asyncio
+import os
+
+import pytest
+
+from custom_integration.bus import CommaxBus
+from custom_integration.const import (
+    CONF_SCAN_INTERVAL,
+    CONF_PASSIVE,
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+    MASTER_DOMAIN,
+    STATUS_QUERY_PACKETS,
+    BOILER_STATUS_QUERY_PACKETS,
+    MASTER_STATUS_QUERY,
+)
+from custom_integration.coordinator import CommaxCoordinator, all_off_achieves
+
+
+def _frame(*data: int) -> bytes:
+    return bytes([*data, sum(data) & 0xFF])
+
+
+def _wallpad_reply(query: bytes) -> bytes:
+    """조회 프레임에 대한 월패드 응답을 만듭니다."""
+    header, address = query[0], query[1]
+    if header == 0x30:  # 조명: 홀수 번 조명만 켜짐
+        return _frame(0xB0, address % 2, address, 0, 0, 0, 0)
+    if header == 0x02:  # 보일러: 난방 중, 현재 23도, 설정 20도
+        return _frame(0x82, 0x83, address, 23, 20, 0, 0)
+    if header == 0x20:  # 일괄소등
+        return _frame(0xA0, 0x01, 0x01, 0, 0, 0, 0)
+    return b""
+
+
+@pytest.mark.asyncio
+async def test_poll_cycle_updates_cache(core_hass, pty_pair, bus_config) -> None:
+    """한 주기 동안 모든 기기를 한 번씩 조회하고 응답으로 캐시를 채웁니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    queries: list[bytes] = []
+
+    def _answer() -> None:
+        data = os.read(master, 1024)
+        for i in range(0, len(data), 8):
+            queries.append(data[i:i + 8])
+            os.write(master, _wallpad_reply(data[i:i + 8]))
+
+    bus = CommaxBus(
+        core_hass,
+        {**bus_config(path), CONF_SCAN_INTERVAL: 5},
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+    # 조회 시각은 HA 타이머가 아니라 스케줄러가 정합니다.
+    assert coordinator.update_interval is None
+
+    loop.add_reader(master, _answer)
+    try:
+        start = loop.time()
+        await coordinator.async_refresh()
+        elapsed = loop.time() - start
+    finally:
+        loop.remove_reader(master)
+        await coordinator.async_close()
+
+    expected = [
+        *STATUS_QUERY_PACKETS,
+        *BOILER_STATUS_QUERY_PACKETS,
+        MASTER_STATUS_QUERY,
+    ]
+    assert [query.hex().upper() for query in queries] == expected
+    assert coordinator.last_update_success
+    assert coordinator.data[LIGHTING_DOMAIN] == {
+        1: True, 2: False, 3: True, 4: False, 5: True,
+    }
+    assert coordinator.data[BOILER_DOMAIN][3] == {
+        "state": 0x83, "current_temp": 23, "set_temp": 20,
+    }
+    assert coordinator.data[MASTER_DOMAIN] is True
+    assert coordinator.confirmed(LIGHTING_DOMAIN, 1) is True
+    # 명령 후 낙관적 갱신은 확인된 상태를 바꾸지 않습니다.
+    coordinator.async_set_light(1, False)
+    assert coordinator.data[LIGHTING_DOMAIN][1] is False
+    assert coordinator.confirmed(LIGHTING_DOMAIN, 1) is True
+    # 고정 대기(10 x 75ms)가 아니라 응답 즉시 다음 조회로 넘어갑니다.
+    assert elapsed < 0.75
+
+
+@pytest.mark.asyncio
+async def test_poll_cycle_fails_without_port(core_hass, bus_config) -> None:
+    """포트를 열 수 없으면 주기 전체가 실패로 기록됩니다."""
+    bus = CommaxBus(
+        core_hass,
+        bus_config("/dev/does-not-exist"),
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    await coordinator.async_close()
+
+
+@pytest.mark.asyncio
+async def test_passive_mode_learns_from_wallpad_traffic(core_hass, pty_pair, bus_config) -> None:
+    """수동 모드에서는 아무것도 전송하지 않고 월패드 응답만으로 캐시를 채웁니다."""
+    master, path = pty_pair
+    bus = CommaxBus(
+        core_hass,
+        {**bus_config(path), CONF_PASSIVE: True},
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+
+    # 월패드가 스스로 조회하고 받은 응답이 버스에 흐릅니다.
+    for query in (*STATUS_QUERY_PACKETS[:2], BOILER_STATUS_QUERY_PACKETS[0], MASTER_STATUS_QUERY):
+        os.write(master, bytes.fromhex(query))
+        os.write(master, _wallpad_reply(bytes.fromhex(query)))
+    for _ in range(50):
+        if coordinator.data[MASTER_DOMAIN] is not None:
+            break
+        await asyncio.sleep(0.01)
+    await coordinator.async_refresh()
+
+    os.set_blocking(master, False)
+    with pytest.raises(BlockingIOError):
+        os.read(master, 1024)
+    await coordinator.async_close()
+
+    assert coordinator.data[LIGHTING_DOMAIN] == {1: True, 2: False}
+    assert coordinator.data[BOILER_DOMAIN][1]["current_temp"] == 23
+    assert coordinator.data[MASTER_DOMAIN] is True
+
+
+@pytest.mark.asyncio
+async def test_command_triggers_fast_repoll(core_hass, pty_pair, bus_config) -> None:
+    """명령을 보낸 기기는 다음 주기를 기다리지 않고 곧바로 다시 조회됩니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    queries: list[bytes] = []
+
+    def _answer() -> None:
+        data = os.read(master, 1024)
+        for i in range(0, len(data), 8):
+            queries.append(data[i:i + 8])
+            os.write(master, _wallpad_reply(data[i:i + 8]))
+
+    bus = CommaxBus(
+        core_hass,
+        {**bus_config(path), CONF_SCAN_INTERVAL: 30},
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+    loop.add_reader(master, _answer)
+    try:
+        await coordinator.async_refresh()
+        coordinator.async_start_polling()
+        # 첫 확인 조회가 끝나 모든 기기가 안정될 때까지 기다립니다.
+        await asyncio.sleep(1)
+        queries.clear()
+
+        coordinator.async_set_light(2, True)
+        await asyncio.sleep(0.5)
+    finally:
+        loop.remove_reader(master)
+        await coordinator.async_close()
+
+    assert bytes.fromhex(STATUS_QUERY_PACKETS[1]) in queries
+    assert bytes.fromhex(BOILER_STATUS_QUERY_PACKETS[0]) not in queries
+    # 월패드 응답(꺼짐)이 명령 후 캐시를 바로잡습니다.
+    assert coordinator.data[LIGHTING_DOMAIN][2] is False
+
+
+def test_all_off_planner() -> None:
+    """일괄소등 프레임은 끄기 요청만으로 모든 조명이 꺼질 때만 씁니다."""
+    lights = [1, 2, 3]
+    on = {1: True, 2: True, 3: True}
+    assert all_off_achieves({1: False, 2: False, 3: False}, on, lights)
+    # 이미 꺼진 조명은 요청하지 않아도 됩니다.
+    assert all_off_achieves({1: False, 2: False}, {**on, 3: False}, lights)
+    # 켜진 채 남을 조명, 상태를 모르는 조명, 켜기 요청이 있으면 쓰지 않습니다.
+    assert not all_off_achieves({1: False, 2: False}, on, lights)
+    assert not all_off_achieves({1: False, 2: False}, {1: True, 2: True}, lights)
+    assert not all_off_achieves({1: False, 2: False, 3: True}, on, lights)
+    # 실제로 끌 조명이 하나면 개별 프레임도 한 개입니다.
+    assert not all_off_achieves({1: False}, {1: True, 2: False, 3: False}, lights)
+
+
+@pytest.mark.asyncio
+async def test_master_and_light_states_are_inferred(core_hass, bus_config) -> None:
+    """일괄소등을 보면 조명을 끄고, 켜진 조명을 보면 일괄소등을 풉니다."""
+    coordinator = CommaxCoordinator(
+        core_hass, CommaxBus(core_hass, bus_config("/dev/does-not-exist"))
+    )
+    for number in (1, 2, 3, 4, 5):
+        coordinator._handle_light_frame(_frame(0xB0, 0x01, number, 0, 0, 0, 0))
+    coordinator._handle_master_frame(_frame(0xA0, 0x01, 0x01, 0, 0, 0, 0))
+
+    # 월패드에서 일괄소등이 걸린 것을 조회로 알게 됨
+    coordinator._handle_master_frame(_frame(0xA0, 0x00, 0x01, 0, 0, 0, 0))
+    assert coordinator.data[LIGHTING_DOMAIN] == dict.fromkeys((1, 2, 3, 4, 5), False)
+    assert coordinator.confirmed(LIGHTING_DOMAIN, 3) is False
+
+    # 벽 스위치로 켠 조명은 반복되는 일괄소등 응답에 덮이지 않습니다.
+    coordinator._handle_light_frame(_frame(0xB0, 0x01, 2, 0, 0, 0, 0))
+    assert coordinator.data[MASTER_DOMAIN] is True
+    coordinator._handle_master_frame(_frame(0xA0, 0x00, 0x01, 0, 0, 0, 0))
+    assert coordinator.data[MASTER_DOMAIN] is False
+    assert coordinator.data[LIGHTING_DOMAIN][2] is True
+
+    # 일괄소등 제어 응답은 항상 모든 조명을 끕니다.
+    coordinator._handle_master_frame(_frame(0xA2, 0x00, 0x01, 0, 0, 0, 0))
+    assert coordinator.data[LIGHTING_DOMAIN][2] is False
+    assert coordinator.confirmed(LIGHTING_DOMAIN, 2) is False
+
+    # 명령 후 낙관적 갱신도 같은 규칙을 따릅니다 (확인 상태는 그대로).
+    coordinator.async_set_light(4, True)
+    assert coordinator.data[MASTER_DOMAIN] is True
+    coordinator.async_set_master(False)
+    assert coordinator.data[LIGHTING_DOMAIN][4] is False
+    assert coordinator.confirmed(LIGHTING_DOMAIN, 4) is False
+    await coordinator.async_close()
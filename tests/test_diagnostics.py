@@ -0,0 +1,73 @@
+"""Test diagnostics and the frame ring buffer."""
+import pytest
+from unittest.mock import MagicMock
+
+from custom_integration.bus import CommaxBus
+from custom_integration.const import (
+    DOMAIN,
+    LIGHTING_DOMAIN,
+)
+from custom_integration.codec import encode_light_power
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.diagnostics import async_get_config_entry_diagnostics
+from custom_integration.ring import DIRECTION_RX, DIRECTION_TX, FrameRing
+
+
+def test_ring_keeps_latest_frames_in_order() -> None:
+    """가득 차면 가장 오래된 프레임부터 덮어쓰고 오래된 순서로 돌려줍니다."""
+    clock = iter(range(100)).__next__
+    ring = FrameRing(capacity=3, clock=clock)
+
+    for i in range(5):
+        ring.record(DIRECTION_RX if i % 2 else DIRECTION_TX, bytes([i]) * 8)
+
+    assert ring.snapshot() == [
+        (2.0, DIRECTION_TX, bytes([2]) * 8),
+        (3.0, DIRECTION_RX, bytes([3]) * 8),
+        (4.0, DIRECTION_TX, bytes([4]) * 8),
+    ]
+    assert ring.recorded == 5
+
+
+def test_ring_keeps_doorbell_frames() -> None:
+    """16바이트 도어벨 프레임도 잘리지 않고, 더 긴 데이터는 잘립니다."""
+    ring = FrameRing(capacity=4)
+    ring.record(DIRECTION_RX, bytes(range(16)))
+    ring.record(DIRECTION_RX, bytes(range(20)))
+
+    assert [frame for _, _, frame in ring.snapshot()] == [bytes(range(16))] * 2
+
+
+@pytest.mark.asyncio
+async def test_config_entry_diagnostics(core_hass, wallpad, bus_config) -> None:
+    """진단 정보에 설정, 상태 캐시, 버스 카운터, 최근 프레임이 담깁니다."""
+    config = bus_config(wallpad.path)
+    coordinator = CommaxCoordinator(core_hass, CommaxBus(core_hass, config))
+    entry = MagicMock(entry_id="test", data=config)
+    core_hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    try:
+        await coordinator.async_refresh()
+        await coordinator.bus.async_request(encode_light_power(2, True), 0xB1, 2)
+        diagnostics = await async_get_config_entry_diagnostics(core_hass, entry)
+    finally:
+        await coordinator.async_close()
+
+    assert diagnostics["config"] == config
+    assert diagnostics["cache"][LIGHTING_DOMAIN][2] is True
+    assert diagnostics["segments"] == dict.fromkeys(
+        ("light", "boiler", "elevator", "doorbell"), wallpad.path
+    )
+    assert diagnostics["segment_buses"] == []
+    assert diagnostics["bus"]["connected"] is True
+    assert diagnostics["bus"]["connection"]["state"] == "closed"
+    assert diagnostics["bus"]["last_frame_age"] < 5
+    assert diagnostics["unavailable"] == []
+    assert diagnostics["bus"]["stats"]["tx_frames"] == 11
+    assert diagnostics["bus"]["stats"]["rx_frames"] == 11
+    assert f"{LIGHTING_DOMAIN}/command" in diagnostics["bus"]["latency_histograms"]
+
+    frames = diagnostics["frames"]
+    assert len(frames) == 22
+    assert frames[-2]["dir"] == "tx" and frames[-2]["frame"] == "3102010000000034"
+    assert frames[-1]["dir"] == "rx" and frames[-1]["frame"].startswith("B10102")
+    assert frames[0]["age"] >= frames[-1]["age"] >= 0
@@ -0,0 +1,86 @@
+"""Test bus-scan device discovery."""
+import pytest
+import pytest_asyncio
+from unittest.mock import MagicMock
+
+from custom_integration.bus import CommaxBus
+from custom_integration.climate import async_setup_entry as async_setup_climate
+from custom_integration.const import (
+    DOMAIN,
+    CONF_LIGHTS,
+    CONF_BOILERS,
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+)
+from custom_integration.codec import encode_light_query
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.discovery import async_discover
+from custom_integration.light import async_setup_entry as async_setup_light
+
+from .simulator import WallpadSimulator
+
+
+@pytest_asyncio.fixture
+async def small_flat():
+    """조명 3개, 방 6개인 집의 가상 월패드."""
+    simulator = WallpadSimulator(lights=3, rooms=6, latency=0.005, seed=0)
+    await simulator.async_start()
+    yield simulator
+    await simulator.async_stop()
+
+
+@pytest.mark.asyncio
+async def test_discover_finds_answering_addresses(core_hass, small_flat, bus_config) -> None:
+    """응답하는 주소만 찾고, 응답하지 않은 주소는 한 번 더 조회합니다."""
+    bus = CommaxBus(core_hass, bus_config(small_flat.path))
+    try:
+        topology = await async_discover(bus, max_lights=8, max_boilers=8)
+    finally:
+        await bus.async_close()
+
+    assert topology == {CONF_LIGHTS: [1, 2, 3], CONF_BOILERS: [1, 2, 3, 4, 5, 6]}
+    light_probes = [frame for frame in small_flat.received if frame[0] == 0x30]
+    # 있는 조명 3개는 한 번, 없는 조명 5개는 두 번
+    assert len(light_probes) == 3 + 5 * 2
+    assert bus.stats.reply_timeouts == 5 * 2 + 2 * 2
+
+
+@pytest.mark.asyncio
+async def test_discover_without_devices(bus_config) -> None:
+    """포트를 열 수 없으면 None 을 반환합니다."""
+    bus = CommaxBus(MagicMock(), bus_config("/dev/does-not-exist"))
+    assert await async_discover(bus, max_lights=2, max_boilers=2) is None
+
+
+@pytest.mark.asyncio
+async def test_only_discovered_devices_are_polled_and_created(
+    core_hass, small_flat, bus_config
+) -> None:
+    """탐색 결과의 기기만 조회하고 엔티티로 만듭니다 (기본 구성보다 많은 방 포함)."""
+    coordinator = CommaxCoordinator(
+        core_hass,
+        CommaxBus(core_hass, bus_config(small_flat.path)),
+        lights=[1, 2, 3],
+        boilers=range(1, 7),
+    )
+    entry = MagicMock(entry_id="test")
+    core_hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    try:
+        await coordinator.async_refresh()
+        lights, boilers = [], []
+        await async_setup_light(core_hass, entry, lights.extend)
+        await async_setup_climate(core_hass, entry, boilers.extend)
+    finally:
+        await coordinator.async_close()
+
+    assert set(small_flat.received) >= {encode_light_query(n) for n in (1, 2, 3)}
+    assert encode_light_query(4) not in small_flat.received
+    assert coordinator.bus.stats.reply_timeouts == 0
+    assert set(coordinator.data[LIGHTING_DOMAIN]) == {1, 2, 3}
+    assert set(coordinator.data[BOILER_DOMAIN]) == set(range(1, 7))
+
+    assert [light.unique_id for light in lights] == [f"{DOMAIN}_light_{n}" for n in (1, 2, 3)]
+    assert [boiler.unique_id for boiler in boilers] == [
+        f"{DOMAIN}_boiler_{room}" for room in range(1, 7)
+    ]
+    assert boilers[5].name == "보일러 6"
@@ -0,0 +1,78 @@
+"""Test the streaming frame decoder."""
+from custom_integration.const import (
+    BOILER_STATUS_QUERY_PACKETS,
+    DOORBELL_BELL_RING_PACKET,
+    DOORBELL_CALL_END_PACKET,
+    STATUS_QUERY_PACKETS,
+)
+from custom_integration.framer import CommaxFramer
+
+LIGHT_ON_RESPONSE = bytes.fromhex("B0010100000000B2")
+BOILER_RESPONSE = bytes.fromhex("8283011714000031")
+MASTER_RESPONSE = bytes.fromhex("A0010100000000A2")
+BELL_RING = bytes.fromhex(DOORBELL_BELL_RING_PACKET)
+CALL_END = bytes.fromhex(DOORBELL_CALL_END_PACKET)
+
+
+def _collect(*chunks: bytes) -> tuple[list[bytes], CommaxFramer]:
+    frames: list[bytes] = []
+    framer = CommaxFramer(frames.append)
+    for chunk in chunks:
+        framer.feed(chunk)
+    return frames, framer
+
+
+def test_frames_split_across_reads() -> None:
+    """여러 번에 나뉘어 들어온 프레임을 이어 붙입니다."""
+    frames, _ = _collect(LIGHT_ON_RESPONSE[:3], LIGHT_ON_RESPONSE[3:])
+    assert frames == [LIGHT_ON_RESPONSE]
+
+
+def test_several_frames_in_one_read() -> None:
+    """한 번에 들어온 여러 프레임을 모두 분리합니다."""
+    stream = LIGHT_ON_RESPONSE + BOILER_RESPONSE + BELL_RING + MASTER_RESPONSE + CALL_END
+    frames, _ = _collect(stream)
+    assert frames == [
+        LIGHT_ON_RESPONSE,
+        BOILER_RESPONSE,
+        BELL_RING,
+        MASTER_RESPONSE,
+        CALL_END,
+    ]
+
+
+def test_resync_after_garbage() -> None:
+    """체크섬이 맞지 않는 바이트는 버리고 다음 프레임에서 재동기화합니다."""
+    garbage = bytes.fromhex("FF13B0")
+    frames, framer = _collect(garbage + BOILER_RESPONSE[:5], BOILER_RESPONSE[5:])
+    assert frames == [BOILER_RESPONSE]
+    assert framer.dropped_bytes == len(garbage)
+    # 연속으로 버린 바이트는 오류 한 번으로 셉니다.
+    assert framer.checksum_errors == 1
+
+
+def test_corrupted_frame_is_dropped() -> None:
+    """체크섬이 깨진 프레임은 전달하지 않습니다."""
+    corrupted = LIGHT_ON_RESPONSE[:7] + b"\x00"
+    frames, _ = _collect(corrupted + MASTER_RESPONSE)
+    assert frames == [MASTER_RESPONSE]
+
+
+def test_boiler_query_and_doorbell_share_header() -> None:
+    """0x02 헤더는 체크섬으로 8바이트 보일러 조회와 16바이트 도어벨을 구분합니다."""
+    query = bytes.fromhex(BOILER_STATUS_QUERY_PACKETS[0])
+    light_query = bytes.fromhex(STATUS_QUERY_PACKETS[0])
+    frames, _ = _collect(query + CALL_END[:9], CALL_END[9:] + light_query)
+    assert frames == [query, CALL_END, light_query]
+
+
+def test_stray_doorbell_header_does_not_hold_reply() -> None:
+    """도어벨 머리와 같은 바이트 하나가 앞에 끼어도 뒤의 응답을 바로 전달합니다."""
+    for stray in (b"\x10", b"\x02"):
+        frames, framer = _collect(stray + LIGHT_ON_RESPONSE)
+        assert frames == [LIGHT_ON_RESPONSE]
+        assert framer.dropped_bytes == 1
+
+    # 응답이 나뉘어 들어와도 마지막 조각에서 전달됩니다.
+    frames, _ = _collect(b"\x02" + LIGHT_ON_RESPONSE[:4], LIGHT_ON_RESPONSE[4:])
+    assert frames == [LIGHT_ON_RESPONSE]
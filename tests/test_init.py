@@ -0,0 +1,164 @@
+"""Test setting up the config entry."""
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_integration import PLATFORMS, async_setup_entry
+from custom_integration.transport import TCP_CONNECT_TIMEOUT, TcpTransport
+from custom_integration.const import (
+    DOMAIN,
+    SERVICE_RESCAN,
+    CONF_LIGHTS,
+    CONF_BOILERS,
+    LIGHTING_DOMAIN,
+)
+
+from .simulator import WallpadSimulator
+
+
+def _entry(config: dict, **data) -> MagicMock:
+    return MagicMock(entry_id="test", data={**config, **data})
+
+
+@pytest.fixture
+def forward(core_hass):
+    """플랫폼 설정을 기록만 하는 config_entries."""
+    core_hass.config_entries = MagicMock(async_forward_entry_setups=AsyncMock())
+    return core_hass.config_entries.async_forward_entry_setups
+
+
+@pytest.mark.asyncio
+async def test_setup_does_not_wait_for_missing_adapter(core_hass, forward, bus_config) -> None:
+    """어댑터가 없어도 탐색이나 조회를 기다리지 않고 바로 엔티티를 추가합니다."""
+    entry = _entry(bus_config("/dev/does-not-exist"))
+
+    started = time.monotonic()
+    assert await async_setup_entry(core_hass, entry)
+    elapsed = time.monotonic() - started
+
+    coordinator = core_hass.data[DOMAIN][entry.entry_id]
+    try:
+        assert elapsed < 0.5
+        forward.assert_awaited_once_with(entry, PLATFORMS)
+        # 탐색하지 않았으므로 기본 구성으로 시작하고, 다음 시작 때 다시 탐색합니다.
+        core_hass.config_entries.async_update_entry.assert_not_called()
+        assert coordinator.lights == [1, 2, 3, 4, 5]
+    finally:
+        await coordinator.async_close()
+
+
+@pytest.mark.asyncio
+async def test_first_refresh_runs_in_background(core_hass, forward, wallpad, bus_config) -> None:
+    """엔티티를 추가한 뒤 첫 전체 조회가 백그라운드에서 캐시를 채웁니다."""
+    wallpad.press_wall_switch(3, True)
+    entry = _entry(
+        bus_config(wallpad.path), **{CONF_LIGHTS: [1, 2, 3, 4, 5], CONF_BOILERS: [1, 2, 3, 4]}
+    )
+
+    assert await async_setup_entry(core_hass, entry)
+    coordinator = core_hass.data[DOMAIN][entry.entry_id]
+    try:
+        # 설정이 끝난 시점에는 아무것도 조회하지 않았습니다.
+        assert coordinator.data[LIGHTING_DOMAIN] == {}
+        for _ in range(100):
+            if len(coordinator.data[LIGHTING_DOMAIN]) == 5:
+                break
+            await asyncio.sleep(0.02)
+        assert coordinator.data[LIGHTING_DOMAIN] == {
+            1: False, 2: False, 3: True, 4: False, 5: False
+        }
+    finally:
+        await coordinator.async_close()
+
+
+@pytest.mark.asyncio
+async def test_setup_does_not_wait_for_unreachable_gateway(
+    core_hass, forward, monkeypatch, bus_config
+) -> None:
+    """응답 없는 TCP 게이트웨이의 연결 시간 제한을 설정이 기다리지 않습니다."""
+    connecting = asyncio.Event()
+
+    async def _hang(*args) -> None:
+        connecting.set()
+        await asyncio.sleep(TCP_CONNECT_TIMEOUT)
+        raise TimeoutError
+
+    monkeypatch.setattr(TcpTransport, "async_open", _hang)
+    entry = _entry(
+        bus_config("tcp://192.0.2.1:8899"),
+        **{CONF_LIGHTS: [1, 2, 3, 4, 5], CONF_BOILERS: [1, 2, 3, 4]},
+    )
+
+    started = time.monotonic()
+    assert await async_setup_entry(core_hass, entry)
+    elapsed = time.monotonic() - started
+
+    coordinator = core_hass.data[DOMAIN][entry.entry_id]
+    try:
+        assert elapsed < 0.5
+        forward.assert_awaited_once_with(entry, PLATFORMS)
+        # 연결은 백그라운드에서 시도 중입니다.
+        async with asyncio.timeout(1):
+            await connecting.wait()
+    finally:
+        started = time.monotonic()
+        await coordinator.async_close()
+        # 내리는 것도 연결 시도를 기다리지 않습니다.
+        assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_first_start_discovers_in_background(core_hass, forward, bus_config) -> None:
+    """처음 시작하면 기본 구성으로 바로 설정하고, 탐색한 구성이 다르면 저장 후 다시 불러옵니다."""
+    simulator = WallpadSimulator(lights=3, rooms=2, seed=0)
+    await simulator.async_start()
+    entry = _entry(bus_config(simulator.path))
+    update_entry = core_hass.config_entries.async_update_entry
+    schedule_reload = core_hass.config_entries.async_schedule_reload
+
+    assert await async_setup_entry(core_hass, entry)
+    coordinator = core_hass.data[DOMAIN][entry.entry_id]
+    try:
+        assert coordinator.lights == [1, 2, 3, 4, 5]
+        update_entry.assert_not_called()
+        async with asyncio.timeout(5):
+            while not schedule_reload.called:
+                await asyncio.sleep(0.02)
+    finally:
+        await coordinator.async_close()
+        await simulator.async_stop()
+
+    update_entry.assert_called_once_with(
+        entry, data={**entry.data, CONF_LIGHTS: [1, 2, 3], CONF_BOILERS: [1, 2]}
+    )
+    schedule_reload.assert_called_once_with(entry.entry_id)
+
+
+@pytest.mark.asyncio
+async def test_rescan_adds_new_devices(core_hass, forward, bus_config) -> None:
+    """다시 탐색하면 새로 찾은 기기를 저장된 구성에 더하고 다시 불러옵니다."""
+    simulator = WallpadSimulator(lights=3, rooms=2, seed=0)
+    await simulator.async_start()
+    # 조명 3번은 나중에 설치했고, 보일러 4번은 지금 응답하지 않습니다.
+    entry = _entry(bus_config(simulator.path), **{CONF_LIGHTS: [1, 2], CONF_BOILERS: [1, 2, 4]})
+    core_hass.config_entries.async_get_entry.return_value = entry
+    update_entry = core_hass.config_entries.async_update_entry
+    schedule_reload = core_hass.config_entries.async_schedule_reload
+
+    assert await async_setup_entry(core_hass, entry)
+    coordinator = core_hass.data[DOMAIN][entry.entry_id]
+    try:
+        async with asyncio.timeout(1):
+            while not coordinator.bus.connected:
+                await asyncio.sleep(0.01)
+        await core_hass.services.async_call(DOMAIN, SERVICE_RESCAN, blocking=True)
+    finally:
+        await coordinator.async_close()
+        await simulator.async_stop()
+
+    update_entry.assert_called_once_with(
+        entry, data={**entry.data, CONF_LIGHTS: [1, 2, 3], CONF_BOILERS: [1, 2, 4]}
+    )
+    schedule_reload.assert_called_once_with(entry.entry_id)
@@ -1,127 +1,207 @@
 """Test the light platform."""
+import asyncio
+
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+import pytest_asyncio
+from unittest.mock import MagicMock
 
-from homeassistant.components.light import (
-    ATTR_BRIGHTNESS,
-    ColorMode,
-)
-from homeassistant.const import (
-    CONF_NAME,
-    CONF_PORT,
-    CONF_BAUD_RATE,
-    CONF_TIMEOUT,
-    CONF_SCAN_INTERVAL,
-)
-from homeassistant.core import HomeAssistant
-from homeassistant.setup import async_setup_component
+from homeassistant.components.light import ColorMode
+from homeassistant.core import State
+from homeassistant.helpers import restore_state
+from homeassistant.util import dt as dt_util
 
+from custom_integration.bus import PRIORITY_POLL, CommaxBus
+from custom_integration.codec import LIGHT_QUERY_FRAMES
 from custom_integration.const import (
-    DOMAIN, 
-    DEFAULT_NAME, 
-    DEFAULT_BAUD_RATE, 
-    DEFAULT_TIMEOUT,
+    DOMAIN,
+    CONF_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
-    STATUS_QUERY_PACKETS,
-    ON_PACKETS,
-    OFF_PACKETS,
-    STATUS_ON_PREFIX,
-    STATUS_OFF_PREFIX,
+    LIGHT_ON_PACKETS,
+    LIGHT_OFF_PACKETS,
+    LIGHT_NAMES,
+    LIGHTING_DOMAIN,
+    LIGHT_STATUS_RESPONSE_HEADER,
+    MASTER_DOMAIN,
+    MASTER_ALL_OFF_PACKET,
 )
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.light import CommaxLight, async_setup_entry
 
 
-@pytest.fixture
-def mock_serial():
-    """Mock serial port."""
-    with patch('custom_integration.light.serial') as mock_serial:
-        mock_port = MagicMock()
-        mock_serial.Serial.return_value = mock_port
-        yield mock_serial
-
-
-async def test_light_config_flow(hass: HomeAssistant, mock_serial) -> None:
-    """Test light config flow."""
-    config = {
-        DOMAIN: {
-            CONF_NAME: "Commax Lighting",
-            CONF_PORT: "/dev/ttyUSB0",
-            CONF_BAUD_RATE: DEFAULT_BAUD_RATE,
-            CONF_TIMEOUT: DEFAULT_TIMEOUT,
-            CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
-        }
-    }
-
-    assert await async_setup_component(hass, DOMAIN, config)
-    await hass.async_block_till_done()
+@pytest_asyncio.fixture
+async def coordinator(core_hass, wallpad, bus_config):
+    """가상 월패드에 연결된 코디네이터."""
+    bus = CommaxBus(
+        core_hass,
+        {**bus_config(wallpad.path), CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL},
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+    await coordinator.async_refresh()
+    yield coordinator
+    await coordinator.async_close()
+
+
+async def _setup_lights(hass, coordinator) -> list[CommaxLight]:
+    entry = MagicMock(entry_id="test")
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    lights: list[CommaxLight] = []
+    await async_setup_entry(hass, entry, lights.extend)
+    return lights
+
+
+@pytest.mark.asyncio
+async def test_light_setup(core_hass, coordinator) -> None:
+    """설정 항목 하나로 5개의 조명 엔티티가 만들어집니다."""
+    lights = await _setup_lights(core_hass, coordinator)
+
+    assert [light.name for light in lights] == LIGHT_NAMES
+    assert [light.unique_id for light in lights] == [
+        f"{DOMAIN}_light_{n}" for n in range(1, 6)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_light_attributes(core_hass, wallpad, bus_config) -> None:
+    """조명은 ON/OFF 색상 모드이며 첫 조회 결과로 상태를 가집니다."""
+    wallpad.press_wall_switch(2, True)
+    bus = CommaxBus(
+        core_hass,
+        bus_config(wallpad.path),
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+    await coordinator.async_refresh()
+    try:
+        lights = await _setup_lights(core_hass, coordinator)
+    finally:
+        await coordinator.async_close()
+
+    assert lights[0].supported_color_modes == {ColorMode.ONOFF}
+    assert [light.is_on for light in lights] == [False, True, False, False, False]
+
+
+@pytest.mark.asyncio
+async def test_light_turn_on(core_hass, coordinator, wallpad) -> None:
+    """켜기 명령은 ON 패킷을 보내고 월패드의 조명이 켜집니다."""
+    light = (await _setup_lights(core_hass, coordinator))[0]
+
+    await light.async_turn_on()
+    light._update_from_cache()
+
+    assert wallpad.received[-1] == bytes.fromhex(LIGHT_ON_PACKETS[0])
+    assert wallpad.lights[1] is True
+    assert light.is_on
+
+
+@pytest.mark.asyncio
+async def test_light_turn_off(core_hass, coordinator, wallpad) -> None:
+    """끄기 명령은 OFF 패킷을 보내고, 이미 꺼진 조명에는 보내지 않습니다."""
+    light = (await _setup_lights(core_hass, coordinator))[0]
+    await light.async_turn_on()
+
+    await light.async_turn_off()
+    light._update_from_cache()
+    assert wallpad.received[-1] == bytes.fromhex(LIGHT_OFF_PACKETS[0])
+    assert wallpad.lights[1] is False
+    assert not light.is_on
+
+    sent = len(wallpad.received)
+    await light.async_turn_off()
+    assert len(wallpad.received) == sent
+
+
+@pytest.mark.asyncio
+async def test_turn_on_replaces_queued_turn_off(core_hass, coordinator, wallpad) -> None:
+    """확인된 켜짐 상태라도 대기 중인 끄기 명령이 있으면 켜기를 생략하지 않고 대체합니다."""
+    light = (await _setup_lights(core_hass, coordinator))[0]
+    await light.async_turn_on()
+    assert coordinator.confirmed(LIGHTING_DOMAIN, 1) is True
+
+    # 조회가 전송되는 동안 끄기 명령이 그 뒤에 대기합니다.
+    poll = asyncio.ensure_future(
+        coordinator.bus.async_request(
+            LIGHT_QUERY_FRAMES[1], LIGHT_STATUS_RESPONSE_HEADER, 2, priority=PRIORITY_POLL
+        )
+    )
+    await asyncio.sleep(0)
+    turn_off = asyncio.ensure_future(light.async_turn_off())
+    while not coordinator.bus.has_pending((LIGHTING_DOMAIN, 1, "power")):
+        await asyncio.sleep(0)
 
+    await light.async_turn_on()
+    await asyncio.gather(turn_off, poll)
 
-async def test_light_attributes(hass: HomeAssistant, mock_serial) -> None:
-    """Test light attributes."""
-    config = {
-        DOMAIN: {
-            CONF_NAME: "Commax Lighting",
-            CONF_PORT: "/dev/ttyUSB0",
-            CONF_BAUD_RATE: DEFAULT_BAUD_RATE,
-            CONF_TIMEOUT: DEFAULT_TIMEOUT,
-            CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
-        }
-    }
+    assert wallpad.lights[1] is True
+    assert coordinator.data[LIGHTING_DOMAIN][1] is True
 
-    assert await async_setup_component(hass, DOMAIN, config)
-    await hass.async_block_till_done()
 
-    # 조명 엔티티들이 생성되었는지 확인
-    light_entities = hass.states.async_all("light")
-    assert len(light_entities) == 5  # 5개의 조명
+@pytest.mark.asyncio
+async def test_light_wall_switch_change(core_hass, coordinator, wallpad) -> None:
+    """벽 스위치로 바뀐 상태는 약 1초 안에 반영됩니다."""
+    coordinator.async_start_polling()
+    await asyncio.sleep(0.5)
 
+    wallpad.press_wall_switch(4, True)
+    for _ in range(30):
+        await asyncio.sleep(0.05)
+        if coordinator.data["lighting"][4]:
+            break
 
-async def test_light_turn_on(hass: HomeAssistant, mock_serial) -> None:
-    """Test turning on a light."""
-    config = {
-        DOMAIN: {
-            CONF_NAME: "Commax Lighting",
-            CONF_PORT: "/dev/ttyUSB0",
-            CONF_BAUD_RATE: DEFAULT_BAUD_RATE,
-            CONF_TIMEOUT: DEFAULT_TIMEOUT,
-            CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
-        }
-    }
+    assert coordinator.data["lighting"][4] is True
 
-    assert await async_setup_component(hass, DOMAIN, config)
-    await hass.async_block_till_done()
 
-    # 첫 번째 조명 켜기
-    await hass.services.async_call(
-        "light", "turn_on", {"entity_id": "light.commax_lighting_0"}
+@pytest.mark.asyncio
+async def test_light_restores_last_state(core_hass, bus_config) -> None:
+    """첫 조회 응답 전에는 마지막으로 기록된 상태를 표시하고, 응답이 오면 따릅니다."""
+    await restore_state.async_load(core_hass)
+    restore_state.async_get(core_hass).last_states["light.living_room"] = (
+        restore_state.StoredState(State("light.living_room", "on"), None, dt_util.utcnow())
     )
-    await hass.async_block_till_done()
-
-    # 시리얼 포트에 ON 패킷이 전송되었는지 확인
-    mock_port = mock_serial.Serial.return_value
-    mock_port.write.assert_called_with(bytes.fromhex(ON_PACKETS[0]))
-
-
-async def test_light_turn_off(hass: HomeAssistant, mock_serial) -> None:
-    """Test turning off a light."""
-    config = {
-        DOMAIN: {
-            CONF_NAME: "Commax Lighting",
-            CONF_PORT: "/dev/ttyUSB0",
-            CONF_BAUD_RATE: DEFAULT_BAUD_RATE,
-            CONF_TIMEOUT: DEFAULT_TIMEOUT,
-            CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
-        }
-    }
+    coordinator = CommaxCoordinator(
+        core_hass, CommaxBus(core_hass, bus_config("/dev/does-not-exist"))
+    )
+    light = (await _setup_lights(core_hass, coordinator))[0]
+    light.hass = core_hass
+    light.entity_id = "light.living_room"
 
-    assert await async_setup_component(hass, DOMAIN, config)
-    await hass.async_block_till_done()
+    await light.async_added_to_hass()
+    assert light.is_on is True
 
-    # 첫 번째 조명 끄기
-    await hass.services.async_call(
-        "light", "turn_off", {"entity_id": "light.commax_lighting_0"}
-    )
-    await hass.async_block_till_done()
+    coordinator._handle_light_frame(bytes.fromhex("B0000100000000B1"))
+    assert light.is_on is False
+
+
+@pytest.mark.asyncio
+async def test_turning_off_every_light_sends_one_all_off_frame(
+    core_hass, coordinator, wallpad
+) -> None:
+    """그룹으로 모든 조명을 끄면 조명별 프레임 대신 일괄소등 프레임 하나를 보냅니다."""
+    lights = await _setup_lights(core_hass, coordinator)
+    await asyncio.gather(*(light.async_turn_on() for light in lights))
+    assert all(wallpad.lights.values())
+    wallpad.received.clear()
+
+    await asyncio.gather(*(light.async_turn_off() for light in lights))
 
-    # 시리얼 포트에 OFF 패킷이 전송되었는지 확인
-    mock_port = mock_serial.Serial.return_value
-    mock_port.write.assert_called_with(bytes.fromhex(OFF_PACKETS[0])) 
\ No newline at end of file
+    assert wallpad.received == [bytes.fromhex(MASTER_ALL_OFF_PACKET)]
+    assert not any(wallpad.lights.values())
+    assert not any(coordinator.data[LIGHTING_DOMAIN].values())
+    assert coordinator.data[MASTER_DOMAIN] is False
+
+
+@pytest.mark.asyncio
+async def test_turning_off_some_lights_sends_light_frames(
+    core_hass, coordinator, wallpad
+) -> None:
+    """다른 조명이 켜진 채 남으면 조명별 프레임을 보냅니다."""
+    lights = await _setup_lights(core_hass, coordinator)
+    await asyncio.gather(*(light.async_turn_on() for light in lights))
+    wallpad.received.clear()
+
+    await asyncio.gather(lights[0].async_turn_off(), lights[1].async_turn_off())
+
+    assert sorted(wallpad.received) == sorted(
+        bytes.fromhex(packet) for packet in LIGHT_OFF_PACKETS[:2]
+    )
+    assert coordinator.data[LIGHTING_DOMAIN] == {
+        1: False, 2: False, 3: True, 4: True, 5: True
+    }
@@ -0,0 +1,117 @@
+"""Test the adaptive poll scheduler."""
+from custom_integration.const import (
+    POLL_FAST_INTERVAL,
+    BOILER_POLL_MAX_INTERVAL,
+    MASTER_POLL_MAX_INTERVAL,
+    NIGHT_INTERVAL_FACTOR,
+    PROBE_INTERVAL,
+)
+from custom_integration.scheduler import PollScheduler
+
+DEVICES = {
+    **{("lighting", n): 1.0 for n in range(1, 6)},
+    **{("boiler", n): BOILER_POLL_MAX_INTERVAL for n in range(1, 5)},
+    ("master", 1): MASTER_POLL_MAX_INTERVAL,
+}
+
+
+class FakeClock:
+    """수동으로 진행하는 monotonic 시계."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _run(scheduler: PollScheduler, clock: FakeClock, until: float) -> list[tuple]:
+    """변화 없는 기기를 until 초까지 조회하고 조회 기록을 반환합니다."""
+    polls = []
+    while True:
+        clock.now += scheduler.next_delay()
+        if clock.now > until:
+            return polls
+        for key in scheduler.due():
+            polls.append((clock.now, key))
+            scheduler.polled(key)
+            scheduler.observed(key, changed=False)
+
+
+def test_stable_devices_back_off() -> None:
+    """변화가 없으면 기기 종류별 최대 간격까지 물러나 버스 점유가 줄어듭니다."""
+    clock = FakeClock()
+    scheduler = PollScheduler(DEVICES, clock=clock)
+
+    polls = _run(scheduler, clock, 600)
+
+    # 고정 1초 주기라면 10개 기기 x 600초 = 6000회
+    assert len(polls) < 6000 * 0.6
+    boiler_times = [t for t, key in polls if key == ("boiler", 1)]
+    assert boiler_times[-1] - boiler_times[-2] == BOILER_POLL_MAX_INTERVAL
+    # 벽 스위치 변경은 여전히 1초 안에 확인됩니다.
+    light_times = [t for t, key in polls if key == ("lighting", 1)]
+    assert max(b - a for a, b in zip(light_times, light_times[1:])) <= 1.0
+
+
+def test_change_and_command_poll_fast() -> None:
+    """상태가 바뀌었거나 명령을 보낸 기기는 곧바로 다시 조회합니다."""
+    clock = FakeClock()
+    scheduler = PollScheduler(DEVICES, clock=clock)
+    _run(scheduler, clock, 600)
+
+    scheduler.observed(("boiler", 2), changed=True)
+    scheduler.commanded([("boiler", 3)])
+    clock.now += POLL_FAST_INTERVAL
+
+    due = scheduler.due()
+    assert ("boiler", 2) in due
+    assert ("boiler", 3) in due
+    assert ("boiler", 1) not in due
+
+
+def test_wallpad_traffic_defers_poll() -> None:
+    """월패드가 조회한 응답을 엿들으면 그 기기는 직접 조회하지 않습니다."""
+    clock = FakeClock()
+    scheduler = PollScheduler({("lighting", 1): 1.0}, clock=clock)
+    _run(scheduler, clock, 10)
+
+    polls = 0
+    for _ in range(100):
+        clock.now += 0.5
+        scheduler.observed(("lighting", 1), changed=False)
+        polls += len(scheduler.due())
+
+    assert polls == 0
+
+
+def test_night_profile_slows_cadence() -> None:
+    """야간 시간대에는 최대 조회 간격이 NIGHT_INTERVAL_FACTOR 배로 늘어납니다."""
+    clock = FakeClock()
+    hour = 2
+    scheduler = PollScheduler(DEVICES, (23, 6), clock=clock, hour=lambda: hour)
+    assert scheduler.is_night
+
+    polls = _run(scheduler, clock, 600)
+    light_times = [t for t, key in polls if key == ("lighting", 1)]
+    assert light_times[-1] - light_times[-2] == 1.0 * NIGHT_INTERVAL_FACTOR
+
+    hour = 12
+    assert not scheduler.is_night
+
+
+def test_unavailable_devices_are_probed_slowly() -> None:
+    """사용 불가 기기는 PROBE_INTERVAL 간격으로만 조회하고, 응답하면 원래 간격으로 돌아옵니다."""
+    clock = FakeClock()
+    scheduler = PollScheduler(DEVICES, clock=clock)
+    dead = ("lighting", 5)
+
+    scheduler.polled(dead, probe=True)
+    assert scheduler.next_delay() == 0
+    assert dead not in scheduler.due()
+    clock.now = PROBE_INTERVAL
+    assert dead in scheduler.due()
+
+    scheduler.observed(dead, changed=True)
+    clock.now += POLL_FAST_INTERVAL
+    assert dead in scheduler.due()
@@ -0,0 +1,151 @@
+"""Test routing device classes to separate RS485 segments."""
+import asyncio
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_integration.bus import create_buses
+from custom_integration.codec import DOOR_OPEN_FRAME, encode_boiler_query
+from custom_integration.const import (
+    DOMAIN,
+    CONF_PORT,
+    CONF_BAUD_RATE,
+    CONF_TIMEOUT,
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+    SEGMENT_LIGHT,
+    SEGMENT_BOILER,
+    SEGMENT_ELEVATOR,
+    SEGMENT_DOORBELL,
+)
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.switch import async_setup_entry as async_setup_switch
+
+from .simulator import WallpadSimulator
+
+
+def test_segments_share_the_default_port(core_hass) -> None:
+    """구간별 포트를 지정하지 않으면 모든 구간이 버스 하나를 씁니다."""
+    buses = create_buses(core_hass, {CONF_PORT: "/dev/ttyUSB0", CONF_BAUD_RATE: 9600})
+
+    assert len(set(map(id, buses.values()))) == 1
+    assert buses[SEGMENT_BOILER].port == "/dev/ttyUSB0"
+
+
+def test_segments_get_their_own_port_and_baud_rate(core_hass, caplog) -> None:
+    """구간마다 포트와 통신 속도를 따로 쓰고, 같은 포트는 버스를 공유합니다."""
+    buses = create_buses(
+        core_hass,
+        {
+            CONF_PORT: "/dev/ttyUSB3",
+            CONF_BAUD_RATE: 9600,
+            "boiler_port": "/dev/ttyUSB2",
+            "boiler_baud_rate": 4800,
+            "elevator_port": "/dev/ttyUSB0",
+            "doorbell_port": "/dev/ttyUSB0",
+            "doorbell_baud_rate": 19200,
+        },
+    )
+
+    assert buses[SEGMENT_LIGHT].port == "/dev/ttyUSB3"
+    assert buses[SEGMENT_BOILER].config[CONF_BAUD_RATE] == 4800
+    assert buses[SEGMENT_BOILER].stats.baudrate == 4800
+    assert buses[SEGMENT_DOORBELL] is buses[SEGMENT_ELEVATOR]
+    # 같은 포트에 다른 속도를 주면 먼저 정한 속도를 쓰고 경고합니다.
+    assert buses[SEGMENT_DOORBELL].config[CONF_BAUD_RATE] == 9600
+    assert "19200" in caplog.text
+
+
+async def _segment_coordinator(hass, config: dict, boiler_path: str):
+    buses = create_buses(hass, {**config, "boiler_port": boiler_path})
+    return CommaxCoordinator(hass, buses[SEGMENT_LIGHT], buses=buses)
+
+
+@pytest.mark.asyncio
+async def test_segments_are_polled_in_parallel(core_hass, bus_config) -> None:
+    """구간마다 송신 작업이 따로 돌아 전체 조회 시간이 구간 중 가장 긴 것만큼 걸립니다."""
+    single = WallpadSimulator(latency=0.02, seed=0)
+    lights = WallpadSimulator(rooms=0, latency=0.02, seed=0)
+    boilers = WallpadSimulator(lights=0, latency=0.02, seed=0)
+    for simulator in (single, lights, boilers):
+        await simulator.async_start()
+    try:
+        coordinator = await _segment_coordinator(core_hass, bus_config(single.path), single.path)
+        started = time.monotonic()
+        await coordinator.async_refresh()
+        single_elapsed = time.monotonic() - started
+        await coordinator.async_close()
+
+        coordinator = await _segment_coordinator(core_hass, bus_config(lights.path), boilers.path)
+        started = time.monotonic()
+        await coordinator.async_refresh()
+        split_elapsed = time.monotonic() - started
+        await coordinator.async_close()
+    finally:
+        for simulator in (single, lights, boilers):
+            await simulator.async_stop()
+
+    assert len(coordinator.buses) == 2
+    assert set(coordinator.data[LIGHTING_DOMAIN]) == {1, 2, 3, 4, 5}
+    assert set(coordinator.data[BOILER_DOMAIN]) == {1, 2, 3, 4}
+    # 조명 구간의 조회는 조명 월패드로만, 보일러 조회는 보일러 월패드로만 갑니다.
+    assert all(frame[0] != 0x02 for frame in lights.received)
+    assert {frame[0] for frame in boilers.received} == {0x02}
+    assert split_elapsed < single_elapsed * 0.8
+
+
+@pytest.mark.asyncio
+async def test_slow_boiler_segment_does_not_delay_lights(core_hass, bus_config) -> None:
+    """보일러 구간이 느려도 조명 명령은 기다리지 않습니다."""
+    lights = WallpadSimulator(rooms=0, seed=0)
+    boilers = WallpadSimulator(lights=0, latency=0.2, seed=0)
+    await lights.async_start()
+    await boilers.async_start()
+    coordinator = await _segment_coordinator(
+        core_hass, {**bus_config(lights.path), CONF_TIMEOUT: 0.5}, boilers.path
+    )
+    try:
+        polling = asyncio.ensure_future(coordinator.async_refresh())
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        await coordinator.async_set_light_power(1, True)
+        elapsed = time.monotonic() - started
+        await polling
+    finally:
+        await coordinator.async_close()
+        await lights.async_stop()
+        await boilers.async_stop()
+
+    assert lights.lights[1] is True
+    assert encode_boiler_query(4) in boilers.received
+    assert elapsed < 0.15
+
+
+@pytest.mark.asyncio
+async def test_door_commands_use_the_doorbell_segment(core_hass, bus_config) -> None:
+    """현관문 명령은 도어벨 구간의 포트로 전송됩니다."""
+    lights = WallpadSimulator(seed=0)
+    doorbell = WallpadSimulator(lights=0, rooms=0, seed=0)
+    await lights.async_start()
+    await doorbell.async_start()
+    buses = create_buses(
+        core_hass,
+        {**bus_config(lights.path), "doorbell_port": doorbell.path},
+    )
+    coordinator = CommaxCoordinator(core_hass, buses[SEGMENT_LIGHT], buses=buses)
+    entry = MagicMock(entry_id="test")
+    core_hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    try:
+        switches = []
+        await async_setup_switch(core_hass, entry, switches.extend)
+        door = next(switch for switch in switches if switch.unique_id == f"{DOMAIN}_door")
+        await door._send_command(DOOR_OPEN_FRAME)
+        await asyncio.sleep(0.05)
+    finally:
+        await coordinator.async_close()
+        await lights.async_stop()
+        await doorbell.async_stop()
+
+    assert doorbell.events == ["door_open"]
+    assert lights.events == []
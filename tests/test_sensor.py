@@ -1,54 +1,84 @@
-"""Test the sensor platform."""
+"""Test the bus diagnostic sensor platform."""
 import pytest
-from unittest.mock import AsyncMock, patch
-
-from homeassistant.components.sensor import SensorDeviceClass
-from homeassistant.const import (
-    ATTR_DEVICE_CLASS,
-    ATTR_UNIT_OF_MEASUREMENT,
-    CONF_NAME,
-    UnitOfTime,
+import pytest_asyncio
+from unittest.mock import MagicMock
+
+from homeassistant.const import EntityCategory
+
+from custom_integration.bus import CommaxBus, create_buses
+from custom_integration.const import (
+    DOMAIN,
+    CONF_PORT,
+    CONF_TIMEOUT,
+    SEGMENT_LIGHT,
+    SEGMENT_BOILER,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.setup import async_setup_component
+from custom_integration.codec import LIGHT_ON_FRAMES, LIGHT_QUERY_FRAMES
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.sensor import BUS_SENSORS, CommaxBusSensor, async_setup_entry
 
-from custom_integration.const import DOMAIN, DEFAULT_NAME, DEFAULT_SCAN_INTERVAL
 
+@pytest_asyncio.fixture
+async def sensors(core_hass, wallpad, bus_config):
+    """가상 월패드에 연결된 버스의 진단 센서 (키 -> 엔티티)."""
+    bus = CommaxBus(
+        core_hass,
+        {**bus_config(wallpad.path), CONF_TIMEOUT: 0.05},
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+    entry = MagicMock(entry_id="test")
+    core_hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entities: list[CommaxBusSensor] = []
+    await async_setup_entry(core_hass, entry, entities.extend)
+    yield {entity.entity_description.key: entity for entity in entities}
+    await coordinator.async_close()
 
-@pytest.fixture
-def mock_setup_entry():
-    """Mock async_setup_entry."""
-    with patch("custom_integration.sensor.async_setup_entry", return_value=True) as mock:
-        yield mock
 
+@pytest.mark.asyncio
+async def test_sensor_setup(sensors) -> None:
+    """버스마다 진단 센서가 만들어집니다."""
+    assert list(sensors) == [description.key for description in BUS_SENSORS]
+    sensor = sensors["utilization"]
+    assert sensor.unique_id == f"{DOMAIN}_bus_utilization"
+    assert sensor.entity_category == EntityCategory.DIAGNOSTIC
+    assert sensor.native_unit_of_measurement == "%"
+    assert sensor.native_value == 0
+    assert sensors["command_latency_p95"].native_value is None
 
-async def test_sensor_config_flow(hass: HomeAssistant, mock_setup_entry) -> None:
-    """Test sensor config flow."""
-    config = {
-        DOMAIN: {
-            CONF_NAME: "Test Sensor",
-            "scan_interval": 30,
-        }
-    }
 
-    assert await async_setup_component(hass, DOMAIN, config)
-    await hass.async_block_till_done()
+@pytest.mark.asyncio
+async def test_sensors_follow_bus_traffic(sensors, wallpad) -> None:
+    """명령, 응답, 체크섬 오류, 응답 시간 초과가 센서 값에 반영됩니다."""
+    bus = sensors["utilization"]._bus
 
-    mock_setup_entry.assert_called_once()
+    assert await bus.async_request(LIGHT_ON_FRAMES[0], 0xB1, 1)
+    wallpad.corrupt_rate = 1.0
+    assert await bus.async_request(LIGHT_QUERY_FRAMES[1], 0xB0, 2) is None
 
+    assert sensors["tx_frames_per_second"].native_value > 0
+    assert sensors["rx_frames_per_second"].native_value > 0
+    assert sensors["utilization"].native_value > 0
+    assert sensors["checksum_failures"].native_value == 1
+    assert sensors["reply_timeouts"].native_value == 1
+    assert sensors["reconnects"].native_value == 0
+    # 지연은 성공한 명령만 집계합니다.
+    assert 0 < sensors["command_latency_p50"].native_value < 50
 
-async def test_sensor_attributes(hass: HomeAssistant) -> None:
-    """Test sensor attributes."""
-    config = {
-        DOMAIN: {
-            CONF_NAME: "Test Sensor",
-            "scan_interval": 30,
-        }
-    }
 
-    assert await async_setup_component(hass, DOMAIN, config)
-    await hass.async_block_till_done()
+@pytest.mark.asyncio
+async def test_sensors_for_each_segment_bus(core_hass) -> None:
+    """다른 포트를 쓰는 구간의 버스는 구간 이름이 붙은 센서를 따로 가집니다."""
+    buses = create_buses(
+        core_hass, {CONF_PORT: "/dev/ttyUSB3", "boiler_port": "/dev/ttyUSB2"}
+    )
+    coordinator = CommaxCoordinator(core_hass, buses[SEGMENT_LIGHT], buses=buses)
+    entry = MagicMock(entry_id="test")
+    core_hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entities: list[CommaxBusSensor] = []
+    await async_setup_entry(core_hass, entry, entities.extend)
+    await coordinator.async_close()
 
-    state = hass.states.get("sensor.test_sensor")
-    assert state is not None
-    assert state.attributes.get(ATTR_UNIT_OF_MEASUREMENT) == "count" 
\ No newline at end of file
+    assert len(entities) == 2 * len(BUS_SENSORS)
+    boiler = next(e for e in entities if e.unique_id == f"{DOMAIN}_bus_boiler_utilization")
+    assert boiler._bus is buses[SEGMENT_BOILER]
+    assert boiler.name == "RS485 버스 점유율 (/dev/ttyUSB2)"
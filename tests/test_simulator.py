@@ -0,0 +1,105 @@
+"""Test the virtual wallpad simulator against the integration."""
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_integration.bus import CommaxBus
+from custom_integration.codec import (
+    DOORBELL_RING,
+    DOORBELL_CALL_END,
+    decode_doorbell,
+    encode_boiler_query,
+    encode_boiler_temperature,
+    encode_light_query,
+)
+from custom_integration.const import (
+    CONF_TIMEOUT,
+    CONF_PASSIVE,
+    DOORBELL_FRAME_HEADERS,
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+    MASTER_DOMAIN,
+)
+from custom_integration.coordinator import CommaxCoordinator
+
+from .simulator import WallpadSimulator
+
+
+@pytest.mark.asyncio
+async def test_boiler_control_round_trip(wallpad, bus_config) -> None:
+    """보일러 제어에 84 응답이 체크섬과 함께 돌아오고 상태가 바뀝니다."""
+    bus = CommaxBus(MagicMock(), bus_config(wallpad.path))
+    try:
+        reply = await bus.async_request(encode_boiler_temperature(4, 26), 0x84, 4)
+        status = await bus.async_request(encode_boiler_query(4), 0x82, 4)
+    finally:
+        await bus.async_close()
+
+    assert reply[0] == 0x84 and reply[2] == 4 and reply[4] == 26
+    assert status[4] == 26
+    assert wallpad.boilers[4]["set_temp"] == 26
+
+
+@pytest.mark.asyncio
+async def test_latency_and_faults(bus_config) -> None:
+    """응답 지연과 체크섬 오류를 흉내 냅니다."""
+    wallpad = WallpadSimulator(latency=0.03, corrupt_rate=1.0, seed=1)
+    await wallpad.async_start()
+    bus = CommaxBus(MagicMock(), {**bus_config(wallpad.path), CONF_TIMEOUT: 0.2})
+    loop = asyncio.get_running_loop()
+    try:
+        start = loop.time()
+        assert await bus.async_request(encode_light_query(1), 0xB0, 1) is None
+        assert loop.time() - start >= 0.2
+
+        wallpad.corrupt_rate = 0.0
+        start = loop.time()
+        assert await bus.async_request(encode_light_query(1), 0xB0, 1) is not None
+        assert loop.time() - start >= 0.03
+    finally:
+        await bus.async_close()
+        await wallpad.async_stop()
+
+    assert bus._framer.dropped_bytes > 0
+
+
+@pytest.mark.asyncio
+async def test_doorbell_frames(wallpad, bus_config) -> None:
+    """벨 울림과 통화 종료 프레임이 버스 리스너에 전달됩니다."""
+    bus = CommaxBus(MagicMock(), bus_config(wallpad.path))
+    events: list[str] = []
+    bus.async_add_listener(
+        DOORBELL_FRAME_HEADERS, lambda frame: events.append(decode_doorbell(frame))
+    )
+    await bus.async_start()
+    try:
+        wallpad.ring_doorbell()
+        await asyncio.sleep(0.05)
+        wallpad.end_call()
+        await asyncio.sleep(0.05)
+    finally:
+        await bus.async_close()
+
+    assert events == [DOORBELL_RING, DOORBELL_CALL_END]
+
+
+@pytest.mark.asyncio
+async def test_background_polling_feeds_passive_mode(core_hass, wallpad, bus_config) -> None:
+    """월패드 자체 조회 트래픽만으로 수동 모드 코디네이터가 상태를 배웁니다."""
+    wallpad.press_wall_switch(5, True)
+    wallpad.boilers[2]["set_temp"] = 25
+    coordinator = CommaxCoordinator(
+        core_hass, CommaxBus(core_hass, {**bus_config(wallpad.path), CONF_PASSIVE: True})
+    )
+    await coordinator.async_refresh()
+    wallpad.start_background_polling(0.2)
+    try:
+        await asyncio.sleep(0.3)
+    finally:
+        await coordinator.async_close()
+
+    assert wallpad.received == []
+    assert coordinator.data[LIGHTING_DOMAIN][5] is True
+    assert coordinator.data[BOILER_DOMAIN][2]["set_temp"] == 25
+    assert coordinator.data[MASTER_DOMAIN] is True
@@ -0,0 +1,65 @@
+"""Test the incremental bus statistics."""
+import pytest
+
+from custom_integration.stats import BusStatistics
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_rates_cover_sliding_window() -> None:
+    """처리량은 최근 구간의 프레임만 세고 오래된 칸은 빠집니다."""
+    clock = _Clock()
+    stats = BusStatistics(9600, window=10, clock=clock)
+
+    for _ in range(50):
+        stats.frame_received()
+    for _ in range(20):
+        stats.frame_sent(8)
+    assert stats.rx_frames_per_second == pytest.approx(5.0)
+    assert stats.tx_frames_per_second == pytest.approx(2.0)
+
+    clock.now += 5
+    stats.frame_received()
+    assert stats.rx_frames_per_second == pytest.approx(5.1)
+
+    clock.now += 6
+    assert stats.rx_frames_per_second == pytest.approx(0.1)
+    assert stats.tx_frames_per_second == 0
+    assert stats.rx_frames == 51 and stats.tx_frames == 20
+
+
+def test_utilization_follows_baud_rate() -> None:
+    """점유율은 보드레이트에서 가능한 전송 시간 대비 송수신 바이트의 비율입니다."""
+    clock = _Clock()
+    stats = BusStatistics(9600, window=10, clock=clock)
+
+    # 초당 96 바이트 = 960 비트 = 9600 bps 의 10%
+    stats.bytes_received(480)
+    stats.frame_sent(480)
+    assert stats.utilization == pytest.approx(10.0)
+
+    stats.bytes_received(100000)
+    assert stats.utilization == 100.0
+
+
+def test_latency_percentiles_over_recent_samples() -> None:
+    """지연 백분위수는 최근 표본만으로 계산됩니다."""
+    stats = BusStatistics(9600, latency_samples=100)
+    assert stats.latency_percentile(50) is None
+
+    for ms in range(1, 101):
+        stats.command_completed(ms / 1000)
+    assert stats.latency_percentile(50) == pytest.approx(0.050)
+    assert stats.latency_percentile(95) == pytest.approx(0.095)
+    assert stats.latency_percentile(99) == pytest.approx(0.099)
+
+    # 오래된 표본이 밀려납니다.
+    for _ in range(100):
+        stats.command_completed(0.2)
+    assert stats.latency_percentile(50) == pytest.approx(0.2)
@@ -0,0 +1,151 @@
+"""Test the reconnect supervisor and circuit breaker."""
+import asyncio
+import logging
+import random
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_integration.bus import CommaxBus
+from custom_integration.codec import LIGHT_QUERY_FRAMES
+from custom_integration.const import (
+    CONF_TIMEOUT,
+    LIGHT_STATUS_RESPONSE_HEADER,
+)
+from custom_integration.supervisor import BusUnavailable, ConnectionSupervisor
+from custom_integration.transport import TCP_CONNECT_TIMEOUT, TcpTransport
+
+from .simulator import WallpadSimulator
+
+
+def test_backoff_grows_with_jitter_up_to_the_cap() -> None:
+    """재시도 간격은 두 배씩 늘고, 상한의 절반~전체 사이에서 흩어지며, 최대 간격을 넘지 않습니다."""
+    supervisor = ConnectionSupervisor(
+        "test", MagicMock(), base_delay=0.5, max_delay=60.0, rng=random.Random(0)
+    )
+
+    for attempt, ceiling in ((0, 0.5), (1, 1.0), (3, 4.0), (7, 60.0), (100, 60.0)):
+        delays = [supervisor.backoff(attempt) for _ in range(50)]
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+        assert len(set(delays)) > 1
+
+
+@pytest.mark.asyncio
+async def test_requests_fail_fast_while_port_is_down(caplog, bus_config) -> None:
+    """포트가 없으면 첫 요청만 포트를 열어 보고, 나머지는 바로 실패하며 로그는 한 줄입니다."""
+    bus = CommaxBus(MagicMock(), bus_config("/dev/commax-unplugged"))
+    caplog.set_level(logging.INFO)
+    try:
+        with pytest.raises(OSError):
+            await bus.async_send(LIGHT_QUERY_FRAMES[0])
+
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(bus.async_send(frame) for frame in LIGHT_QUERY_FRAMES * 10),
+            return_exceptions=True,
+        )
+        elapsed = time.monotonic() - started
+        assert all(isinstance(result, BusUnavailable) for result in results)
+        assert bus.supervisor.is_open
+    finally:
+        await bus.async_close()
+
+    assert elapsed < 0.05
+    problems = [record for record in caplog.records if record.levelno >= logging.WARNING]
+    assert len(problems) == 1
+    assert "/dev/commax-unplugged" in problems[0].getMessage()
+    assert not bus.supervisor.is_open
+
+
+@pytest.mark.asyncio
+async def test_reconnects_in_background_after_gateway_returns(caplog, bus_config) -> None:
+    """게이트웨이가 사라졌다 돌아오면 요청 없이도 백오프 간격으로 재연결합니다."""
+    wallpad = WallpadSimulator(seed=0)
+    url = await wallpad.async_serve_tcp()
+    port = int(url.rsplit(":", 1)[1])
+    bus = CommaxBus(MagicMock(), bus_config(url))
+    bus.supervisor._base_delay = 0.02
+    caplog.set_level(logging.INFO)
+    try:
+        assert await bus.async_request(LIGHT_QUERY_FRAMES[0], LIGHT_STATUS_RESPONSE_HEADER, 1)
+        await wallpad.async_stop()
+        await asyncio.sleep(0.1)
+        assert bus.supervisor.is_open
+        with pytest.raises(BusUnavailable):
+            await bus.async_send(LIGHT_QUERY_FRAMES[0])
+
+        wallpad = WallpadSimulator(seed=0)
+        await wallpad.async_serve_tcp(port=port)
+        async with asyncio.timeout(2):
+            while not bus.connected:
+                await asyncio.sleep(0.01)
+        assert await bus.async_request(LIGHT_QUERY_FRAMES[1], LIGHT_STATUS_RESPONSE_HEADER, 2)
+    finally:
+        await bus.async_close()
+        await wallpad.async_stop()
+
+    assert bus.stats.reconnects == 1
+    assert bus.supervisor.outages == 1
+    messages = [
+        record.getMessage() for record in caplog.records if "RS485 버스" in record.getMessage()
+    ]
+    assert len(messages) == 2
+    assert "연결 끊김" in messages[0] and "복구" in messages[1]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_fails_waiting_requests_at_once(bus_config) -> None:
+    """응답을 기다리는 중에 연결이 끊기면 제한 시간까지 기다리지 않고 바로 실패합니다."""
+    wallpad = WallpadSimulator(latency=0.5, seed=0)
+    url = await wallpad.async_serve_tcp()
+    bus = CommaxBus(MagicMock(), {**bus_config(url), CONF_TIMEOUT: 2.0})
+    try:
+        request = asyncio.ensure_future(
+            bus.async_request(LIGHT_QUERY_FRAMES[0], LIGHT_STATUS_RESPONSE_HEADER, 1)
+        )
+        async with asyncio.timeout(1):
+            while not wallpad.received:
+                await asyncio.sleep(0.01)
+        started = time.monotonic()
+        wallpad.drop_tcp_connections()
+        with pytest.raises(BusUnavailable):
+            await request
+        elapsed = time.monotonic() - started
+    finally:
+        await bus.async_close()
+        await wallpad.async_stop()
+
+    assert elapsed < 1.0
+    assert bus.stats.reply_timeouts == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_do_not_wait_for_reconnect_attempt(
+    wallpad, bus_config, monkeypatch
+) -> None:
+    """응답 없는 게이트웨이에 재연결하는 동안에도 요청은 연결 시도를 기다리지 않고 실패합니다."""
+    url = await wallpad.async_serve_tcp()
+    bus = CommaxBus(MagicMock(), bus_config(url))
+    attempting = asyncio.Event()
+
+    async def _hang(*args):
+        attempting.set()
+        await asyncio.sleep(TCP_CONNECT_TIMEOUT)
+        raise TimeoutError
+
+    try:
+        assert await bus.async_request(LIGHT_QUERY_FRAMES[0], LIGHT_STATUS_RESPONSE_HEADER, 1)
+        monkeypatch.setattr(TcpTransport, "async_open", _hang)
+        wallpad.drop_tcp_connections()
+        async with asyncio.timeout(2):
+            await attempting.wait()
+
+        started = time.monotonic()
+        with pytest.raises(BusUnavailable):
+            await bus.async_request(LIGHT_QUERY_FRAMES[1], LIGHT_STATUS_RESPONSE_HEADER, 2)
+        elapsed = time.monotonic() - started
+    finally:
+        await bus.async_close()
+
+    assert elapsed < 1.0
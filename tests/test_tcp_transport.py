@@ -0,0 +1,119 @@
+"""Test the RS485-over-TCP gateway transport."""
+import asyncio
+import socket
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_integration.bus import PRIORITY_POLL, CommaxBus
+from custom_integration.codec import LIGHT_QUERY_FRAMES
+from custom_integration.const import (
+    DEFAULT_BAUD_RATE,
+    LIGHTING_DOMAIN,
+    BOILER_DOMAIN,
+    LIGHT_STATUS_RESPONSE_HEADER,
+)
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.transport import TcpTransport, parse_tcp_url
+
+
+def test_parse_tcp_url() -> None:
+    """게이트웨이 주소만 (호스트, 포트) 로 풀고 시리얼 포트 이름은 그대로 둡니다."""
+    assert parse_tcp_url("tcp://192.168.0.50:8899") == ("192.168.0.50", 8899)
+    assert parse_tcp_url("socket://ew11.local:502") == ("ew11.local", 502)
+    assert parse_tcp_url("/dev/ttyUSB0") is None
+    with pytest.raises(ValueError):
+        parse_tcp_url("tcp://192.168.0.50")
+
+
+@pytest.mark.asyncio
+async def test_requests_share_one_persistent_connection(wallpad, bus_config) -> None:
+    """요청마다 연결하지 않고 게이트웨이 연결 하나를 계속 씁니다."""
+    url = await wallpad.async_serve_tcp()
+    bus = CommaxBus(MagicMock(), bus_config(url))
+    try:
+        for _ in range(3):
+            for number, frame in enumerate(LIGHT_QUERY_FRAMES, 1):
+                reply = await bus.async_request(
+                    frame, LIGHT_STATUS_RESPONSE_HEADER, number, priority=PRIORITY_POLL
+                )
+                assert reply is not None and reply[2] == number
+    finally:
+        await bus.async_close()
+
+    assert wallpad.tcp_connections == 1
+    assert len(wallpad.received) == 3 * len(LIGHT_QUERY_FRAMES)
+
+
+@pytest.mark.asyncio
+async def test_socket_options() -> None:
+    """Nagle 을 끄고 keepalive 를 켭니다."""
+    server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    transport = await TcpTransport.async_open(
+        f"tcp://{host}:{port}", DEFAULT_BAUD_RATE, MagicMock(), MagicMock()
+    )
+    try:
+        sock = transport._transport.get_extra_info("socket")
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    finally:
+        transport.close()
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_write_goes_straight_to_socket() -> None:
+    """쓰기는 루프를 한 번 돌 때까지 미루지 않고 바로 소켓으로 넘어갑니다."""
+    server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    transport = await TcpTransport.async_open(
+        f"tcp://{host}:{port}", DEFAULT_BAUD_RATE, MagicMock(), MagicMock()
+    )
+    socket_writes: list[bytes] = []
+    original = transport._transport.write
+    transport._transport.write = lambda data: (socket_writes.append(data), original(data))
+    try:
+        transport.write(LIGHT_QUERY_FRAMES[0])
+        assert socket_writes == [LIGHT_QUERY_FRAMES[0]]
+    finally:
+        transport.close()
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_gateway_drops(wallpad, bus_config) -> None:
+    """게이트웨이가 연결을 끊으면 백그라운드에서 다시 연결합니다."""
+    url = await wallpad.async_serve_tcp()
+    bus = CommaxBus(MagicMock(), bus_config(url))
+    try:
+        assert await bus.async_request(LIGHT_QUERY_FRAMES[0], LIGHT_STATUS_RESPONSE_HEADER, 1)
+        wallpad.drop_tcp_connections()
+        await asyncio.sleep(0.05)
+        assert not bus.connected
+        async with asyncio.timeout(2):
+            while not bus.connected:
+                await asyncio.sleep(0.01)
+        assert await bus.async_request(LIGHT_QUERY_FRAMES[1], LIGHT_STATUS_RESPONSE_HEADER, 2)
+    finally:
+        await bus.async_close()
+
+    assert wallpad.tcp_connections == 2
+    assert bus.stats.reconnects == 1
+
+
+@pytest.mark.asyncio
+async def test_coordinator_refresh_over_tcp(core_hass, wallpad, bus_config) -> None:
+    """tcp:// 주소로 설정해도 전체 조회가 시리얼 포트와 같이 동작합니다."""
+    url = await wallpad.async_serve_tcp()
+    coordinator = CommaxCoordinator(core_hass, CommaxBus(core_hass, bus_config(url)))
+    try:
+        await coordinator.async_refresh()
+    finally:
+        await coordinator.async_close()
+
+    assert coordinator.last_update_success
+    assert set(coordinator.data[LIGHTING_DOMAIN]) == {1, 2, 3, 4, 5}
+    assert set(coordinator.data[BOILER_DOMAIN]) == {1, 2, 3, 4}
@@ -0,0 +1,76 @@
+"""Test per-command latency tracing."""
+import pytest
+
+from custom_integration.bus import PRIORITY_POLL, CommaxBus
+from custom_integration.const import (
+    LIGHTING_DOMAIN,
+    DOOR_DOMAIN,
+)
+from custom_integration.codec import DOOR_OPEN_FRAME, LIGHT_QUERY_FRAMES, encode_light_power
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.trace import Histogram, Span, device_class
+
+
+def test_histogram_buckets() -> None:
+    """값은 상한이 같거나 큰 첫 버킷에 들어가고, 가장 큰 상한을 넘으면 inf 입니다."""
+    histogram = Histogram((10, 100))
+    for value in (1, 10, 11, 500):
+        histogram.observe(value)
+
+    assert histogram.as_dict() == {
+        "count": 4,
+        "sum_ms": 522,
+        "buckets": {"le_10": 2, "le_100": 1, "inf": 1},
+    }
+
+
+def test_span_phases_stop_at_missing_mark() -> None:
+    """응답이 없으면 응답 이후 구간은 없고 전체는 마지막 시각까지입니다."""
+    span = Span("command", enqueued=1.0, tx_start=1.010, tx_done=1.018)
+
+    phases = span.phases()
+    assert set(phases) == {"queue", "transmit", "total"}
+    assert phases["queue"] == pytest.approx(10)
+    assert phases["transmit"] == pytest.approx(8)
+    assert phases["total"] == pytest.approx(18)
+
+
+def test_device_class() -> None:
+    """요청 프레임 헤더로 기기 종류를 구분합니다."""
+    assert device_class(LIGHT_QUERY_FRAMES[0]) == LIGHTING_DOMAIN
+    assert device_class(DOOR_OPEN_FRAME) == DOOR_DOMAIN
+
+
+@pytest.mark.asyncio
+async def test_command_span_reaches_state_write(core_hass, wallpad, tmp_path, bus_config) -> None:
+    """명령 Span 은 대기부터 HA 상태 기록까지 모든 구간을 가지고 파일에 기록됩니다."""
+    bus = CommaxBus(
+        core_hass,
+        bus_config(wallpad.path),
+    )
+    coordinator = CommaxCoordinator(core_hass, bus)
+    span_file = tmp_path / "spans.log"
+    bus.tracer.enable_span_file(str(span_file))
+    try:
+        await coordinator.async_refresh()
+        await bus.async_request(LIGHT_QUERY_FRAMES[0], 0xB0, 1, priority=PRIORITY_POLL)
+        await bus.async_request(encode_light_power(3, True), 0xB1, 3)
+    finally:
+        await coordinator.async_close()
+
+    histograms = bus.tracer.as_dict()
+    command = histograms[f"{LIGHTING_DOMAIN}/command"]
+    assert {phase: h["count"] for phase, h in command.items()} == {
+        "queue": 1, "transmit": 1, "reply": 1, "state": 1, "total": 1,
+    }
+    # 첫 조회는 캐시를 채우지만, 다시 조회해 상태가 같으면 상태 기록 구간이 없습니다.
+    query = histograms[f"{LIGHTING_DOMAIN}/query"]
+    assert query["reply"]["count"] == 6
+    assert query["state"]["count"] == 5
+
+    lines = span_file.read_text().splitlines()
+    assert len(lines) == 5 + 4 + 1 + 1 + 1
+    _, device, kind, frame, *fields = lines[-1].split()
+    assert (device, kind, frame) == (LIGHTING_DOMAIN, "command", "3103010000000035")
+    assert [field.split("=")[0] for field in fields] == ["q", "tx", "rp", "st", "tot"]
+    assert "-" not in [field.split("=")[1] for field in fields]
@@ -0,0 +1,163 @@
+"""Test the non-blocking serial transport."""
+import asyncio
+import os
+
+import pytest
+import serial
+from unittest.mock import MagicMock
+
+from custom_integration.bus import CommaxBus
+from custom_integration.const import (
+    DEFAULT_BAUD_RATE,
+)
+from custom_integration.codec import (
+    LIGHT_QUERY_FRAMES,
+    BOILER_QUERY_FRAMES,
+    MASTER_QUERY_FRAME,
+)
+from custom_integration.transport import (
+    SerialTransport,
+    frame_airtime,
+    inter_frame_gap,
+)
+
+HEARTBEAT = 0.001
+
+
+async def _count_heartbeats(coro) -> int:
+    """코루틴이 끝나기 전까지 이벤트 루프가 하트비트를 몇 번 실행했는지 셉니다.
+
+    블로킹 호출이 루프를 잡고 있으면 하트비트가 돌지 못합니다. 실행 시간이
+    아니라 횟수를 세므로 느린 머신에서도 결과가 같습니다.
+    """
+    beats = 0
+    done = False
+
+    async def _heartbeat() -> None:
+        nonlocal beats
+        while True:
+            await asyncio.sleep(HEARTBEAT)
+            if done:
+                return
+            beats += 1
+
+    task = asyncio.create_task(_heartbeat())
+    await asyncio.sleep(0)
+    try:
+        await coro
+    finally:
+        done = True
+        await task
+    return beats
+
+
+@pytest.mark.asyncio
+async def test_busy_poll_cycle_does_not_block_loop(pty_pair, bus_config) -> None:
+    """전체 폴링 주기를 연속으로 돌려도 루프 블로킹 시간은 0 에 가깝습니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    bus = CommaxBus(
+        MagicMock(),
+        bus_config(path),
+    )
+
+    def _answer() -> None:
+        # 월패드 역할: 조회 헤더에 0x80 을 더한 헤더로 같은 주소에 응답합니다.
+        query = os.read(master, 1024)
+        reply = [query[0] | 0x80, 0x00, query[1], 0, 0, 0, 0]
+        os.write(master, bytes([*reply, sum(reply) & 0xFF]))
+
+    loop.add_reader(master, _answer)
+
+    frames = [*LIGHT_QUERY_FRAMES, *BOILER_QUERY_FRAMES, MASTER_QUERY_FRAME]
+
+    async def _poll_cycles() -> None:
+        for _ in range(5):
+            for frame in frames:
+                assert await bus.async_request(frame, frame[0] | 0x80, frame[1])
+
+    try:
+        # 포트 열기(executor)는 측정에서 제외합니다.
+        await bus.async_start()
+        beats = await _count_heartbeats(_poll_cycles())
+    finally:
+        loop.remove_reader(master)
+        await bus.async_close()
+
+    # 요청마다 송신 완료(전송 시간 8.3ms)를 루프에 양보하며 기다리므로, 그동안
+    # 먼저 만료되는 1ms 하트비트가 적어도 한 번씩 돕니다.
+    assert beats >= 5 * len(frames)
+
+
+@pytest.mark.asyncio
+async def test_wedged_adapter_does_not_block_loop(pty_pair) -> None:
+    """상대편이 읽지 않아 커널 버퍼가 가득 차도 쓰기가 루프를 막지 않습니다."""
+    master, path = pty_pair
+    transport = await SerialTransport.async_open(
+        path, DEFAULT_BAUD_RATE, lambda data: None, lambda exc: None
+    )
+    frame = LIGHT_QUERY_FRAMES[0]
+
+    async def _flood() -> None:
+        for _ in range(20000):
+            transport.write(frame)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(transport.async_drain(), 0.2)
+
+    try:
+        beats = await _count_heartbeats(_flood())
+    finally:
+        transport.close()
+
+    # 쓰기는 버퍼에 쌓이고, drain 을 기다리는 동안 루프가 계속 돕니다.
+    assert beats > 0
+
+
+@pytest.mark.asyncio
+async def test_wedged_adapter_blocks_loop_with_blocking_serial(pty_pair) -> None:
+    """비교 기준: 블로킹 serial.Serial.write 는 같은 상황에서 루프를 멈춥니다."""
+    master, path = pty_pair
+    port = serial.Serial(port=path, baudrate=DEFAULT_BAUD_RATE, write_timeout=0.2)
+    frame = LIGHT_QUERY_FRAMES[0]
+
+    async def _flood() -> None:
+        with pytest.raises(serial.SerialTimeoutException):
+            for _ in range(20000):
+                port.write(frame)
+
+    try:
+        beats = await _count_heartbeats(_flood())
+    finally:
+        port.close()
+
+    # 쓰기 시간 초과까지 루프를 잡고 있어 하트비트가 한 번도 돌지 못합니다.
+    assert beats == 0
+
+
+def test_airtime_follows_baud_rate() -> None:
+    """프레임 전송 시간과 프레임 간격은 보드레이트에 반비례합니다."""
+    assert frame_airtime(8, 9600) == pytest.approx(0.00833, abs=1e-5)
+    assert inter_frame_gap(9600) == pytest.approx(0.00365, abs=1e-5)
+    assert frame_airtime(8, 115200) == pytest.approx(frame_airtime(8, 9600) / 12)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("baudrate", [9600, 115200])
+async def test_wait_sent_covers_airtime(pty_pair, baudrate) -> None:
+    """송신 완료 대기는 해당 보드레이트의 프레임 전송 시간 이상 걸립니다."""
+    master, path = pty_pair
+    loop = asyncio.get_running_loop()
+    loop.add_reader(master, lambda: os.read(master, 1024))
+    transport = await SerialTransport.async_open(
+        path, baudrate, lambda data: None, lambda exc: None
+    )
+    try:
+        start = loop.time()
+        transport.write(LIGHT_QUERY_FRAMES[0])
+        await transport.async_wait_sent()
+        elapsed = loop.time() - start
+    finally:
+        loop.remove_reader(master)
+        transport.close()
+
+    assert elapsed >= frame_airtime(8, baudrate)
@@ -0,0 +1,130 @@
+"""Test the device health watchdog and entity availability."""
+import asyncio
+
+import pytest
+
+from custom_integration.bus import CommaxBus
+from custom_integration.codec import encode_light_query
+from custom_integration.const import (
+    CONF_UNAVAILABLE_AFTER,
+    LIGHTING_DOMAIN,
+)
+from custom_integration.coordinator import CommaxCoordinator
+from custom_integration.light import CommaxLight
+from custom_integration.transport import TcpTransport
+from custom_integration.watchdog import HealthWatchdog
+
+from .simulator import WallpadSimulator
+from .test_scheduler import FakeClock
+
+LIGHT = (LIGHTING_DOMAIN, 1)
+
+
+def test_silent_device_becomes_unavailable_and_recovers() -> None:
+    """응답 없는 조회가 쌓이고 판정 시간이 지나야 사용 불가가 되고, 응답하면 바로 돌아옵니다."""
+    clock = FakeClock()
+    watchdog = HealthWatchdog(30, missed_polls=2, clock=clock)
+
+    watchdog.missed(LIGHT)
+    watchdog.missed(LIGHT)
+    clock.now = 29
+    assert watchdog.check([LIGHT]) == []
+    clock.now = 30
+    assert watchdog.check([LIGHT]) == [LIGHT]
+    assert not watchdog.available(LIGHT)
+    # 이미 사용 불가인 기기는 다시 보고하지 않습니다.
+    assert watchdog.check([LIGHT]) == []
+
+    assert watchdog.seen(LIGHT) is True
+    assert watchdog.available(LIGHT)
+    assert watchdog.last_seen(LIGHT) == 30
+
+
+def test_rarely_polled_device_stays_available() -> None:
+    """조회 간격이 길어 오래 응답이 없어도, 조회에 응답하고 있으면 사용 가능합니다."""
+    clock = FakeClock()
+    watchdog = HealthWatchdog(30, missed_polls=2, clock=clock)
+
+    watchdog.seen(LIGHT)
+    clock.now = 120
+    watchdog.missed(LIGHT)
+    assert watchdog.check([LIGHT]) == []
+
+    # 수동 모드: 조회하지 않으므로 응답이 없는 시간만으로 판단합니다.
+    passive = HealthWatchdog(30, missed_polls=0, clock=clock)
+    passive.seen(LIGHT)
+    clock.now = 150
+    assert passive.check([LIGHT]) == [LIGHT]
+
+
+@pytest.mark.asyncio
+async def test_dead_lights_are_unavailable_and_probed_slowly(core_hass, bus_config) -> None:
+    """응답하지 않는 조명은 사용 불가가 되고, 조회는 응답하는 조명에 돌아갑니다."""
+    wallpad = WallpadSimulator(lights=3, seed=0)
+    await wallpad.async_start()
+    bus = CommaxBus(
+        core_hass,
+        {**bus_config(wallpad.path), CONF_UNAVAILABLE_AFTER: 0.3},
+    )
+    coordinator = CommaxCoordinator(core_hass, bus, lights=range(1, 6))
+    alive = CommaxLight(coordinator, 0, "조명 1")
+    dead = CommaxLight(coordinator, 4, "조명 5")
+    try:
+        coordinator.async_start_polling()
+        await asyncio.sleep(1.0)
+        assert coordinator.watchdog.unavailable == {(LIGHTING_DOMAIN, 4), (LIGHTING_DOMAIN, 5)}
+        assert alive.available
+        assert not dead.available
+
+        polled_before = len(wallpad.received)
+        await asyncio.sleep(1.0)
+        window = wallpad.received[polled_before:]
+        assert window.count(encode_light_query(5)) == 0
+        assert window.count(encode_light_query(1)) >= 1
+
+        # 조명이 다시 응답하면 (여기서는 월패드 자체 조회를 엿들은 경우) 바로 사용 가능합니다.
+        wallpad.lights[5] = True
+        wallpad.start_background_polling(0.1)
+        await asyncio.sleep(0.2)
+        assert dead.available
+        assert coordinator.data[LIGHTING_DOMAIN][5] is True
+    finally:
+        await coordinator.async_close()
+        await wallpad.async_stop()
+
+
+@pytest.mark.asyncio
+async def test_bus_outage_does_not_mark_devices_silent(
+    core_hass, wallpad, bus_config, monkeypatch
+) -> None:
+    """버스가 끊긴 동안의 실패한 조회는 기기 무응답이 아니므로, 복구되면 바로 사용 가능합니다."""
+    url = await wallpad.async_serve_tcp()
+    bus = CommaxBus(core_hass, {**bus_config(url), CONF_UNAVAILABLE_AFTER: 0.3})
+    coordinator = CommaxCoordinator(core_hass, bus)
+    lights = [CommaxLight(coordinator, i, f"조명 {i + 1}") for i in range(5)]
+    open_transport = TcpTransport.async_open
+
+    async def _refuse(*args):
+        raise ConnectionRefusedError("게이트웨이 꺼짐")
+
+    try:
+        coordinator.async_start_polling()
+        async with asyncio.timeout(2):
+            while len(coordinator.data[LIGHTING_DOMAIN]) < 5:
+                await asyncio.sleep(0.01)
+
+        monkeypatch.setattr(TcpTransport, "async_open", _refuse)
+        wallpad.drop_tcp_connections()
+        await asyncio.sleep(1.0)
+        assert bus.supervisor.is_open
+        assert not any(light.available for light in lights)
+        assert coordinator.watchdog.unavailable == set()
+
+        monkeypatch.setattr(TcpTransport, "async_open", open_transport)
+        # 재연결 후 느린 확인 조회(PROBE_INTERVAL)가 아니라 다음 조회에서 바로 돌아옵니다.
+        async with asyncio.timeout(5):
+            while not all(light.available for light in lights):
+                await asyncio.sleep(0.01)
+        assert coordinator.watchdog.unavailable == set()
+    finally:
+        await coordinator.async_close()